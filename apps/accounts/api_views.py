@@ -2,7 +2,9 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q
+from django.forms.models import model_to_dict
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
@@ -462,6 +464,9 @@ class UserProfileAPIView(View):
                         'skills': jobseeker.skills if jobseeker else '',
                         'experience': jobseeker.experience if jobseeker else '',
                         'education': jobseeker.education if jobseeker else '',
+                        'degree_level': jobseeker.degree_level if jobseeker else '',
+                        'birth_date': jobseeker.birth_date.isoformat() if jobseeker and jobseeker.birth_date else None,
+                        'work_experience_years': jobseeker.work_experience_years if jobseeker else None,
                         'resume': jobseeker.resume.url if jobseeker and jobseeker.resume else None,
                     } if jobseeker else None
                 }
@@ -492,38 +497,40 @@ class UpdateProfileAPIView(View):
 
         try:
             data = json.loads(request.body)
-            
-            # 更新用户基本信息
+            if not isinstance(data, dict):
+                return JsonResponse({
+                    'success': False,
+                    'message': '无效的JSON数据'
+                }, status=400)
+
             user = request.user
-            if 'first_name' in data:
-                user.first_name = data['first_name']
-            if 'last_name' in data:
-                user.last_name = data['last_name']
-            if 'email' in data:
-                # 检查邮箱是否已被其他用户使用
-                if CustomUser.objects.filter(email=data['email']).exclude(id=user.id).exists():
+            with transaction.atomic():
+                try:
+                    jobseeker = user.jobseeker
+                except JobSeeker.DoesNotExist:
+                    jobseeker = JobSeeker.objects.create(user=user)
+
+                # 只更新请求中出现的字段，其余字段沿用当前值；与资料编辑页一样经 ProfileEditForm 校验
+                fields = ['skills', 'experience', 'education', 'degree_level', 'birth_date', 'work_experience_years']
+                form_data = {
+                    'first_name': user.first_name,
+                    'last_name': user.last_name,
+                    'email': user.email,
+                    **model_to_dict(jobseeker, fields=fields),
+                }
+                form_data.update({
+                    key: '' if value is None else value
+                    for key, value in data.items() if key in form_data
+                })
+                form = ProfileEditForm(form_data, instance=jobseeker, user=user)
+                if not form.is_valid():
+                    errors = {field: [str(error) for error in field_errors] for field, field_errors in form.errors.items()}
                     return JsonResponse({
                         'success': False,
-                        'message': '该邮箱已被其他用户使用'
+                        'message': next(iter(errors.values()))[0],
+                        'errors': errors,
                     }, status=400)
-                user.email = data['email']
-            
-            user.save()
-
-            # 更新求职者档案
-            try:
-                jobseeker = user.jobseeker
-            except JobSeeker.DoesNotExist:
-                jobseeker = JobSeeker.objects.create(user=user)
-
-            if 'skills' in data:
-                jobseeker.skills = data['skills']
-            if 'experience' in data:
-                jobseeker.experience = data['experience']
-            if 'education' in data:
-                jobseeker.education = data['education']
-            
-            jobseeker.save()
+                jobseeker = form.save()
 
             return JsonResponse({
                 'success': True,
@@ -539,6 +546,9 @@ class UpdateProfileAPIView(View):
                         'skills': jobseeker.skills,
                         'experience': jobseeker.experience,
                         'education': jobseeker.education,
+                        'degree_level': jobseeker.degree_level,
+                        'birth_date': jobseeker.birth_date.isoformat() if jobseeker.birth_date else None,
+                        'work_experience_years': jobseeker.work_experience_years,
                         'resume': jobseeker.resume.url if jobseeker.resume else None,
                     }
                 }
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from .models import CustomUser, Employer, JobSeeker, EmailVerification
+from apps.jobs.models import DegreeLevel
 from .utils import create_or_update_verification, verify_email_code
 
 class PasswordInputWithToggle(forms.PasswordInput):
@@ -271,6 +272,33 @@ class ProfileEditForm(forms.ModelForm):
             'rows': 4
         })
     )
+    degree_level = forms.ChoiceField(
+        label='最高学历',
+        required=False,
+        choices=[('', '请选择')] + [(level.value, level.value) for level in DegreeLevel if level is not DegreeLevel.NONE],
+        widget=forms.Select(attrs={
+            'class': 'w-full px-4 py-3 bg-gray-50 border border-gray-200 rounded-lg text-sm focus:ring-2 focus:ring-blue-500/50 focus:border-blue-500 transition-all hover:border-blue-400'
+        }),
+        help_text='用于筛选您符合学历要求的岗位'
+    )
+    birth_date = forms.DateField(
+        label='出生日期',
+        required=False,
+        widget=forms.DateInput(attrs={
+            'type': 'date',
+            'class': 'w-full px-4 py-3 bg-gray-50 border border-gray-200 rounded-lg text-sm focus:ring-2 focus:ring-blue-500/50 focus:border-blue-500 transition-all hover:border-blue-400'
+        })
+    )
+    work_experience_years = forms.IntegerField(
+        label='工作年限',
+        required=False,
+        min_value=0,
+        max_value=60,
+        widget=forms.NumberInput(attrs={
+            'class': 'w-full px-4 py-3 bg-gray-50 border border-gray-200 rounded-lg text-sm focus:ring-2 focus:ring-blue-500/50 focus:border-blue-500 transition-all hover:border-blue-400',
+            'placeholder': '应届生请填写0'
+        })
+    )
     resume = forms.FileField(
         label='简历文件',
         required=False,
@@ -283,7 +311,7 @@ class ProfileEditForm(forms.ModelForm):
 
     class Meta:
         model = JobSeeker
-        fields = ['skills', 'experience', 'education', 'resume']
+        fields = ['skills', 'experience', 'education', 'degree_level', 'birth_date', 'work_experience_years', 'resume']
 
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
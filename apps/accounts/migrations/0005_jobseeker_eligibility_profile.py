@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_emailsendratelimit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseeker',
+            name='birth_date',
+            field=models.DateField(blank=True, null=True, verbose_name='出生日期'),
+        ),
+        migrations.AddField(
+            model_name='jobseeker',
+            name='degree_level',
+            field=models.CharField(blank=True, max_length=20, verbose_name='最高学历'),
+        ),
+        migrations.AddField(
+            model_name='jobseeker',
+            name='work_experience_years',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='工作年限'),
+        ),
+    ]
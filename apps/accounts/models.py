@@ -1,3 +1,4 @@
+from django.apps import apps
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.urls import reverse
@@ -29,7 +30,11 @@ class Employer(models.Model):
 
     @property
     def job_count(self):
-        return self.jobs.filter(is_active=True).count()
+        """在招岗位数，列表页通过 annotate(active_job_count=...) 预先计算避免逐个查询"""
+        if hasattr(self, 'active_job_count'):
+            return self.active_job_count
+        JobInfo = apps.get_model('jobs', 'JobInfo')
+        return JobInfo.objects.active().filter(organization=self.company_name).count()
 
 class JobSeeker(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
@@ -37,10 +42,24 @@ class JobSeeker(models.Model):
     skills = models.TextField(blank=True)
     experience = models.TextField(blank=True)
     education = models.TextField(blank=True)
+    # 用于筛选符合条件的岗位，取值为 apps.jobs.models.DegreeLevel
+    degree_level = models.CharField(max_length=20, blank=True, verbose_name="最高学历")
+    birth_date = models.DateField(null=True, blank=True, verbose_name="出生日期")
+    work_experience_years = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="工作年限")
     
     def __str__(self):
         return self.user.username
 
+    @property
+    def age(self):
+        """周岁年龄，未填写出生日期时返回 None"""
+        if not self.birth_date:
+            return None
+        today = timezone.localdate()
+        return today.year - self.birth_date.year - (
+            (today.month, today.day) < (self.birth_date.month, self.birth_date.day)
+        )
+
 class EmailVerification(models.Model):
     email = models.EmailField(unique=True)
     verification_code = models.CharField(max_length=6)
@@ -1,3 +1,139 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import URLPattern, include, path, reverse
+
+from apps.accounts.models import CustomUser, JobSeeker
+from apps.jobs.tests import create_seed_data
+from core.query_budget import QueryBudgetTestMixin
+
+from . import api_urls
+from .models import EmailVerification
+
+# api_urls 尚未挂载到 core.urls，测试时使用本模块作为 ROOT_URLCONF
+urlpatterns = [
+    path('api/accounts/', include('apps.accounts.api_urls')),
+]
+
+
+@override_settings(ROOT_URLCONF='apps.accounts.tests')
+class AccountsApiQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """apps/accounts/api_urls.py 中每个接口的查询次数预算测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+        EmailVerification.objects.create(email='new@example.com', verification_code='123456')
+        # 重置密码会使该用户已有的会话失效，使用单独的用户，避免影响其他需要登录的接口
+        reset_user = CustomUser.objects.create_user(
+            username='resetter', email='reset@example.com', password='password123', is_job_seeker=True
+        )
+        JobSeeker.objects.create(user=reset_user)
+        EmailVerification.objects.create(email='reset@example.com', verification_code='654321')
+
+    def setUp(self):
+        cache.clear()
+
+    def request_specs(self):
+        """每个 URL 名称对应的请求：(method, url, JSON 数据, 登录用户, 预期状态码)"""
+        def url(name):
+            return reverse(f'{api_urls.app_name}:{name}')
+
+        return {
+            'login': [('post', url('login'), {'username_or_email': 'seeker', 'password': 'password123'}, None, 200)],
+            'logout': [('post', url('logout'), {}, 'job_seeker_user', 200)],
+            'signup': [('post', url('signup'), {
+                'username': 'newseeker',
+                'email': 'new@example.com',
+                'password1': 'Complex-pass-123',
+                'password2': 'Complex-pass-123',
+                'verification_code': '123456',
+            }, None, 200)],
+            'send_verification_code': [
+                ('post', url('send_verification_code'), {'email': 'other@example.com'}, None, 200),
+            ],
+            'verify_code': [('post', url('verify_code'), {'email': 'new@example.com', 'code': '123456'}, None, 200)],
+            'send_password_reset_code': [
+                ('post', url('send_password_reset_code'), {'email': 'employer@example.com'}, None, 200),
+            ],
+            'password_reset': [('post', url('password_reset'), {
+                'email': 'reset@example.com',
+                'verification_code': '654321',
+                'new_password1': 'Complex-pass-456',
+                'new_password2': 'Complex-pass-456',
+            }, None, 200)],
+            'profile': [('get', url('profile'), None, 'job_seeker_user', 200)],
+            'update_profile': [
+                ('post', url('update_profile'), {'first_name': '小明', 'skills': '教学'}, 'job_seeker_user', 200),
+            ],
+        }
+
+    def test_every_url_within_budget(self):
+        """所有账户接口的查询次数不超过预算"""
+        specs = self.request_specs()
+        for pattern in api_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            self.assertIn(pattern.name, specs, f'URL {pattern.name} 缺少查询预算测试')
+            for method, url, data, user, status in specs[pattern.name]:
+                with self.subTest(url=pattern.name, method=method, user=user):
+                    self.client.logout()
+                    if user:
+                        self.client.force_login(self.seed[user])
+                    if method == 'get':
+                        response = self.assertWithinBudget(f'{api_urls.app_name}:{pattern.name}', method, url)
+                    else:
+                        response = self.assertWithinBudget(
+                            f'{api_urls.app_name}:{pattern.name}', method, url,
+                            json.dumps(data), content_type='application/json',
+                        )
+                    self.assertEqual(response.status_code, status)
+
+
+@override_settings(ROOT_URLCONF='apps.accounts.tests')
+class UpdateProfileApiTests(TestCase):
+    """更新个人资料接口的校验测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+
+    def setUp(self):
+        self.client.force_login(self.seed['job_seeker_user'])
+        self.job_seeker = self.seed['job_seeker']
+
+    def post(self, data):
+        return self.client.post(
+            reverse(f'{api_urls.app_name}:update_profile'), json.dumps(data), content_type='application/json'
+        )
+
+    def test_update_profile(self):
+        """只更新请求中出现的字段"""
+        response = self.post({'degree_level': '本科', 'work_experience_years': 3, 'birth_date': '1998-05-01'})
+        self.assertEqual(response.status_code, 200)
+        self.job_seeker.refresh_from_db()
+        self.assertEqual(self.job_seeker.degree_level, '本科')
+        self.assertEqual(self.job_seeker.work_experience_years, 3)
+        self.assertEqual(self.job_seeker.birth_date.isoformat(), '1998-05-01')
+        self.assertEqual(response.json()['user']['email'], 'seeker@example.com')
+
+    def test_invalid_values_rejected(self):
+        """学历不在选项内、工作年限超出 0-60 或非整数、日期格式错误时返回 400"""
+        for data in (
+            {'degree_level': '不存在的学历'},
+            {'work_experience_years': 61},
+            {'work_experience_years': 'abc'},
+            {'birth_date': '1998-13-45'},
+        ):
+            with self.subTest(data=data):
+                response = self.post(data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(data)), response.json()['errors'])
+
+    def test_invalid_request_changes_nothing(self):
+        """校验失败时用户信息也不更新"""
+        response = self.post({'first_name': '小明', 'work_experience_years': -1})
+        self.assertEqual(response.status_code, 400)
+        self.seed['job_seeker_user'].refresh_from_db()
+        self.assertEqual(self.seed['job_seeker_user'].first_name, '')
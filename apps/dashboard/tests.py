@@ -1,3 +1,68 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import URLPattern, reverse
+
+from apps.jobs.browse_history import browse_buffer
+from apps.jobs.models import Application
+from apps.jobs.tests import create_seed_data
+from core.query_budget import QueryBudgetTestMixin
+
+from . import urls as dashboard_urls
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class DashboardQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """apps/dashboard/urls.py 中每个 URL 的查询次数预算测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(browse_buffer, 'flush_interval', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request_specs(self):
+        """每个 URL 名称对应的请求：(method, url, data, 登录用户, 预期状态码)"""
+        applications = list(Application.objects.filter(job_seeker=self.seed['job_seeker']).order_by('id'))
+        return {
+            'home': [
+                ('get', reverse('dashboard:home'), None, 'job_seeker_user', 302),
+                ('get', reverse('dashboard:home'), None, 'employer_user', 302),
+            ],
+            'employer_dashboard': [('get', reverse('dashboard:employer_dashboard'), None, 'employer_user', 200)],
+            'jobseeker_dashboard': [('get', reverse('dashboard:jobseeker_dashboard'), None, 'job_seeker_user', 200)],
+            'manage_application': [
+                ('post', reverse('dashboard:manage_application', args=[applications[0].id]),
+                 {'status': 'reviewing'}, 'employer_user', 302),
+            ],
+            'edit_application': [
+                ('post', reverse('dashboard:edit_application', args=[applications[1].id]),
+                 {'cover_letter': '新的求职信'}, 'job_seeker_user', 302),
+            ],
+            'withdraw_application': [
+                ('post', reverse('dashboard:withdraw_application', args=[applications[2].id]),
+                 None, 'job_seeker_user', 302),
+            ],
+            'clear_browse_history': [
+                ('post', reverse('dashboard:clear_browse_history'), None, 'job_seeker_user', 302),
+            ],
+        }
+
+    def test_every_url_within_budget(self):
+        """所有控制台 URL 的查询次数不超过预算"""
+        specs = self.request_specs()
+        for pattern in dashboard_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            self.assertIn(pattern.name, specs, f'URL {pattern.name} 缺少查询预算测试')
+            for method, url, data, user, status in specs[pattern.name]:
+                with self.subTest(url=pattern.name, method=method, user=user):
+                    self.client.logout()
+                    self.client.force_login(self.seed[user])
+                    response = self.assertWithinBudget(f'{dashboard_urls.app_name}:{pattern.name}', method, url, data)
+                    self.assertEqual(response.status_code, status)
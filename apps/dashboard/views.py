@@ -1,11 +1,19 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from apps.jobs.browse_history import browse_buffer
+from apps.jobs.cache import invalidate_seeker_membership
 from apps.jobs.models import JobInfo, JobPost, Application, JobBookmark, JobBrowseHistory
 from django.shortcuts import render
 
+@login_required
 def home(request):
-    return render(request, 'dashboard/home.html')
+    """根据用户角色跳转到对应的控制台"""
+    if request.user.is_employer:
+        return redirect('dashboard:employer_dashboard')
+    if request.user.is_job_seeker:
+        return redirect('dashboard:jobseeker_dashboard')
+    return redirect('jobs:home')
 
 @login_required
 def employer_dashboard(request):
@@ -16,7 +24,7 @@ def employer_dashboard(request):
     posted_jobs = JobInfo.objects.filter(organization=request.user.employer.company_name)
     recent_applications = Application.objects.filter(
         job_info__organization=request.user.employer.company_name
-    ).order_by('-applied_date')[:5]
+    ).select_related('job_info', 'job_seeker__user').order_by('-applied_date')[:5]
     
     context = {
         'posted_jobs': posted_jobs,
@@ -36,32 +44,27 @@ def job_seeker_dashboard(request):
     
     applications = Application.objects.filter(
         job_seeker=request.user.jobseeker
-    ).order_by('-applied_date')
+    ).select_related('job_info').order_by('-applied_date')
     
     bookmarks = JobBookmark.objects.filter(
         job_seeker=request.user.jobseeker
-    ).order_by('-created_date')
+    ).select_related('job_info').order_by('-created_date')
     
-    # 获取浏览历史，去重并限制数量
-    browse_history = JobBrowseHistory.objects.filter(
+    # 先写入本进程缓冲区中尚未落库的浏览记录，其他进程的记录最多延迟 BROWSE_HISTORY_FLUSH_INTERVAL 秒
+    browse_buffer.flush()
+
+    # 获取最近浏览的职位（每个职位仅一条记录，走 (job_seeker, -last_browsed) 索引）
+    browse_history = list(JobBrowseHistory.objects.filter(
         job_seeker=request.user.jobseeker
-    ).select_related('job_info').order_by('-browsed_date')[:20]  # 限制显示最近20条
-    
-    # 去重处理，只显示每个职位最近一次浏览
-    seen_jobs = set()
-    unique_browse_history = []
-    for history in browse_history:
-        if history.job_info.id not in seen_jobs:
-            unique_browse_history.append(history)
-            seen_jobs.add(history.job_info.id)
-    
+    ).select_related('job_info').order_by('-last_browsed')[:20])  # 限制显示最近20条
+
     context = {
         'applications': applications,
         'bookmarks': bookmarks,
-        'browse_history': unique_browse_history,
+        'browse_history': browse_history,
         'total_applications': applications.count(),
         'total_bookmarks': bookmarks.count(),
-        'total_browse_history': len(unique_browse_history),
+        'total_browse_history': len(browse_history),
         'pending_applications': applications.filter(status='pending').count(),
         'accepted_applications': applications.filter(status='accepted').count(),
     }
@@ -71,9 +74,10 @@ def job_seeker_dashboard(request):
 def manage_application(request, application_id):
     if not request.user.is_employer:
         messages.error(request, "Access denied.")
-        return redirect('home')
+        return redirect('jobs:home')
     
-    application = Application.objects.get(
+    application = get_object_or_404(
+        Application,
         id=application_id,
         job_info__organization=request.user.employer.company_name
     )
@@ -113,6 +117,7 @@ def withdraw_application(request, application_id):
             return redirect('dashboard:jobseeker_dashboard')
         
         application.delete()
+        invalidate_seeker_membership(application.job_seeker_id)
         messages.success(request, "Application withdrawn successfully!")
     
     return redirect('dashboard:jobseeker_dashboard')
@@ -128,6 +133,7 @@ def clear_browse_history(request):
     
     if request.method == 'POST':
         try:
+            browse_buffer.discard(request.user.jobseeker.id)
             JobBrowseHistory.objects.filter(job_seeker=request.user.jobseeker).delete()
             messages.success(request, "浏览历史已清除")
         except Exception as e:
@@ -1,19 +1,100 @@
+from pathlib import Path
+
 from django import forms
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
+
+from . import attachments
 from .models import JobInfo, JobPost, Application
 
+
+class AttachmentImportForm(forms.Form):
+    """从附件导入岗位表"""
+    attachment = forms.FileField(label='岗位表附件', help_text='支持 xlsx、csv 格式')
+    mapping = forms.CharField(
+        label='表头映射',
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 4}),
+        help_text='每行一个"表头=字段"，如"职位=job_title"；留空时按表头关键词识别',
+    )
+    sheet = forms.CharField(label='工作表', required=False, help_text='xlsx 工作表名称，默认为活动工作表')
+
+    def clean_attachment(self):
+        attachment = self.cleaned_data['attachment']
+        if Path(attachment.name).suffix.lower() not in attachments.EXTENSIONS:
+            raise forms.ValidationError('仅支持 xlsx、csv 格式的附件')
+        return attachment
+
+    def clean_mapping(self):
+        try:
+            return attachments.parse_mapping(self.cleaned_data['mapping'].splitlines())
+        except ValueError as e:
+            raise forms.ValidationError(str(e))
+
+
 @admin.register(JobPost)
 class JobPostAdmin(admin.ModelAdmin):
     list_display = ('title', 'organization', 'category', 'publish_date', 'is_active')
     list_filter = ('is_active', 'category', 'publish_date')
     search_fields = ('title', 'organization')
     date_hierarchy = 'publish_date'
+    actions = ['import_attachment']
+
+    # 在页面上列出的出错行数上限
+    MAX_ERROR_MESSAGES = 10
+
+    @admin.action(description='从附件导入岗位')
+    def import_attachment(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, '请只选择一个招聘公告', messages.WARNING)
+            return None
+        job_post = queryset.get()
+
+        if 'apply' in request.POST:
+            form = AttachmentImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                attachment = form.cleaned_data['attachment']
+                errors = []
+                try:
+                    counts = attachments.ingest_file(
+                        job_post, attachment.file, attachment.name,
+                        mapping=form.cleaned_data['mapping'],
+                        sheet=form.cleaned_data['sheet'] or None,
+                        on_error=lambda row_no, message: errors.append(f'第 {row_no} 行：{message}'),
+                    )
+                except ValueError as e:
+                    form.add_error('attachment', str(e))
+                else:
+                    self.message_user(
+                        request,
+                        f"成功导入 {counts['jobs']} 个岗位到公告「{job_post.title}」，"
+                        f"更新 {counts['updated']} 个已有岗位，{counts['errors']} 行出错",
+                    )
+                    for error in errors[:self.MAX_ERROR_MESSAGES]:
+                        self.message_user(request, error, messages.WARNING)
+                    return None
+        else:
+            form = AttachmentImportForm()
+
+        return TemplateResponse(request, 'admin/jobs/jobpost/import_attachment.html', {
+            **self.admin_site.each_context(request),
+            'title': '从附件导入岗位',
+            'opts': self.model._meta,
+            'job_post': job_post,
+            'form': form,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
 
 @admin.register(JobInfo)
 class JobInfoAdmin(admin.ModelAdmin):
     list_display = ('job_title', 'organization', 'category', 'job_location', 'employment_type', 'created_at', 'is_active')
-    list_filter = ('is_active', 'category', 'employment_type', 'has_staffing_quota')
+    list_filter = (
+        'is_active', 'category', 'employment_type', 'has_staffing_quota',
+        ('duplicate_of', admin.EmptyFieldListFilter),
+    )
     search_fields = ('job_title', 'organization', 'job_location')
+    raw_id_fields = ('duplicate_of',)
     date_hierarchy = 'created_at'
 
 
@@ -0,0 +1,289 @@
+"""
+附件岗位表导入
+
+不少公告把岗位表作为 xlsx/csv 附件发布，每个附件几百到几万行。
+逐行读取附件（xlsx 使用 openpyxl 的只读模式，csv 使用标准库 csv），按表头识别各列对应的 JobInfo 字段，
+每 batch_size 行在一个事务中 bulk_create 到指定公告下，任何时候只在内存中保留一批，内存占用与附件行数无关。
+公告已有的岗位按岗位名称对应（同 importer.match_jobs），对应上的岗位用附件中的值更新而不是重复创建，
+同一附件重复导入不会产生重复岗位。
+表头默认按关键词识别（见 extraction.header_columns），也可以传入"表头=字段"的映射覆盖。
+字段值校验失败的行跳过并报告行号，不中断导入。
+"""
+import codecs
+import csv
+import io
+import logging
+import zipfile
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+
+import openpyxl
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import dedup, majors, search, stats
+from .cache import bump_data_version
+from .extraction import HEADER_KEYWORDS, MAX_HEADER_ROW, header_columns, parse_age_level, parse_degree_level
+from .importer import JOB_FIELDS, clean_fields, match_jobs
+from .models import JobInfo
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+EXTENSIONS = ('.xlsx', '.csv')
+
+# 附件中常见的其他列，在正文岗位表的关键词之后匹配
+ATTACHMENT_HEADER_KEYWORDS = (
+    *HEADER_KEYWORDS,
+    ('employment_type', ('用工方式', '用人方式', '聘用方式')),
+    ('political_status_requirement', ('政治面貌',)),
+    ('gender_requirement', ('性别',)),
+    ('title_requirement', ('职称',)),
+    ('job_experience_requirement', ('工作经历', '工作经验')),
+    ('job_responsibilities', ('岗位职责', '工作职责', '岗位描述', '岗位简介')),
+    ('other_requirement', ('其他条件', '其他要求', '其它条件', '备注')),
+    ('contacts', ('联系人',)),
+    ('contact_methods', ('联系电话', '联系方式', '咨询电话')),
+)
+
+# csv 附件先按 UTF-8 读取，不是 UTF-8 时按 GB18030（兼容 GBK）读取
+_ENCODING_SAMPLE_SIZE = 64 * 1024
+
+
+def parse_mapping(lines):
+    """
+    解析"表头=字段"形式的表头映射
+
+    Raises:
+        ValueError: 格式错误或字段不存在
+    """
+    mapping = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        header, sep, field = line.rpartition('=')
+        header, field = header.strip(), field.strip()
+        if not sep or not header:
+            raise ValueError(f'表头映射格式应为"表头=字段"：{line}')
+        if field not in JOB_FIELDS:
+            raise ValueError(f'岗位没有可导入的字段 {field}')
+        mapping[header] = field
+    return mapping
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # xlsx 中的数字读取为浮点数，招聘人数等整数列去掉".0"
+        value = int(value)
+    elif isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    return ' '.join(str(value).split())
+
+
+def _detect_encoding(file):
+    sample = file.read(_ENCODING_SAMPLE_SIZE)
+    file.seek(0)
+    try:
+        # 增量解码器允许样本末尾是不完整的多字节字符
+        codecs.getincrementaldecoder('utf-8')().decode(sample)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'gb18030'
+
+
+def _read_csv(file):
+    text = io.TextIOWrapper(file, encoding=_detect_encoding(file), newline='')
+    try:
+        for row in csv.reader(text):
+            yield [_cell_text(value) for value in row]
+    finally:
+        text.detach()
+
+
+def _read_xlsx(file, sheet=None):
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except zipfile.BadZipFile:
+        raise ValueError('无法读取 xlsx 附件，文件可能已损坏')
+    try:
+        if sheet and sheet not in workbook.sheetnames:
+            raise ValueError(f'附件中没有工作表 {sheet}')
+        worksheet = workbook[sheet] if sheet else workbook.active
+        for row in worksheet.iter_rows(values_only=True):
+            yield [_cell_text(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def read_rows(file, name, sheet=None):
+    """
+    逐行读取附件，返回单元格文本列表的迭代器
+
+    Args:
+        file: 以二进制模式打开的文件对象
+        name: 文件名，按扩展名判断格式
+        sheet: xlsx 的工作表名称，默认为活动工作表
+    """
+    extension = Path(name).suffix.lower()
+    if extension == '.csv':
+        return _read_csv(file)
+    if extension == '.xlsx':
+        return _read_xlsx(file, sheet)
+    raise ValueError(f"不支持的附件格式 {extension or name}，仅支持 {'、'.join(EXTENSIONS)}")
+
+
+def _find_header(rows, mapping):
+    """在前几行中查找表头，返回 (表头所在行号, 表头行, {列号: 字段})"""
+    for row_no, row in enumerate(rows, start=1):
+        columns = header_columns(row, ATTACHMENT_HEADER_KEYWORDS)
+        for index, text in enumerate(row):
+            field = mapping.get(text.replace(' ', ''))
+            if field:
+                columns = {key: value for key, value in columns.items() if value != field}
+                columns[index] = field
+        if 'job_title' in columns.values() and len(columns) >= 2:
+            return row_no, row, columns
+        if row_no >= MAX_HEADER_ROW:
+            break
+    raise ValueError(f'前 {MAX_HEADER_ROW} 行中没有找到包含岗位名称的表头')
+
+
+def build_job(job_post, row, columns):
+    """
+    由一行单元格构造未保存的岗位，学历、年龄等级未单独给出时由要求文本解析
+
+    Raises:
+        ValidationError: 字段值校验失败
+    """
+    data = {
+        'organization': job_post.organization,
+        **{field: row[index] for index, field in columns.items() if index < len(row) and row[index]},
+    }
+    if 'min_degree_level' not in data:
+        data['min_degree_level'] = parse_degree_level(data.get('degree_requirement')) or None
+    if 'max_age_level' not in data:
+        data['max_age_level'] = parse_age_level(data.get('age_requirement')) or None
+    data = {field: value for field, value in data.items() if value is not None}
+    job = JobInfo(job_post=job_post, **clean_fields(JobInfo, data, JOB_FIELDS))
+    # bulk_create 不调用 save()，需手动计算派生字段
+    job.sync_derived_fields()
+    return job
+
+
+def merge_existing(existing, jobs, fields):
+    """
+    把一批新岗位与公告已有的岗位按岗位名称对应，对应上的已有岗位用新岗位的 fields 字段值更新（未保存）
+
+    Returns:
+        tuple: (有变化的已有岗位, 没有对应的新岗位, 尚未对应的已有岗位, 计入统计的岗位招聘人数的变化)
+    """
+    pairs, added = match_jobs(existing, jobs)
+    now = timezone.now()
+    updated, remaining, positions = [], [], 0
+    for job, incoming in pairs:
+        if incoming is None:
+            remaining.append(job)
+            continue
+        changed = [name for name in fields if getattr(job, name) != getattr(incoming, name)]
+        if not changed:
+            continue
+        old_positions = job.position_count or 0
+        for name in changed:
+            setattr(job, name, getattr(incoming, name))
+        job.sync_derived_fields()
+        job.updated_at = now
+        updated.append(job)
+        if job.is_active and job.duplicate_of_id is None:
+            positions += (job.position_count or 0) - old_positions
+    return updated, added, remaining, positions
+
+
+def write_jobs(job_post, jobs, updated=(), fields=(), positions=0):
+    """
+    在一个事务中写入一批新岗位并保存更新的已有岗位，同步全文索引、专业关联和分类统计并标记重复岗位，
+    返回重复岗位数量
+
+    Args:
+        updated: merge_existing 更新的已有岗位，fields 为更新的字段，positions 为其招聘人数的变化
+    """
+    written = [*jobs, *updated]
+    with transaction.atomic():
+        JobInfo.objects.bulk_create(jobs)
+        if updated:
+            JobInfo.objects.bulk_update(updated, [*fields, *JobInfo.DERIVED_FIELDS, 'updated_at'])
+        search.index_jobs(written)
+        majors.sync_job_majors(written)
+        active_jobs = [job for job in jobs if job.is_active]
+        stats.apply_delta(
+            stats.post_stats_key(job_post),
+            jobs=len(active_jobs),
+            positions=sum(job.position_count or 0 for job in active_jobs) + positions,
+        )
+        duplicates = dedup.detect_duplicates(written)
+    bump_data_version()
+    return duplicates
+
+
+def ingest_rows(job_post, rows, mapping=None, batch_size=DEFAULT_BATCH_SIZE, on_error=None):
+    """
+    把附件各行作为岗位写入公告
+
+    Args:
+        rows: read_rows 返回的行迭代器
+        mapping: {表头: 字段}，覆盖按关键词识别的结果
+        on_error: 行数据错误时的回调，参数为 (行号, 错误信息)
+
+    Returns:
+        Counter: jobs（新增的岗位数）、updated（更新的已有岗位数）、duplicates（其中与已有岗位重复的数量）、
+        errors（跳过的行数）
+
+    Raises:
+        ValueError: 没有找到表头
+    """
+    mapping = {header.replace(' ', ''): field for header, field in (mapping or {}).items()}
+    on_error = on_error or (lambda row_no, message: None)
+    rows = iter(rows)
+    header_row_no, header_row, columns = _find_header(rows, mapping)
+    title_index = next(index for index, field in columns.items() if field == 'job_title')
+    # 更新已有岗位时只覆盖附件中有的列，学历、年龄等级可能由要求文本解析得到
+    fields = sorted({*columns.values(), 'min_degree_level', 'max_age_level'} - {'job_title'})
+    existing = list(JobInfo.objects.filter(job_post=job_post).select_related('job_post').order_by('id'))
+
+    counts = Counter()
+    batch = []
+
+    def flush(jobs):
+        nonlocal existing
+        updated, added, existing, positions = merge_existing(existing, jobs, fields)
+        counts['duplicates'] += write_jobs(job_post, added, updated, fields, positions)
+        counts['jobs'] += len(added)
+        counts['updated'] += len(updated)
+
+    for row_no, row in enumerate(rows, start=header_row_no + 1):
+        title = row[title_index] if title_index < len(row) else ''
+        # 跳过没有岗位名称的空行、说明行和跨页重复的表头
+        if not title or title == header_row[title_index]:
+            continue
+        try:
+            batch.append(build_job(job_post, row, columns))
+        except ValidationError as e:
+            counts['errors'] += 1
+            logger.warning(f"附件第 {row_no} 行导入失败：{'；'.join(e.messages)}")
+            on_error(row_no, '；'.join(e.messages))
+            continue
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return counts
+
+
+def ingest_file(job_post, file, name, mapping=None, sheet=None, batch_size=DEFAULT_BATCH_SIZE, on_error=None):
+    """读取 xlsx/csv 附件并写入公告，参数和返回值同 ingest_rows"""
+    return ingest_rows(job_post, read_rows(file, name, sheet), mapping, batch_size, on_error)
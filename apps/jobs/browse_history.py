@@ -0,0 +1,251 @@
+"""
+浏览历史写缓冲
+
+职位详情页是访问量最大的页面，逐条同步写入浏览历史会在 SQLite 下造成锁等待。
+浏览事件先暂存在进程内缓冲区，达到数量阈值或时间阈值后合并为每个(求职者, 岗位)一行批量 upsert；
+后台线程按时间阈值定期刷新，保证延迟有上限，进程退出时也会刷新一次。
+写入数据库失败的事件会落盘到 spool 目录，由 flush_browse_history 命令补写。
+写入时丢弃岗位或求职者已删除的事件，不合法的 IP 记为空，避免一条坏事件拖垮整批写入；
+补写时数据有误的落盘文件移入 failed 子目录，不阻塞后续文件。
+"""
+import atexit
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.accounts.models import JobSeeker
+
+from .models import JobBrowseHistory, JobInfo
+
+logger = logging.getLogger(__name__)
+
+# 缓冲区达到该数量时立即写入
+BATCH_SIZE = getattr(settings, 'BROWSE_HISTORY_BATCH_SIZE', 100)
+# 缓冲事件最长滞留时间（秒），为 0 时每次浏览都同步写入
+FLUSH_INTERVAL = getattr(settings, 'BROWSE_HISTORY_FLUSH_INTERVAL', 10)
+SPOOL_DIR = Path(getattr(settings, 'BROWSE_HISTORY_SPOOL_DIR', Path(settings.BASE_DIR) / 'var' / 'browse_history'))
+# 数据有误、无法补写的落盘文件移入该子目录，等待人工处理
+FAILED_DIR_NAME = 'failed'
+
+
+def _clean_ip(value):
+    """校验 IP（X-Forwarded-For 可被客户端伪造），不合法时返回 None"""
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError:
+        return None
+
+
+def _merge_events(events):
+    """将事件按 (求职者, 岗位) 合并为 [job_seeker_id, job_info_id, 次数, 最近时间, IP, UA]"""
+    merged = {}
+    for event in events:
+        key = (event['job_seeker_id'], event['job_info_id'])
+        row = merged.get(key)
+        if row is None:
+            merged[key] = [*key, 1, event['browsed_date'], _clean_ip(event['ip_address']), event['user_agent']]
+            continue
+        row[2] += 1
+        if event['browsed_date'] >= row[3]:
+            row[3:] = [event['browsed_date'], _clean_ip(event['ip_address']), event['user_agent']]
+    return list(merged.values())
+
+
+def write_events(events):
+    """
+    将浏览事件合并后 upsert 到数据库：已浏览过的岗位累加浏览次数并更新最近浏览时间。
+    岗位或求职者已被删除的事件直接丢弃。
+    """
+    rows = _merge_events(events)
+    vendor = connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        job_ids = set(JobInfo.objects.filter(id__in={row[1] for row in rows}).values_list('id', flat=True))
+        seeker_ids = set(JobSeeker.objects.filter(id__in={row[0] for row in rows}).values_list('id', flat=True))
+        rows = [row for row in rows if row[0] in seeker_ids and row[1] in job_ids]
+        with transaction.atomic():
+            for job_seeker_id, job_info_id, count, browsed_date, ip_address, user_agent in rows:
+                history, created = JobBrowseHistory.objects.get_or_create(
+                    job_seeker_id=job_seeker_id,
+                    job_info_id=job_info_id,
+                    defaults={'last_browsed': browsed_date, 'view_count': count,
+                              'ip_address': ip_address, 'user_agent': user_agent},
+                )
+                if not created:
+                    JobBrowseHistory.objects.filter(id=history.id).update(
+                        view_count=F('view_count') + count,
+                        last_browsed=Greatest('last_browsed', Value(browsed_date)),
+                        ip_address=ip_address,
+                        user_agent=user_agent,
+                    )
+        return
+
+    table = JobBrowseHistory._meta.db_table
+    greatest = 'MAX' if vendor == 'sqlite' else 'GREATEST'
+    # INSERT ... SELECT ... WHERE EXISTS：写入时跳过已删除的岗位/求职者，不额外查询
+    sql = (
+        f"INSERT INTO {table} (job_seeker_id, job_info_id, view_count, last_browsed, ip_address, user_agent) "
+        f"SELECT %s, %s, %s, %s, %s, %s "
+        f"WHERE EXISTS (SELECT 1 FROM {JobSeeker._meta.db_table} WHERE id = %s) "
+        f"AND EXISTS (SELECT 1 FROM {JobInfo._meta.db_table} WHERE id = %s) "
+        f"ON CONFLICT (job_seeker_id, job_info_id) DO UPDATE SET "
+        f"view_count = {table}.view_count + excluded.view_count, "
+        f"last_browsed = {greatest}({table}.last_browsed, excluded.last_browsed), "
+        f"ip_address = excluded.ip_address, "
+        f"user_agent = excluded.user_agent"
+    )
+    params = [
+        (job_seeker_id, job_info_id, count, connection.ops.adapt_datetimefield_value(browsed_date),
+         connection.ops.adapt_ipaddressfield_value(ip_address), user_agent, job_seeker_id, job_info_id)
+        for job_seeker_id, job_info_id, count, browsed_date, ip_address, user_agent in rows
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(params), BATCH_SIZE):
+            cursor.executemany(sql, params[start:start + BATCH_SIZE])
+
+
+def spool_events(events):
+    """写入数据库失败时将事件落盘，等待 flush_browse_history 命令补写"""
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    path = SPOOL_DIR / f'{os.getpid()}-{uuid.uuid4().hex}.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps({**event, 'browsed_date': event['browsed_date'].isoformat()}, ensure_ascii=False))
+            f.write('\n')
+    logger.warning(f"浏览历史写入失败，已落盘 {len(events)} 条到 {path}")
+
+
+def _read_spool_file(path):
+    with open(path, encoding='utf-8') as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    for event in events:
+        event['browsed_date'] = datetime.fromisoformat(event['browsed_date'])
+    return events
+
+
+def _quarantine(path):
+    failed_dir = SPOOL_DIR / FAILED_DIR_NAME
+    failed_dir.mkdir(parents=True, exist_ok=True)
+    target = failed_dir / path.name
+    path.replace(target)
+    return target
+
+
+def drain_spool():
+    """
+    补写 spool 目录中的浏览事件，返回写入的条数。
+    数据有误的文件移入 failed 子目录；数据库暂时不可用等其他错误保留文件，留待下次补写。
+    两种情况都继续处理后续文件。
+    """
+    if not SPOOL_DIR.exists():
+        return 0
+
+    total = 0
+    for path in sorted(SPOOL_DIR.glob('*.jsonl')):
+        try:
+            events = _read_spool_file(path)
+            write_events(events)
+        except (ValueError, KeyError, TypeError, IntegrityError, DataError) as e:
+            target = _quarantine(path)
+            logger.error(f"浏览历史落盘文件 {path.name} 数据有误，已移至 {target}: {e}")
+            continue
+        except Exception as e:
+            logger.error(f"补写浏览历史落盘文件 {path.name} 失败，保留待下次补写: {e}", exc_info=True)
+            continue
+        path.unlink()
+        total += len(events)
+    return total
+
+
+class BrowseHistoryBuffer:
+    """进程内浏览历史缓冲区（线程安全）"""
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._events = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._worker = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def record(self, job_info_id, job_seeker_id, ip_address=None, user_agent=''):
+        """记录一次浏览，必要时触发写入"""
+        event = {
+            'job_info_id': job_info_id,
+            'job_seeker_id': job_seeker_id,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'browsed_date': timezone.now(),
+        }
+        with self._lock:
+            self._events.append(event)
+            due = (
+                len(self._events) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+        if due:
+            self.flush()
+        else:
+            self._ensure_worker()
+
+    def discard(self, job_seeker_id):
+        """丢弃某个求职者尚未写入的浏览事件（清除浏览历史时使用）"""
+        with self._lock:
+            self._events = [event for event in self._events if event['job_seeker_id'] != job_seeker_id]
+
+    def flush(self):
+        """将缓冲区中的事件写入数据库，返回写入的条数"""
+        with self._lock:
+            events, self._events = self._events, []
+            self._last_flush = time.monotonic()
+
+        if not events:
+            return 0
+        try:
+            write_events(events)
+        except Exception as e:
+            logger.error(f"Error flushing browse history: {str(e)}", exc_info=True)
+            spool_events(events)
+        return len(events)
+
+    def _ensure_worker(self):
+        """启动后台刷新线程，保证缓冲事件的滞留时间不超过 flush_interval"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='browse-history-flush', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+browse_buffer = BrowseHistoryBuffer()
+
+# 进程退出（如 gunicorn worker 正常关闭）时写入剩余事件
+atexit.register(browse_buffer.flush)
@@ -0,0 +1,176 @@
+"""
+岗位数据缓存
+
+所有岗位相关缓存的键都带有全局数据版本号，JobPost/JobInfo 写入时由信号递增版本号，
+旧版本的缓存自然失效，无需逐个删除。
+缓存未命中时通过 cache.add 实现的互斥锁保证只有一个请求重新计算，
+其余请求优先返回上一版本的旧数据，没有旧数据时短暂等待计算结果。
+
+版本号和锁只在同一个缓存后端内有效：多进程部署须使用 Redis 等共享缓存（见 settings.CACHES），
+进程内缓存 LocMemCache 下每个进程各有一份版本号，其他进程（如 expire_job_posts）递增的版本号不会生效。
+"""
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Application, JobBookmark
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSION_KEY = 'jobs:data_version'
+
+# 重新计算锁的超时时间（秒），防止计算进程异常退出后锁无法释放
+LOCK_TIMEOUT = 30
+# 没有旧数据可用时等待其他请求计算结果的最长时间（秒）
+WAIT_TIMEOUT = 2
+WAIT_INTERVAL = 0.05
+
+HOME_CACHE_TIMEOUT = 300
+
+# 只在当前进程内有效的缓存后端
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache():
+    """默认缓存是否在进程间共享（如 Redis）"""
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def get_data_version():
+    """获取当前岗位数据版本号"""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, 1, timeout=None)
+        version = cache.get(DATA_VERSION_KEY, 1)
+    return version
+
+
+def bump_data_version():
+    """递增岗位数据版本号，使所有岗位相关缓存失效"""
+    try:
+        return cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        cache.set(DATA_VERSION_KEY, 2, timeout=None)
+        return 2
+
+
+def get_or_compute(name, compute, timeout=HOME_CACHE_TIMEOUT):
+    """
+    读取带版本号的缓存，未命中时只允许一个请求调用 compute 重新计算
+
+    Args:
+        name: 缓存名称
+        compute: 无参数的计算函数，返回值需可序列化
+        timeout: 缓存有效期（秒）
+    """
+    key = f'jobs:{name}:v{get_data_version()}'
+    stale_key = f'jobs:{name}:stale'
+
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout=timeout)
+            cache.set(stale_key, value, timeout=None)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    # 其他请求正在计算：优先返回旧数据，否则等待计算结果
+    value = cache.get(stale_key)
+    if value is not None:
+        return value
+
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+    logger.warning(f"等待缓存 {key} 计算超时，直接计算")
+    return compute()
+
+
+def filter_digest(cleaned_data, job_seeker=None):
+    """
+    由岗位搜索条件生成摘要，作为搜索结果、分面计数等缓存的名称
+
+    空条件不参与计算，条件顺序和首尾空白不影响结果；
+    勾选"只看符合条件"时结果取决于求职者资料，资料一并计入摘要。
+    """
+    normalized = {key: str(value).strip() for key, value in cleaned_data.items() if value}
+    if normalized.get('eligible') and job_seeker is not None:
+        normalized['eligible'] = [job_seeker.degree_level, job_seeker.age, job_seeker.work_experience_years]
+    payload = json.dumps(normalized, ensure_ascii=False, sort_keys=True)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+# 搜索结果ID列表的缓存有效期（秒）
+RESULT_CACHE_TIMEOUT = 300
+
+
+def get_result_ids(cleaned_data, job_seeker, compute, limit):
+    """
+    读取按搜索条件缓存的有序岗位ID列表，未命中时调用 compute 计算
+
+    缓存键带数据版本号，岗位或公告写入后自动失效。
+    """
+    name = f'results:{limit}:{filter_digest(cleaned_data, job_seeker)}'
+    return get_or_compute(name, compute, timeout=RESULT_CACHE_TIMEOUT)
+
+
+# 求职者收藏/申请岗位ID集合的缓存有效期（秒）：共享缓存中变更时删除，可以长期保存；
+# 进程内缓存只能删除当前进程的副本，其他进程的副本最多过期这么久
+SEEKER_CACHE_TIMEOUT = 60 * 60 * 24
+LOCAL_SEEKER_CACHE_TIMEOUT = 30
+
+
+def _membership_key(job_seeker_id):
+    return f'jobs:seeker:{job_seeker_id}:membership'
+
+
+def get_seeker_membership(job_seeker_id):
+    """
+    获取求职者已收藏和已申请的岗位ID集合，首次读取时从数据库加载并缓存
+
+    Returns:
+        tuple: (bookmarked_ids, applied_ids)
+    """
+    key = _membership_key(job_seeker_id)
+    membership = cache.get(key)
+    if membership is None:
+        membership = {
+            'bookmarked': set(
+                JobBookmark.objects.filter(job_seeker_id=job_seeker_id).values_list('job_info_id', flat=True)
+            ),
+            'applied': set(
+                Application.objects.filter(job_seeker_id=job_seeker_id).values_list('job_info_id', flat=True)
+            ),
+        }
+        timeout = SEEKER_CACHE_TIMEOUT if is_shared_cache() else LOCAL_SEEKER_CACHE_TIMEOUT
+        cache.set(key, membership, timeout=timeout)
+    return membership['bookmarked'], membership['applied']
+
+
+def invalidate_seeker_membership(job_seeker_id):
+    """
+    收藏/申请状态变化后删除缓存的岗位ID集合，下次读取时重新加载
+
+    在事务提交后删除：事务回滚时缓存不变，也不会在提交前被其他请求用旧数据重新填充。
+    只删除不修改，并发的收藏、申请不会互相覆盖。
+    """
+    key = _membership_key(job_seeker_id)
+    transaction.on_commit(lambda: cache.delete(key))
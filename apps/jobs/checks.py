@@ -0,0 +1,15 @@
+from django.core.checks import Tags, Warning, register
+
+from .cache import is_shared_cache
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """部署检查：岗位数据版本号和重新计算锁需要在进程间共享的缓存"""
+    if not is_shared_cache():
+        return [Warning(
+            '默认缓存不在进程间共享，多个 worker 之间岗位数据版本号和重新计算锁不同步',
+            hint='设置 REDIS_URL 使用 Redis 缓存',
+            id='jobs.W001',
+        )]
+    return []
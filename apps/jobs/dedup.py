@@ -0,0 +1,280 @@
+"""
+重复岗位检测
+
+同一岗位常被多个网站以不同的 source_url 转载，导入后岗位重复出现在列表和搜索结果中。
+导入时把岗位名称和各项要求拼接并规范化，取字符 3-gram 计算 MinHash 签名（NUM_PERM 个最小哈希），
+签名按 BANDS 段连同岗位名称、招聘单位和工作地点分别哈希写入带索引的 JobSignatureBand 表（LSH）：
+名称、单位、地点都相同且任意一段完全相同的岗位才是候选，查找候选只需按分段哈希等值查询，不与全部岗位逐一比较。
+候选中仍然有效、属于其他公告、签名估计的相似度不低于 DUPLICATE_THRESHOLD 的最早岗位即为原始岗位，
+后导入的岗位把 duplicate_of 指向它，JobInfo.objects.active() 不再返回，分类统计也不再计入。
+原始岗位下线或删除后，由 release_duplicates 重新检测指向它的岗位，最早的一个成为新的原始岗位。
+"""
+import hashlib
+import logging
+import random
+import re
+import struct
+import zlib
+from collections import defaultdict
+
+from django.db import transaction
+
+from . import stats
+from .models import JobInfo, JobSignature, JobSignatureBand
+
+logger = logging.getLogger(__name__)
+
+# 64 个哈希分为 16 段、每段 4 个：相似度 0.8 的岗位成为候选的概率约 0.99，0.5 的约 0.6，
+# 候选再按完整签名估计的相似度判断
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+DUPLICATE_THRESHOLD = 0.8
+SHINGLE_SIZE = 3
+# 按分段哈希查询候选时每条查询的参数个数上限（SQLite 限制单条语句的参数个数）
+QUERY_BATCH_SIZE = 5000
+
+# 参与相似度比较的字段
+TEXT_FIELDS = (
+    'job_title', 'degree_requirement', 'major_requirement', 'age_requirement',
+    'job_experience_requirement', 'political_status_requirement', 'gender_requirement',
+    'certificate_requirement', 'other_requirement',
+)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+_SIGNATURE_FORMAT = f'<{NUM_PERM}I'
+# 规范化时去掉空白和标点，只保留文字和数字
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize(text):
+    return _NON_WORD.sub('', (text or '').casefold())
+
+
+def job_text(job):
+    """岗位参与相似度比较的规范化文本"""
+    return ''.join(normalize(getattr(job, field)) for field in TEXT_FIELDS)
+
+
+def job_identity(job):
+    """
+    岗位名称、招聘单位和工作地点，三者都相同的岗位才可能重复
+
+    导入的岗位通常不填招聘单位（爬虫把单位写在公告上），此时使用公告的招聘单位。
+    """
+    organization = job.organization or job.job_post.organization
+    return '\x00'.join(normalize(value) for value in (job.job_title, organization, job.job_location))
+
+
+def shingles(text):
+    """字符 n-gram 的 32 位哈希集合"""
+    if len(text) <= SHINGLE_SIZE:
+        grams = {text} if text else set()
+    else:
+        grams = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    return {zlib.crc32(gram.encode('utf-8')) for gram in grams}
+
+
+def minhash(text):
+    """
+    计算 MinHash 签名
+
+    Returns:
+        tuple | None: NUM_PERM 个 32 位整数，文本为空时返回 None
+    """
+    hashes = list(shingles(text))
+    if not hashes:
+        return None
+    # 列表推导式比生成器表达式快约四分之一，导入时每个岗位都要计算
+    return tuple(
+        min([(a * value + b) % _MERSENNE_PRIME for value in hashes]) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+
+def band_keys(signature, identity):
+    """
+    签名每一段的 64 位有符号哈希（适合 BigIntegerField）
+
+    段号和 job_identity 参与哈希：不同段的哈希互不冲突，名称、单位或地点不同的岗位不会成为候选。
+    """
+    identity = identity.encode('utf-8')
+    keys = []
+    for band in range(BANDS):
+        values = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f'<H{ROWS}I', band, *values) + identity, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def similarity(signature, other):
+    """两个签名估计的 Jaccard 相似度"""
+    return sum(a == b for a, b in zip(signature, other)) / NUM_PERM
+
+
+def _pack(signature):
+    return struct.pack(_SIGNATURE_FORMAT, *signature)
+
+
+def _unpack(data):
+    return struct.unpack(_SIGNATURE_FORMAT, bytes(data))
+
+
+def _candidate_jobs(keys):
+    """按分段哈希查询已写入的岗位，返回 {分段哈希: {岗位ID}}"""
+    key_jobs = defaultdict(set)
+    keys = list(keys)
+    for start in range(0, len(keys), QUERY_BATCH_SIZE):
+        rows = JobSignatureBand.objects.filter(key__in=keys[start:start + QUERY_BATCH_SIZE])
+        for key, job_id in rows.values_list('key', 'job_info_id'):
+            key_jobs[key].add(job_id)
+    return key_jobs
+
+
+def find_originals(jobs, signatures, job_keys):
+    """
+    按 ID 顺序查找一批岗位各自重复的原始岗位
+
+    原始岗位须仍然有效、比该岗位更早导入（ID 更小）、属于其他公告、job_identity 相同且签名相似度不低于
+    DUPLICATE_THRESHOLD；候选来自已写入的分段哈希和同一批中更早的有效原始岗位。
+
+    Returns:
+        dict: {岗位ID: 原始岗位ID}
+    """
+    key_jobs = _candidate_jobs({key for keys in job_keys.values() for key in keys})
+    stored_ids = {job_id for job_ids in key_jobs.values() for job_id in job_ids}
+    stored = {
+        row['id']: (row['job_post_id'], _unpack(row['signature__signature']))
+        for row in JobInfo.objects.active().filter(id__in=stored_ids, signature__isnull=False)
+        .values('id', 'job_post_id', 'signature__signature')
+    } if stored_ids else {}
+
+    originals = {}
+    for job in sorted(jobs, key=lambda job: job.id):
+        if job.id not in signatures:
+            continue
+        candidates = sorted({
+            job_id for key in job_keys[job.id] for job_id in key_jobs[key] if job_id < job.id and job_id in stored
+        })
+        for candidate_id in candidates:
+            job_post_id, signature = stored[candidate_id]
+            if job_post_id != job.job_post_id and similarity(signatures[job.id], signature) >= DUPLICATE_THRESHOLD:
+                originals[job.id] = candidate_id
+                break
+        else:
+            if not (job.is_active and job.post_is_active):
+                continue
+            # 有效的原始岗位作为同一批中之后岗位的候选
+            stored[job.id] = (job.job_post_id, signatures[job.id])
+            for key in job_keys[job.id]:
+                key_jobs[key].add(job.id)
+    return originals
+
+
+def detect_duplicates(jobs):
+    """
+    为一批已保存的岗位写入签名并标记重复岗位，返回标记为重复的岗位数量
+
+    只有原始岗位写入分段哈希：重复岗位总是指向原始岗位，不需要作为候选，
+    同一岗位被转载多次时每个分段的候选也不会越来越多。
+    """
+    if not jobs:
+        return 0
+    signatures = {}
+    job_keys = {}
+    for job in jobs:
+        signature = minhash(job_text(job))
+        if signature is not None:
+            signatures[job.id] = signature
+            job_keys[job.id] = band_keys(signature, job_identity(job))
+
+    job_ids = [job.id for job in jobs]
+    with transaction.atomic():
+        # 岗位内容可能已经变化，先删除旧的签名，也避免岗位成为自己的候选
+        JobSignature.objects.filter(job_info_id__in=job_ids).delete()
+        JobSignatureBand.objects.filter(job_info_id__in=job_ids).delete()
+        originals = find_originals(jobs, signatures, job_keys)
+
+        JobSignature.objects.bulk_create([
+            JobSignature(job_info_id=job_id, signature=_pack(signature)) for job_id, signature in signatures.items()
+        ])
+        JobSignatureBand.objects.bulk_create([
+            JobSignatureBand(job_info_id=job_id, key=key)
+            for job_id, keys in job_keys.items() if job_id not in originals
+            for key in keys
+        ])
+
+        changed, flagged, released = [], [], []
+        for job in jobs:
+            original_id = originals.get(job.id)
+            if job.duplicate_of_id != original_id:
+                if job.duplicate_of_id is None:
+                    flagged.append(job.id)
+                elif original_id is None:
+                    released.append(job.id)
+                job.duplicate_of_id = original_id
+                changed.append(job)
+        JobInfo.objects.bulk_update(changed, ['duplicate_of'])
+        # bulk_update 不触发信号，转载岗位不计入分类统计
+        stats.apply_job_totals(flagged, sign=-1)
+        stats.apply_job_totals(released)
+    return len(originals)
+
+
+def _detect_queryset():
+    """重新检测重复岗位时加载的字段"""
+    return JobInfo.objects.select_related('job_post').order_by('id').only(
+        'id', 'job_post_id', 'duplicate_of_id', 'is_active', 'post_is_active', 'organization', 'job_location',
+        'job_post__organization', *TEXT_FIELDS,
+    )
+
+
+def release_duplicates(originals, deleted=False):
+    """
+    原始岗位下线或删除后重新检测指向它们的重复岗位：
+    最早的一个成为新的原始岗位（或指向其他有效的原始岗位），其余指向它
+
+    Args:
+        originals: 下线的原始岗位ID列表或查询集
+        deleted: 原始岗位即将删除（仍然有效），先删除其分段哈希，不再作为候选
+
+    Returns:
+        int: 仍为重复的岗位数量
+    """
+    if deleted:
+        JobSignatureBand.objects.filter(job_info__in=originals).delete()
+    return detect_duplicates(list(_detect_queryset().filter(duplicate_of__in=originals)))
+
+
+def backfill_duplicates(batch_size=1000, reset=False):
+    """
+    按 ID 顺序为所有岗位计算签名并标记重复岗位
+
+    按 ID 升序处理，每个岗位只需与之前已处理的岗位比较。
+
+    Returns:
+        tuple: (处理的岗位数, 标记为重复的岗位数)
+    """
+    if reset:
+        with transaction.atomic():
+            JobSignatureBand.objects.all().delete()
+            JobSignature.objects.all().delete()
+            JobInfo.objects.exclude(duplicate_of=None).update(duplicate_of=None)
+            # 转载标记全部清除后重建分类统计，之后每批检测按增量扣减
+            stats.rebuild_category_stats()
+
+    total = duplicates = 0
+    last_id = 0
+    queryset = _detect_queryset()
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return total, duplicates
+        with transaction.atomic():
+            duplicates += detect_duplicates(batch)
+        total += len(batch)
+        last_id = batch[-1].id
+        logger.info(f"已检测 {total} 个岗位，{duplicates} 个重复")
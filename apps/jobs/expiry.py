@@ -0,0 +1,58 @@
+"""
+过期公告自动下线
+
+报名截止时间已过的公告批量置为无效，由 expire_job_posts 命令定期执行（可每隔几分钟运行一次）。
+按批次使用 update() 写入，不逐行触发信号：每批在同一事务中扣减分类统计、下线公告并同步岗位上冗余的 post_is_active，
+岗位自身的 is_active 保持不变，公告重新上线（如延长报名时间）后其岗位随之恢复显示；
+事务提交后递增一次数据版本号使缓存失效。已下线的公告不会再被选中，重复执行没有副作用。
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import dedup, stats
+from .cache import bump_data_version
+from .models import JobInfo, JobPost
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def expired_job_posts(today=None):
+    """报名截止时间早于 today 的有效公告"""
+    today = today or timezone.localdate()
+    return JobPost.objects.filter(is_active=True, application_end_date__lt=today)
+
+
+def expire_batch(job_post_ids):
+    """下线一批公告及其岗位，返回下线的岗位数量"""
+    with transaction.atomic():
+        stats.apply_post_totals(stats.post_totals(job_post_ids), sign=-1)
+        JobPost.objects.filter(id__in=job_post_ids).update(is_active=False, updated_at=timezone.now())
+        job_count = JobInfo.objects.filter(job_post_id__in=job_post_ids).update(
+            post_is_active=False, updated_at=timezone.now()
+        )
+        dedup.release_duplicates(JobInfo.objects.filter(job_post_id__in=job_post_ids))
+    bump_data_version()
+    return job_count
+
+
+def expire_job_posts(today=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    下线所有报名已截止的公告及其岗位
+
+    Returns:
+        tuple: (下线的公告数, 下线的岗位数)
+    """
+    queryset = expired_job_posts(today).order_by('application_end_date', 'id').values_list('id', flat=True)
+    post_total = job_total = 0
+    while True:
+        job_post_ids = list(queryset[:batch_size])
+        if not job_post_ids:
+            break
+        job_total += expire_batch(job_post_ids)
+        post_total += len(job_post_ids)
+        logger.info(f"已下线 {post_total} 个过期公告，{job_total} 个岗位")
+    return post_total, job_total
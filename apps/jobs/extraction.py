@@ -0,0 +1,319 @@
+"""
+公告正文岗位表解析
+
+公告正文（JobPost.html_text）通常附有岗位表：一行一个岗位，列为岗位名称、招聘人数、学历、专业、年龄、工作地点等。
+解析正文中的表格，按表头关键词识别各列（支持合并单元格），每行得到一组岗位字段，
+再按岗位名称与公告已有的岗位对应（见 importer.match_jobs），补全其中为空的要求字段。
+
+解析过程不访问数据库（HTML 用标准库 html.parser 解析），由 extract_jobs 命令在进程池中并行执行；
+写回在主进程中按块 bulk_update。
+"""
+import re
+from collections import Counter, defaultdict
+from html.parser import HTMLParser
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import dedup, majors, search, stats
+from .importer import match_jobs
+from .models import AgeLevel, DegreeLevel, JobInfo
+
+# (字段, 表头包含的关键词)，按顺序匹配，每个字段只取第一列
+HEADER_KEYWORDS = (
+    ('job_title', ('岗位名称', '职位名称', '招聘岗位', '岗位职务')),
+    ('num_positions', ('招聘人数', '招录人数', '人数', '名额', '计划数')),
+    ('degree_requirement', ('学历',)),
+    ('major_requirement', ('专业',)),
+    ('age_requirement', ('年龄',)),
+    ('job_location', ('工作地点', '工作地址', '地点')),
+)
+# 表头恰好为这些文字时也是岗位名称列（"岗位代码""岗位类别"等不是）
+TITLE_HEADERS = {'岗位', '职位', '岗位名'}
+# 在表格前几行中查找表头
+MAX_HEADER_ROW = 5
+MAX_SPAN = 100
+
+# 解析结果写入的字段：文本字段及由其解析出的等级字段
+TEXT_FIELDS = tuple(field for field, _ in HEADER_KEYWORDS if field != 'job_title')
+LEVEL_FIELDS = {'min_degree_level': DegreeLevel.NONE.value, 'max_age_level': AgeLevel.NONE.value}
+EXTRACTED_FIELDS = (*TEXT_FIELDS, *LEVEL_FIELDS)
+
+# 学历关键词，按 DegreeLevel 从低到高，多个学历取最低的一个
+_DEGREE_KEYWORDS = (
+    (DegreeLevel.PRIMARY, ('小学',)),
+    (DegreeLevel.JUNIOR, ('初中',)),
+    (DegreeLevel.SENIOR, ('高中', '中专', '技校', '职高', '中职')),
+    (DegreeLevel.COLLEGE, ('大专', '专科', '高职', '高专')),
+    (DegreeLevel.BACHELOR, ('本科', '学士')),
+    (DegreeLevel.MASTER, ('硕士', '研究生')),
+    (DegreeLevel.DOCTOR, ('博士',)),
+)
+_AGE = re.compile(r'(\d{2})\s*(?:周岁|岁)')
+_AGE_LIMITS = sorted(
+    (int(level.name.split('_')[1]), level) for level in AgeLevel if level is not AgeLevel.NONE
+)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class _TableParser(HTMLParser):
+    """收集正文中所有表格的单元格文本，返回 [[[(文本, 跨行数, 跨列数)]]]"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        self._stack = []
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self._stack.append([])
+        elif not self._stack:
+            return
+        elif tag == 'tr':
+            # 省略了结束标签的单元格在下一个单元格或下一行开始时结束
+            self._end_cell()
+            self._stack[-1].append([])
+        elif tag in ('td', 'th'):
+            self._end_cell()
+            if not self._stack[-1]:
+                self._stack[-1].append([])
+            attrs = dict(attrs)
+            self._cell = ([], _span(attrs.get('rowspan')), _span(attrs.get('colspan')))
+        elif tag in ('br', 'p', 'div') and self._cell:
+            self._cell[0].append(' ')
+
+    def handle_endtag(self, tag):
+        if not self._stack:
+            return
+        if tag in ('td', 'th'):
+            self._end_cell()
+        elif tag == 'table':
+            self._end_cell()
+            self.tables.append(self._stack.pop())
+
+    def handle_data(self, data):
+        if self._cell:
+            self._cell[0].append(data)
+
+    def _end_cell(self):
+        if self._cell:
+            parts, rowspan, colspan = self._cell
+            self._stack[-1][-1].append((_WHITESPACE.sub(' ', ''.join(parts)).strip(), rowspan, colspan))
+            self._cell = None
+
+
+def _span(value):
+    try:
+        return min(max(int(value), 1), MAX_SPAN)
+    except (TypeError, ValueError):
+        return 1
+
+
+def _grid(rows):
+    """展开合并单元格：跨行、跨列的单元格在其覆盖的每个位置重复"""
+    grid = []
+    pending = {}  # 列号 -> [剩余行数, 文本]
+    for cells in rows:
+        row = []
+        cells = iter(cells)
+        column = 0
+        while True:
+            if column in pending:
+                carried = pending[column]
+                row.append(carried[1])
+                carried[0] -= 1
+                if not carried[0]:
+                    del pending[column]
+                column += 1
+                continue
+            cell = next(cells, None)
+            if cell is None:
+                if not any(key > column for key in pending):
+                    break
+                row.append('')
+                column += 1
+                continue
+            text, rowspan, colspan = cell
+            for _ in range(colspan):
+                row.append(text)
+                if rowspan > 1:
+                    pending[column] = [rowspan - 1, text]
+                column += 1
+        grid.append(row)
+    return grid
+
+
+def header_columns(row, header_keywords=HEADER_KEYWORDS):
+    """识别表头行各列对应的字段，返回 {列号: 字段}"""
+    columns = {}
+    for index, text in enumerate(row):
+        text = text.replace(' ', '')
+        for field, keywords in header_keywords:
+            if field in columns.values():
+                continue
+            if any(keyword in text for keyword in keywords) or (field == 'job_title' and text in TITLE_HEADERS):
+                columns[index] = field
+                break
+    return columns
+
+
+def parse_degree_level(text):
+    """从学历要求中解析最低学历，无法识别时返回 None"""
+    if not text:
+        return None
+    for level, keywords in _DEGREE_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return level.value
+    if '不限' in text:
+        return DegreeLevel.NONE.value
+    return None
+
+
+def parse_age_level(text):
+    """
+    从年龄要求中解析年龄上限，取不低于上限的最小一档（如"32周岁以下"为"35岁以下"），无法识别时返回 None
+    """
+    if not text:
+        return None
+    ages = [int(age) for age in _AGE.findall(text)]
+    if ages:
+        limit = max(ages)
+        for age, level in _AGE_LIMITS:
+            if age >= limit:
+                return level.value
+        return AgeLevel.NONE.value
+    if '不限' in text:
+        return AgeLevel.NONE.value
+    return None
+
+
+def _truncate(field, value):
+    max_length = JobInfo._meta.get_field(field).max_length
+    return value[:max_length] if max_length else value
+
+
+def extract_jobs(html_text):
+    """
+    解析公告正文中的岗位表
+
+    Returns:
+        list: [{'job_title', 'num_positions', 'degree_requirement', ..., 'min_degree_level', 'max_age_level'}]，
+        只包含表格中出现且非空的字段
+    """
+    # 正文大部分是段落文字，只解析第一个表格开始到最后一个表格结束的部分
+    lower = (html_text or '').lower()
+    start = lower.find('<table')
+    if start < 0:
+        return []
+    end = lower.rfind('</table>')
+    parser = _TableParser()
+    parser.feed(html_text[start:end + len('</table>')] if end > start else html_text[start:])
+    parser.close()
+
+    jobs = []
+    for table in parser.tables:
+        grid = _grid(table)
+        for header_index, row in enumerate(grid[:MAX_HEADER_ROW]):
+            columns = header_columns(row)
+            if 'job_title' in columns.values() and len(columns) >= 2:
+                break
+        else:
+            continue
+
+        title_header = next(grid[header_index][index] for index, field in columns.items() if field == 'job_title')
+        for row in grid[header_index + 1:]:
+            values = {
+                field: _truncate(field, row[index])
+                for index, field in columns.items()
+                if index < len(row) and row[index]
+            }
+            title = values.get('job_title')
+            # 跳过空行和跨页重复的表头
+            if not title or title == title_header:
+                continue
+            degree_level = parse_degree_level(values.get('degree_requirement'))
+            if degree_level:
+                values['min_degree_level'] = degree_level
+            age_level = parse_age_level(values.get('age_requirement'))
+            if age_level:
+                values['max_age_level'] = age_level
+            jobs.append(values)
+    return jobs
+
+
+def extract_post(item):
+    """进程池任务：(公告ID, 正文) -> (公告ID, 岗位列表)"""
+    post_id, html_text = item
+    return post_id, extract_jobs(html_text)
+
+
+def _is_blank(job, field):
+    value = getattr(job, field)
+    return not value or value == LEVEL_FIELDS.get(field)
+
+
+def apply_extracted(results, overwrite=False, batch_size=1000):
+    """
+    把解析结果写回公告已有的岗位
+
+    默认只补全为空（等级字段为"不限"）的字段，overwrite 时覆盖已有的值。
+    在一个事务中 bulk_update 有变化的岗位，同步派生字段、全文索引、专业关联和分类统计。
+
+    Args:
+        results: [(公告ID, extract_jobs 的结果)]
+
+    Returns:
+        Counter: posts（有岗位表的公告）、jobs（更新的岗位）、unmatched（没有对应岗位的行）
+    """
+    results = [(post_id, rows) for post_id, rows in results if rows]
+    counts = Counter(posts=len(results))
+    if not results:
+        return counts
+
+    with transaction.atomic():
+        existing_jobs = defaultdict(list)
+        queryset = JobInfo.objects.filter(job_post_id__in=[post_id for post_id, _ in results])
+        for job in queryset.select_related('job_post').order_by('id'):
+            existing_jobs[job.job_post_id].append(job)
+
+        now = timezone.now()
+        updated, fields, major_jobs = [], {'updated_at'}, []
+        for post_id, rows in results:
+            pairs, added = match_jobs(existing_jobs[post_id], [JobInfo(**row) for row in rows])
+            counts['unmatched'] += len(added)
+            for job, extracted in pairs:
+                if extracted is None:
+                    continue
+                before = {name: getattr(job, name) for name in (*EXTRACTED_FIELDS, *JobInfo.DERIVED_FIELDS)}
+                assigned = False
+                for name in EXTRACTED_FIELDS:
+                    value = getattr(extracted, name)
+                    if _is_blank(extracted, name) or value == before[name]:
+                        continue
+                    if overwrite or _is_blank(job, name):
+                        setattr(job, name, value)
+                        assigned = True
+                if not assigned:
+                    continue
+                job.sync_derived_fields()
+                changed = [name for name, value in before.items() if getattr(job, name) != value]
+                if changed:
+                    job.updated_at = now
+                    fields.update(changed)
+                    updated.append(job)
+                if 'major_requirement' in changed:
+                    major_jobs.append(job)
+
+        if updated:
+            post_ids = {job.job_post_id for job in updated}
+            # 招聘人数变化会影响分类统计：写入前扣除原来的贡献，写入后重新累加
+            stats.apply_post_totals(stats.post_totals(post_ids), sign=-1)
+            JobInfo.objects.bulk_update(updated, sorted(fields), batch_size=batch_size)
+            search.index_jobs(updated)
+            majors.sync_job_majors(major_jobs)
+            stats.apply_post_totals(stats.post_totals(post_ids))
+            # 补全的要求文本参与重复岗位比较，重新计算签名
+            dedup.detect_duplicates(updated)
+    counts['jobs'] = len(updated)
+    return counts
@@ -0,0 +1,77 @@
+"""
+岗位列表分面计数
+
+列表页按招聘类别、工作地区、用工方式、学历要求显示各选项的岗位数量，避免用户点进空结果。
+每个分面在"去掉本分面条件、保留其余筛选条件"的结果上做一次 GROUP BY，
+只取数量最多的 MAX_FACET_VALUES 个选项，一次计算最多 len(FACETS) 条分组查询
+（有关键词时另加一次全文检索）。
+结果按规范化后的筛选条件缓存，缓存键带岗位数据版本号，JobInfo/JobPost 变更后自动失效。
+"""
+from django.db.models import Count
+
+from . import regions
+from .cache import filter_digest, get_or_compute
+
+# (表单字段, 分组字段, 标题)
+FACETS = (
+    ('category', 'post_category', '招聘类别'),
+    ('location', 'location_province_code', '工作地区'),
+    ('job_type', 'employment_type', '用工方式'),
+    ('degree', 'min_degree_level', '学历要求'),
+)
+MAX_FACET_VALUES = 20
+FACET_CACHE_TIMEOUT = 300
+
+
+def facet_cache_name(cleaned_data, job_seeker=None):
+    """由筛选条件生成分面计数的缓存名称"""
+    return 'facets:' + filter_digest(cleaned_data, job_seeker)
+
+
+def _facet_values(queryset, key, field):
+    rows = (
+        queryset.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+        .order_by().values(field).annotate(count=Count('id')).order_by('-count')[:MAX_FACET_VALUES]
+    )
+    values = []
+    for row in rows:
+        value = label = row[field]
+        if key == 'location':
+            # 地区按省代码分组，筛选时使用省名称
+            value = label = regions.region_name(value)
+        values.append({'value': value, 'label': label, 'count': row['count']})
+    return values
+
+
+def compute_facets(jobs, cleaned_data, filter_jobs, job_seeker=None):
+    """
+    计算各分面的选项和岗位数量
+
+    Args:
+        jobs: 未经筛选的岗位查询集
+        cleaned_data: 搜索表单的 cleaned_data
+        filter_jobs: 按表单条件筛选岗位的函数，签名同 views._filter_jobs
+
+    Returns:
+        list: [{'key', 'title', 'values': [{'value', 'label', 'count'}]}]
+    """
+    # 关键词检索结果与分面无关，只检索一次
+    keyword = cleaned_data.get('search')
+    if keyword:
+        jobs = filter_jobs(jobs, {'search': keyword})
+
+    facets = []
+    for key, field, title in FACETS:
+        conditions = {**cleaned_data, 'search': None, key: None}
+        queryset = filter_jobs(jobs, conditions, job_seeker)
+        facets.append({'key': key, 'title': title, 'values': _facet_values(queryset, key, field)})
+    return facets
+
+
+def get_facets(jobs, cleaned_data, filter_jobs, job_seeker=None):
+    """读取分面计数缓存，未命中时计算"""
+    return get_or_compute(
+        facet_cache_name(cleaned_data, job_seeker),
+        lambda: compute_facets(jobs, cleaned_data, filter_jobs, job_seeker),
+        timeout=FACET_CACHE_TIMEOUT,
+    )
@@ -1,5 +1,5 @@
 from django import forms
-from .models import JobInfo, JobPost, Application, PublicInstitutionJobCategory
+from .models import JobInfo, JobPost, Application, DegreeLevel, JobPostCategory
 
 class JobForm(forms.ModelForm):
     class Meta:
@@ -30,14 +30,21 @@ class JobSearchForm(forms.Form):
     location = forms.CharField(required=False, widget=forms.TextInput(
         attrs={'placeholder': 'Location'}
     ))
+    major = forms.CharField(required=False, widget=forms.TextInput(
+        attrs={'placeholder': 'Major'}
+    ))
     category = forms.ChoiceField(
         required=False,
-        choices=[('', 'All Categories')] + [(tag.value, tag.value) for tag in PublicInstitutionJobCategory]
+        choices=[('', 'All Categories')] + [(tag.value, tag.value) for tag in JobPostCategory]
     )
-    job_type = forms.ChoiceField(
+    # 用工方式是岗位数据中的自由文本，按分面计数中出现的取值等值筛选
+    job_type = forms.CharField(required=False)
+    degree = forms.ChoiceField(
         required=False,
-        choices=[('', 'All Types')] + [('事业编', '事业编'), ('劳务派遣', '劳务派遣'), ('人事代理', '人事代理'), ('合同制', '合同制')]
+        choices=[('', 'All Degrees')] + [(level.value, level.value) for level in DegreeLevel]
     )
+    # 只看符合当前求职者学历、年龄、工作经验的岗位
+    eligible = forms.BooleanField(required=False)
 
 class JobPostForm(forms.ModelForm):
     class Meta:
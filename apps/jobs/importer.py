@@ -0,0 +1,355 @@
+"""
+NDJSON 批量导入
+
+爬虫导出的数据每行一个 JSON 对象：招聘公告的字段，加上 jobs 数组保存其岗位字段，例如
+{"title": "...", "source_url": "...", "category": "教师招聘", "jobs": [{"job_title": "...", ...}]}。
+逐行读取、逐块写入，任何时候只在内存中保留一个块，导入大文件时内存占用不随行数增长。
+每块在一个事务中写入，不逐行触发信号，全文索引、专业关联和分类统计在同一事务中批量更新，
+提交后递增一次数据版本号。
+格式错误的行跳过并报告行号；写入数据库失败的块逐条重试，只跳过出错的公告，不中断整个导入。
+
+重复抓取时按 source_url 更新已有公告：每个公告保存导入内容（公告及其岗位字段）的摘要，
+摘要未变化的公告直接跳过；变化的公告只写入值有变化的公告和岗位，未变化的行不更新 updated_at。
+岗位按岗位名称（同名岗位按先后顺序）与已有岗位对应，新数据中已不存在的岗位置为无效，
+不删除，保留求职者的申请和收藏记录。
+"""
+import hashlib
+import json
+import logging
+from collections import Counter, defaultdict, deque
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from . import dedup, majors, search, stats
+from .cache import bump_data_version
+from .models import JobInfo, JobPost
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 200
+DEFAULT_BATCH_SIZE = 1000
+
+# 不从导入数据读取的字段：主键、外键、系统时间戳和保存时派生的字段
+POST_EXCLUDED_FIELDS = {'id', 'content_hash', 'created_at', 'updated_at'}
+JOB_EXCLUDED_FIELDS = {
+    'id', 'job_post', 'duplicate_of', 'created_at', 'updated_at', *JobInfo.DERIVED_FIELDS,
+}
+
+
+def import_fields(model, excluded):
+    """从导入数据读取的字段名称"""
+    return [field.name for field in model._meta.concrete_fields if field.name not in excluded]
+
+
+POST_FIELDS = import_fields(JobPost, POST_EXCLUDED_FIELDS)
+JOB_FIELDS = import_fields(JobInfo, JOB_EXCLUDED_FIELDS)
+# 更新已有公告时不覆盖的字段：公告的启停由 expire_job_posts 和管理后台维护，
+# 导入数据中 is_active 缺省为 True，覆盖会让已过期下线的公告重新上线
+POST_UPDATE_FIELDS = [name for name in POST_FIELDS if name != 'is_active']
+
+
+def clean_fields(model, data, fields):
+    """按模型字段校验并转换一个 JSON 对象，未知的键忽略，缺少的字段使用默认值"""
+    values = {}
+    errors = []
+    for name in fields:
+        field = model._meta.get_field(name)
+        try:
+            values[name] = field.clean(data.get(name, field.get_default()), None)
+        except ValidationError as e:
+            errors.append(f"{name}: {'；'.join(e.messages)}")
+    if errors:
+        raise ValidationError(errors)
+    return values
+
+
+def content_hash(post_values, job_values):
+    """公告及其岗位校验后字段值的摘要，与 JSON 中键的顺序和未知的键无关"""
+    payload = json.dumps([post_values, job_values], cls=DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def parse_record(record):
+    """
+    将一行数据转换为未保存的公告和岗位对象
+
+    Returns:
+        tuple: (JobPost, [JobInfo])，公告的 content_hash 已计算
+
+    Raises:
+        ValidationError: 数据格式或字段值错误
+    """
+    if not isinstance(record, dict):
+        raise ValidationError('每行应为一个 JSON 对象')
+    job_records = record.get('jobs') or []
+    if not isinstance(job_records, list):
+        raise ValidationError('jobs 应为数组')
+
+    post_values = clean_fields(JobPost, record, POST_FIELDS)
+    # 空链接与没有链接相同，保存为 NULL，不参与唯一约束
+    post_values['source_url'] = post_values['source_url'] or None
+    job_values = []
+    for index, job_record in enumerate(job_records, start=1):
+        if not isinstance(job_record, dict):
+            raise ValidationError(f'第{index}个岗位应为 JSON 对象')
+        try:
+            job_values.append(clean_fields(JobInfo, job_record, JOB_FIELDS))
+        except ValidationError as e:
+            raise ValidationError([f'第{index}个岗位 {message}' for message in e.messages])
+
+    post = JobPost(**post_values, content_hash=content_hash(post_values, job_values))
+    return post, [JobInfo(**values) for values in job_values]
+
+
+def _create_posts(parsed, batch_size):
+    """写入新公告及其岗位"""
+    posts = [post for post, _ in parsed]
+    JobPost.objects.bulk_create(posts, batch_size=batch_size)
+    jobs = []
+    totals = []
+    for post, post_jobs in parsed:
+        for job in post_jobs:
+            job.job_post = post
+            # bulk_create 不调用 save()，需手动计算派生字段
+            job.sync_derived_fields()
+        jobs.extend(post_jobs)
+        active_jobs = [job for job in post_jobs if job.is_active]
+        totals.append((post, len(active_jobs), sum(job.position_count or 0 for job in active_jobs)))
+    JobInfo.objects.bulk_create(jobs, batch_size=batch_size)
+    search.index_jobs(jobs)
+    majors.sync_job_majors(jobs)
+    stats.apply_post_totals(totals)
+    duplicates = dedup.detect_duplicates(jobs)
+    return Counter(posts=len(posts), jobs=len(jobs), duplicates=duplicates)
+
+
+def match_jobs(existing, incoming):
+    """
+    按岗位名称把新数据中的岗位与已有岗位对应，同名岗位按先后顺序对应
+
+    Returns:
+        tuple: ([(已有岗位, 新岗位或 None)], [没有对应的新岗位])
+    """
+    by_title = defaultdict(deque)
+    for job in existing:
+        by_title[job.job_title].append(job)
+    pairs = {}
+    added = []
+    for job in incoming:
+        candidates = by_title.get(job.job_title)
+        if candidates:
+            pairs[candidates.popleft().id] = job
+        else:
+            added.append(job)
+    return [(job, pairs.get(job.id)) for job in existing], added
+
+
+def _assign(instance, values, fields):
+    """把 values 的字段值赋给 instance，返回值有变化的字段"""
+    changed = []
+    for name in fields:
+        value = getattr(values, name)
+        if getattr(instance, name) != value:
+            setattr(instance, name, value)
+            changed.append(name)
+    return changed
+
+
+def _update_posts(changed, batch_size):
+    """
+    更新内容有变化的已有公告及其岗位
+
+    Args:
+        changed: [(已有公告ID, 新公告, [新岗位])]
+    """
+    post_ids = [post_id for post_id, _, _ in changed]
+    # 先扣除这些公告原来对统计的贡献，写入后按新状态重新累加
+    stats.apply_post_totals(stats.post_totals(post_ids), sign=-1)
+
+    currents = JobPost.objects.in_bulk(post_ids)
+    existing_jobs = defaultdict(list)
+    for job in JobInfo.objects.filter(job_post_id__in=post_ids).order_by('id'):
+        existing_jobs[job.job_post_id].append(job)
+
+    now = timezone.now()
+    counts = Counter(updated=len(changed))
+    posts, post_fields = [], {'content_hash', 'updated_at'}
+    updated_jobs, job_fields = [], {'updated_at'}
+    new_jobs, reindex_jobs, major_jobs = [], [], []
+    for post_id, post, jobs in changed:
+        current = currents[post_id]
+        post_fields.update(_assign(current, post, POST_UPDATE_FIELDS))
+        current.content_hash = post.content_hash
+        current.updated_at = now
+        posts.append(current)
+
+        pairs, added = match_jobs(existing_jobs[post_id], jobs)
+        for job, incoming in pairs:
+            was_active = job.is_active
+            old_requirement = job.major_requirement
+            job.job_post = current
+            if incoming is None:
+                fields = ['is_active'] if job.is_active else []
+                job.is_active = False
+            else:
+                fields = _assign(job, incoming, JOB_FIELDS)
+            derived = {name: getattr(job, name) for name in JobInfo.DERIVED_FIELDS}
+            job.sync_derived_fields()
+            fields += [name for name, value in derived.items() if getattr(job, name) != value]
+            if fields:
+                job.updated_at = now
+                job_fields.update(fields)
+                updated_jobs.append(job)
+                counts['deactivated_jobs' if was_active and not job.is_active else 'updated_jobs'] += 1
+            if job.major_requirement != old_requirement:
+                major_jobs.append(job)
+            # 公告标题也是岗位索引文档的一部分，公告的岗位全部重建索引
+            reindex_jobs.append(job)
+        for job in added:
+            job.job_post = current
+            job.sync_derived_fields()
+        new_jobs.extend(added)
+
+    JobPost.objects.bulk_update(posts, sorted(post_fields), batch_size=batch_size)
+    JobInfo.objects.bulk_update(updated_jobs, sorted(job_fields), batch_size=batch_size)
+    JobInfo.objects.bulk_create(new_jobs, batch_size=batch_size)
+    search.index_jobs(reindex_jobs + new_jobs)
+    majors.sync_job_majors(major_jobs + new_jobs)
+    stats.apply_post_totals(stats.post_totals(post_ids))
+    counts['duplicates'] = dedup.detect_duplicates(reindex_jobs + new_jobs)
+    dedup.release_duplicates([job.id for job in updated_jobs if not job.is_active])
+    counts['jobs'] = len(new_jobs)
+    return counts
+
+
+def write_chunk(parsed, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    在一个事务中写入一批公告及其岗位：新链接的公告新增，已有链接的公告按内容摘要跳过或更新
+
+    Args:
+        parsed: [(JobPost, [JobInfo])]，对象均未保存，同一批中的 source_url 不重复
+
+    Returns:
+        Counter: posts（新增公告）、updated、unchanged、jobs（新增岗位）、updated_jobs、deactivated_jobs、
+        duplicates（写入的岗位中标记为重复的数量）
+    """
+    counts = Counter()
+    with transaction.atomic():
+        urls = [post.source_url for post, _ in parsed if post.source_url]
+        existing = {
+            post.source_url: post
+            for post in JobPost.objects.filter(source_url__in=urls).only('id', 'source_url', 'content_hash')
+        } if urls else {}
+
+        created, changed = [], []
+        for post, jobs in parsed:
+            current = existing.get(post.source_url)
+            if current is None:
+                created.append((post, jobs))
+            elif current.content_hash == post.content_hash:
+                counts['unchanged'] += 1
+            else:
+                changed.append((current.id, post, jobs))
+
+        if created:
+            counts.update(_create_posts(created, batch_size))
+        if changed:
+            counts.update(_update_posts(changed, batch_size))
+    return counts
+
+
+def _reset(parsed):
+    """清除回滚的 bulk_create 留下的主键，以便重新写入"""
+    for post, jobs in parsed:
+        post.pk = None
+        for job in jobs:
+            job.pk = None
+
+
+class ImportResult:
+    """导入进度：已读取的行数、出错的行数，以及 write_chunk 返回的各项计数"""
+
+    COUNTS = ('posts', 'updated', 'unchanged', 'jobs', 'updated_jobs', 'deactivated_jobs', 'duplicates')
+
+    def __init__(self):
+        self.lines = 0
+        self.errors = 0
+        for name in self.COUNTS:
+            setattr(self, name, 0)
+
+    def add(self, counts):
+        for name in self.COUNTS:
+            setattr(self, name, getattr(self, name) + counts[name])
+
+
+class Importer:
+    """
+    逐行读取 NDJSON 并按块写入
+
+    Args:
+        chunk_size: 每个事务写入的公告数量
+        batch_size: 每条 INSERT 语句写入的最大行数
+        on_error: 出错时的回调，参数为 (行号, 错误信息)
+        on_progress: 每块写入后的回调，参数为 ImportResult
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE, on_error=None, on_progress=None):
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.on_error = on_error or (lambda line_no, message: None)
+        self.on_progress = on_progress or (lambda result: None)
+        self.result = ImportResult()
+
+    def error(self, line_no, message):
+        self.result.errors += 1
+        logger.warning(f"导入第 {line_no} 行失败：{message}")
+        self.on_error(line_no, message)
+
+    def run(self, lines):
+        """导入所有行，返回 ImportResult"""
+        chunk = []
+        urls = set()
+        for line_no, line in enumerate(lines, start=1):
+            self.result.lines = line_no
+            if not line.strip():
+                continue
+            try:
+                post, jobs = parse_record(json.loads(line))
+            except json.JSONDecodeError as e:
+                self.error(line_no, f'JSON 格式错误：{e}')
+                continue
+            except ValidationError as e:
+                self.error(line_no, '；'.join(e.messages))
+                continue
+            # 同一链接在一块中出现两次时先写入前面的块，后出现的按更新处理
+            if post.source_url in urls or len(chunk) >= self.chunk_size:
+                self.flush(chunk)
+                chunk, urls = [], set()
+            chunk.append((line_no, (post, jobs)))
+            if post.source_url:
+                urls.add(post.source_url)
+        if chunk:
+            self.flush(chunk)
+        return self.result
+
+    def flush(self, chunk):
+        """写入一块；整块失败时逐条重试，找出出错的公告"""
+        parsed = [item for _, item in chunk]
+        try:
+            counts = write_chunk(parsed, self.batch_size)
+        except DatabaseError:
+            counts = Counter()
+            _reset(parsed)
+            for line_no, item in chunk:
+                try:
+                    counts.update(write_chunk([item], self.batch_size))
+                except DatabaseError as e:
+                    _reset([item])
+                    self.error(line_no, f'写入失败：{e}')
+        if counts['posts'] or counts['updated']:
+            bump_data_version()
+        self.result.add(counts)
+        self.on_progress(self.result)
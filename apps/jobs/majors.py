@@ -0,0 +1,120 @@
+"""
+专业要求索引
+
+major_requirement 是自由文本（如"计算机科学与技术、软件工程等相关专业"），
+保存或导入岗位时解析出规范化的专业名称，写入 Major 字典表和 JobInfoMajor 关联表，
+按专业检索时在专业字典中按前缀匹配专业名称，再通过关联表索引连接查询，不再对长文本做 icontains 扫描。
+要求为"不限""专业不限""不限专业"等的岗位标记为 major_unrestricted，任何专业都可以报考；
+"包括但不限于计算机"之类的"不限于"仍按列出的专业解析。
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import JobInfo, JobInfoMajor, Major
+
+# 表示不限专业的片段：单独的"不限"，或"专业"紧邻"不限"（"专业不限""不限专业"），不包括"不限于"
+_UNRESTRICTED = re.compile(r'(?:.*专业)?不限(?:专业.*)?')
+
+# 专业名称之间的分隔符（不按"及""与"拆分，避免拆开"电气工程及其自动化""计算机科学与技术"）
+_SEPARATORS = re.compile(r'[、，,；;/／\s\n\r\t（）()【】\[\]：:。]+|或')
+# 专业名称前后的修饰词
+_PREFIXES = ('包括但不限于', '但不限于', '专业不限于', '不限于', '包括', '专业要求', '要求', '限', '具有', '具备', '所学专业为', '专业为')
+_SUFFIXES = ('等相关专业', '相关专业', '等专业', '专业', '等', '方向')
+_CODE = re.compile(r'[A-Za-z]?\d+[A-Za-z]?')
+# 拆分后不是专业名称的片段（学历层次等）
+_STOP_WORDS = {'本科', '专科', '大专', '研究生', '硕士', '博士', '学士', '硕士研究生', '博士研究生', '学科代码', '学历', '学位'}
+
+MAX_NAME_LENGTH = 100
+
+
+def normalize_major(name):
+    """去掉专业名称中的代码、前缀和"等相关专业"之类的后缀"""
+    name = _CODE.sub('', name or '').strip()
+    changed = True
+    while changed and name:
+        changed = False
+        for prefix in _PREFIXES:
+            if name.startswith(prefix) and len(name) > len(prefix):
+                name = name[len(prefix):].strip()
+                changed = True
+        for suffix in _SUFFIXES:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)].strip()
+                changed = True
+    return name
+
+
+def parse_major_requirement(text):
+    """
+    解析专业要求文本
+
+    Returns:
+        tuple: (专业名称列表, 是否不限专业)
+    """
+    if not text:
+        return [], False
+    tokens = [token.strip() for token in _SEPARATORS.split(text)]
+    if any(_UNRESTRICTED.fullmatch(token) for token in tokens):
+        return [], True
+
+    names = []
+    for token in tokens:
+        name = normalize_major(token)
+        if 2 <= len(name) <= MAX_NAME_LENGTH and name not in _STOP_WORDS and name not in names:
+            names.append(name)
+    return names, False
+
+
+def get_major_ids(names, major_model=Major):
+    """获取专业名称对应的ID，不存在的专业自动加入字典表"""
+    names = set(names)
+    if not names:
+        return {}
+    major_model.objects.bulk_create([major_model(name=name) for name in names], ignore_conflicts=True)
+    return dict(major_model.objects.filter(name__in=names).values_list('name', 'id'))
+
+
+def write_job_majors(parsed, job_model=JobInfo, link_model=JobInfoMajor, major_model=Major):
+    """
+    写入一批岗位的专业解析结果
+
+    Args:
+        parsed: [(job_id, 专业名称列表, 是否不限专业)]
+        job_model, link_model, major_model: 可传入迁移中的历史模型
+    """
+    if not parsed:
+        return
+    major_ids = get_major_ids((name for _, names, _ in parsed for name in names), major_model)
+    job_ids = [job_id for job_id, _, _ in parsed]
+    unrestricted_ids = [job_id for job_id, _, unrestricted in parsed if unrestricted]
+
+    with transaction.atomic():
+        link_model.objects.filter(job_info_id__in=job_ids).delete()
+        link_model.objects.bulk_create([
+            link_model(job_info_id=job_id, major_id=major_ids[name])
+            for job_id, names, _ in parsed
+            for name in names
+        ])
+        job_model.objects.filter(id__in=job_ids).exclude(id__in=unrestricted_ids).update(major_unrestricted=False)
+        job_model.objects.filter(id__in=unrestricted_ids).update(major_unrestricted=True)
+
+
+def sync_job_majors(jobs):
+    """根据岗位的 major_requirement 重建其专业关联"""
+    write_job_majors([(job.id, *parse_major_requirement(job.major_requirement)) for job in jobs])
+
+
+def filter_by_major(queryset, major):
+    """
+    筛选可以报考某专业的岗位：专业要求中有以该名称开头的专业（"计算机"匹配"计算机科学与技术"），
+    或不限专业
+    """
+    name = normalize_major(major)
+    if not name:
+        return queryset
+    # 前缀匹配只扫描规模很小的专业字典，关联表按 (major, job_info) 唯一索引查找
+    major_ids = Major.objects.filter(name__startswith=name).values('id')
+    matched_jobs = JobInfoMajor.objects.filter(major_id__in=major_ids).values('job_info_id')
+    return queryset.filter(Q(id__in=matched_jobs) | Q(major_unrestricted=True))
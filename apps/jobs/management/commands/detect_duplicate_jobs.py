@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs import dedup
+from apps.jobs.cache import bump_data_version
+
+
+class Command(BaseCommand):
+    help = '为已有岗位计算相似度签名，标记不同公告中重复发布的岗位'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='每批处理的岗位数量（默认1000）',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='清除已有的签名和重复标记后重新检测',
+        )
+
+    def handle(self, *args, **options):
+        total, duplicates = dedup.backfill_duplicates(batch_size=options['batch_size'], reset=options['reset'])
+        bump_data_version()
+        self.stdout.write(self.style.SUCCESS(f'成功检测 {total} 个岗位，其中 {duplicates} 个为重复岗位'))
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import expiry
+
+
+class Command(BaseCommand):
+    help = '下线报名截止时间已过的招聘公告及其岗位（可重复执行，建议每隔几分钟定时运行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=expiry.DEFAULT_BATCH_SIZE,
+            help=f'每批下线的公告数量（默认{expiry.DEFAULT_BATCH_SIZE}）',
+        )
+        parser.add_argument(
+            '--date',
+            help='以该日期（YYYY-MM-DD）为准判断是否截止，默认为今天',
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"日期格式错误: {options['date']}")
+
+        post_count, job_count = expiry.expire_job_posts(today, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'成功下线 {post_count} 个过期公告，{job_count} 个岗位'))
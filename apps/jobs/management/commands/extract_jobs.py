@@ -0,0 +1,116 @@
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.jobs import extraction
+from apps.jobs.cache import bump_data_version
+from apps.jobs.models import JobPost
+
+DEFAULT_CHECKPOINT = Path(settings.BASE_DIR) / 'var' / 'extract_jobs.checkpoint'
+
+
+def read_checkpoint(path, overwrite=False):
+    """
+    读取中断的运行处理到的公告ID
+
+    没有检查点，或检查点由不同的 --overwrite 选项写入时返回 0（从头开始）。
+    """
+    try:
+        checkpoint = json.loads(path.read_text())
+        if checkpoint.get('overwrite', False) != overwrite:
+            return 0
+        return checkpoint['last_id']
+    except (OSError, ValueError, KeyError, AttributeError):
+        return 0
+
+
+def write_checkpoint(path, last_id, overwrite=False):
+    """先写临时文件再替换，中断时不会留下不完整的检查点"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps({'last_id': last_id, 'overwrite': overwrite}))
+    os.replace(tmp_path, path)
+
+
+class Command(BaseCommand):
+    help = '并行解析公告正文中的岗位表，补全岗位的学历、专业、年龄、招聘人数、工作地点等要求（中断后从检查点继续）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='解析进程数量，1 表示在当前进程中解析（默认为 CPU 核数）')
+        parser.add_argument('--chunk-size', type=int, default=200, help='每批读取和写回的公告数量（默认200）')
+        parser.add_argument('--batch-size', type=int, default=1000, help='每条 UPDATE 语句写入的最大行数（默认1000）')
+        parser.add_argument('--overwrite', action='store_true', help='覆盖岗位已有的值（默认只补全为空的字段）')
+        parser.add_argument('--checkpoint', default=str(DEFAULT_CHECKPOINT),
+                            help='检查点文件，记录中断时已处理到的公告ID，全部处理完成后删除')
+        parser.add_argument('--restart', action='store_true', help='忽略检查点，从第一个公告开始')
+
+    def handle(self, *args, **options):
+        checkpoint = Path(options['checkpoint'])
+        last_id = 0 if options['restart'] else read_checkpoint(checkpoint, options['overwrite'])
+        if last_id:
+            self.stdout.write(f'从公告ID {last_id} 之后继续')
+
+        queryset = JobPost.objects.exclude(html_text__isnull=True).exclude(html_text='').order_by('id')
+        workers = max(options['workers'], 1)
+        totals = Counter()
+        timings = Counter()
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while True:
+                started = time.monotonic()
+                items = list(queryset.filter(id__gt=last_id).values_list('id', 'html_text')[:options['chunk_size']])
+                timings['read'] += time.monotonic() - started
+                if not items:
+                    break
+
+                started = time.monotonic()
+                if executor:
+                    chunksize = max(1, len(items) // (workers * 4))
+                    results = list(executor.map(extraction.extract_post, items, chunksize=chunksize))
+                else:
+                    results = [extraction.extract_post(item) for item in items]
+                timings['parse'] += time.monotonic() - started
+
+                started = time.monotonic()
+                counts = extraction.apply_extracted(
+                    results, overwrite=options['overwrite'], batch_size=options['batch_size']
+                )
+                if counts['jobs']:
+                    bump_data_version()
+                last_id = items[-1][0]
+                write_checkpoint(checkpoint, last_id, options['overwrite'])
+                timings['write'] += time.monotonic() - started
+
+                totals.update(counts)
+                totals['read'] += len(items)
+                self.stdout.write(
+                    f"已处理 {totals['read']} 个公告（至ID {last_id}），更新 {totals['jobs']} 个岗位；"
+                    f"{self.throughput(totals['read'], timings)}"
+                )
+        finally:
+            if executor:
+                executor.shutdown()
+
+        # 全部处理完成，下次运行（如解析规则更新或公告重新导入后）从头开始
+        checkpoint.unlink(missing_ok=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"成功处理 {totals['read']} 个公告，其中 {totals['posts']} 个包含岗位表，"
+            f"更新 {totals['jobs']} 个岗位，{totals['unmatched']} 行没有对应的岗位"
+        ))
+
+    def throughput(self, count, timings):
+        """各阶段的累计耗时和每秒处理的公告数"""
+        names = {'read': '读取', 'parse': '解析', 'write': '写回'}
+        return '，'.join(
+            f'{label} {timings[stage]:.1f} 秒（{count / timings[stage] if timings[stage] else 0:.0f} 个/秒）'
+            for stage, label in names.items()
+        )
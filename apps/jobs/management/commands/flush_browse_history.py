@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from apps.jobs.browse_history import drain_spool
+
+
+class Command(BaseCommand):
+    # 进程内缓冲区由各 Web 进程自行刷新，命令进程中的缓冲区总是空的，这里只补写落盘文件
+    help = '将落盘的浏览历史补写到数据库'
+
+    def handle(self, *args, **options):
+        drained = drain_spool()
+
+        self.stdout.write(self.style.SUCCESS(f'成功补写 {drained} 条浏览历史'))
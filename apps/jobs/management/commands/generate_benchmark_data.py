@@ -0,0 +1,328 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from apps.accounts.models import CustomUser, JobSeeker
+from apps.jobs import majors, search
+from apps.jobs.cache import bump_data_version
+from apps.jobs.models import (
+    AgeLevel, Application, DegreeLevel, JobBookmark, JobBrowseHistory, JobExperienceLevel,
+    JobInfo, JobPost, JobPostCategory, PublicInstitutionJobCategory,
+)
+from apps.jobs.stats import rebuild_category_stats
+
+# 压测数据的标识：公告链接前缀和求职者用户名前缀，--clear 只删除带标识的数据
+SOURCE_URL_PREFIX = 'https://bench.example.com/job-post/'
+USERNAME_PREFIX = 'bench_seeker_'
+# 数据截止日期的默认值：所有日期和时间都由该日期和 --seed 推算，不依赖运行当天，相同参数生成相同数据
+DEFAULT_END_DATE = date(2025, 6, 30)
+
+PROVINCES = {
+    '广东省': ['广州市', '深圳市', '佛山市', '东莞市', '珠海市', '汕头市', '湛江市'],
+    '江苏省': ['南京市', '苏州市', '无锡市', '常州市', '徐州市', '南通市'],
+    '浙江省': ['杭州市', '宁波市', '温州市', '绍兴市', '金华市', '台州市'],
+    '山东省': ['济南市', '青岛市', '烟台市', '潍坊市', '临沂市', '济宁市'],
+    '四川省': ['成都市', '绵阳市', '德阳市', '宜宾市', '南充市'],
+    '湖北省': ['武汉市', '宜昌市', '襄阳市', '荆州市', '黄冈市'],
+    '河南省': ['郑州市', '洛阳市', '开封市', '南阳市', '新乡市'],
+    '湖南省': ['长沙市', '株洲市', '湘潭市', '衡阳市', '岳阳市'],
+}
+DISTRICTS = ['市区', '高新区', '经济开发区', '城区', '下辖县', '新区']
+
+ORGANIZATION_SUFFIXES = {
+    JobPostCategory.CIVIL_SERVANT: ['人力资源和社会保障局', '税务局', '市场监督管理局', '统计局'],
+    JobPostCategory.PUBLIC_INSTITUTION: ['事业单位登记管理局', '档案馆', '科学技术信息研究所', '农业技术推广中心'],
+    JobPostCategory.TEACHER: ['教育局', '第一中学', '实验小学', '职业技术学校'],
+    JobPostCategory.MEDICAL: ['卫生健康委员会', '人民医院', '中医院', '疾病预防控制中心'],
+    JobPostCategory.BANK: ['农村商业银行', '城市商业银行', '农商银行分行'],
+    JobPostCategory.SOE: ['城市建设投资集团', '交通投资集团', '水务集团', '能源集团'],
+    JobPostCategory.THREE_SUPPORTS: ['人力资源和社会保障厅', '乡镇人民政府'],
+    JobPostCategory.POLICE: ['公安局', '交通警察支队', '看守所'],
+    JobPostCategory.SELECTION: ['委组织部'],
+    JobPostCategory.COLLEGE_VILLAGE: ['委组织部', '乡镇人民政府'],
+    JobPostCategory.PUBLIC_SELECTION: ['委组织部', '机关事务管理局'],
+    JobPostCategory.GRASSROOTS: ['街道办事处', '社区服务中心'],
+    JobPostCategory.ARMY_CIVILIAN: ['军区政治工作部', '联勤保障中心'],
+    JobPostCategory.PUBLIC_WELFARE: ['就业服务中心', '社区服务中心'],
+}
+
+# 公告分类权重，大致参照真实站点的公告数量分布
+CATEGORY_WEIGHTS = {
+    JobPostCategory.PUBLIC_INSTITUTION: 30,
+    JobPostCategory.TEACHER: 20,
+    JobPostCategory.MEDICAL: 15,
+    JobPostCategory.CIVIL_SERVANT: 10,
+    JobPostCategory.SOE: 8,
+    JobPostCategory.BANK: 4,
+    JobPostCategory.THREE_SUPPORTS: 3,
+    JobPostCategory.POLICE: 2,
+    JobPostCategory.SELECTION: 2,
+    JobPostCategory.COLLEGE_VILLAGE: 1,
+    JobPostCategory.PUBLIC_SELECTION: 1,
+    JobPostCategory.GRASSROOTS: 2,
+    JobPostCategory.ARMY_CIVILIAN: 1,
+    JobPostCategory.PUBLIC_WELFARE: 1,
+}
+
+JOB_TITLES = {
+    JobPostCategory.TEACHER: ['小学语文教师', '小学数学教师', '初中英语教师', '高中物理教师', '高中化学教师',
+                              '幼儿园教师', '体育教师', '音乐教师', '美术教师', '信息技术教师'],
+    JobPostCategory.MEDICAL: ['临床医师', '护士', '药剂师', '检验技师', '影像科医师', '公共卫生医师', '麻醉科医师'],
+    JobPostCategory.POLICE: ['刑侦民警', '治安民警', '交通警察', '网络安全民警', '辅警'],
+    JobPostCategory.BANK: ['柜员', '客户经理', '风险管理岗', '信息科技岗', '综合管理岗'],
+}
+DEFAULT_JOB_TITLES = ['综合管理岗', '文秘岗', '财务会计岗', '审计岗', '人事管理岗', '信息技术岗', '法务岗',
+                      '工程技术岗', '规划设计岗', '农业技术岗', '统计分析岗', '档案管理岗', '后勤保障岗']
+
+MAJORS = ['汉语言文学', '数学与应用数学', '英语', '计算机科学与技术', '软件工程', '会计学', '财务管理', '审计学',
+          '法学', '行政管理', '公共事业管理', '人力资源管理', '临床医学', '护理学', '药学', '医学检验技术',
+          '土木工程', '工程管理', '城乡规划', '农学', '统计学', '经济学', '金融学', '新闻学', '学前教育', '不限专业']
+
+# (值, 权重)：学历、年龄、工作经验要求的分布
+DEGREE_WEIGHTS = [
+    (DegreeLevel.NONE, 3), (DegreeLevel.SENIOR, 4), (DegreeLevel.COLLEGE, 18),
+    (DegreeLevel.BACHELOR, 55), (DegreeLevel.MASTER, 17), (DegreeLevel.DOCTOR, 3),
+]
+AGE_WEIGHTS = [
+    (AgeLevel.NONE, 5), (AgeLevel.AGE_25, 3), (AgeLevel.AGE_30, 25), (AgeLevel.AGE_35, 50),
+    (AgeLevel.AGE_40, 12), (AgeLevel.AGE_45, 5),
+]
+EXPERIENCE_WEIGHTS = [
+    (JobExperienceLevel.NONE, 60), (JobExperienceLevel.NEW_GRAD, 15), (JobExperienceLevel.Y_1, 8),
+    (JobExperienceLevel.Y_3, 10), (JobExperienceLevel.Y_5, 6), (JobExperienceLevel.Y_10, 1),
+]
+
+PARAGRAPHS = [
+    '根据工作需要，经研究决定，面向社会公开招聘工作人员。现将有关事项公告如下。',
+    '应聘人员须具有中华人民共和国国籍，遵守宪法和法律，具有良好的品行和职业道德。',
+    '报名采取网上报名方式进行，报名期间应聘人员须如实填写个人信息并上传相关材料。',
+    '资格审查贯穿招聘全过程，凡不符合条件或弄虚作假的，一经查实即取消其资格。',
+    '笔试内容为公共基础知识和专业知识，笔试成绩按百分制计算，合格分数线另行公布。',
+    '面试采取结构化面试方式，主要测评应聘人员的综合素质和岗位匹配能力。',
+    '考试总成绩按笔试成绩占百分之六十、面试成绩占百分之四十的比例合成。',
+    '根据考试总成绩从高到低等额确定体检人员，体检标准参照公务员录用体检通用标准执行。',
+    '考察合格并经公示无异议的，按规定办理聘用手续，试用期满考核合格的正式聘用。',
+    '本次招聘工作全程接受纪检监察部门和社会各界的监督，咨询电话见附件。',
+]
+
+
+def _weighted(rng, pairs):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights=weights)[0].value
+
+
+def _random_datetime(rng, day):
+    """某一天工作时间内的随机时刻"""
+    moment = datetime.combine(day, time(rng.randint(8, 17), rng.randrange(60), rng.randrange(60)))
+    return timezone.make_aware(moment)
+
+
+def _batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = '使用 bulk_create 批量生成压测数据（相同 --seed 生成相同数据）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='招聘公告数量（默认1000）')
+        parser.add_argument('--jobs-per-post', type=int, default=10, help='每个公告的平均岗位数量（默认10）')
+        parser.add_argument('--seekers', type=int, default=1000, help='求职者数量（默认1000）')
+        parser.add_argument('--applications-per-seeker', type=int, default=5, help='每个求职者的申请数量（默认5）')
+        parser.add_argument('--bookmarks-per-seeker', type=int, default=10, help='每个求职者的收藏数量（默认10）')
+        parser.add_argument('--views-per-seeker', type=int, default=30, help='每个求职者浏览过的岗位数量（默认30）')
+        parser.add_argument('--html-paragraphs', type=int, default=200, help='每个公告正文的段落数量（默认200）')
+        parser.add_argument('--days', type=int, default=365, help='公告发布时间分布的天数（默认365）')
+        parser.add_argument('--end-date', type=date.fromisoformat, default=DEFAULT_END_DATE,
+                            help=f'数据截止日期，公告发布于此前 --days 天内（默认{DEFAULT_END_DATE}）')
+        parser.add_argument('--seed', type=int, default=42, help='随机数种子（默认42）')
+        parser.add_argument('--batch-size', type=int, default=1000, help='每批写入的行数（默认1000）')
+        parser.add_argument('--clear', action='store_true', help='生成前删除之前生成的压测数据')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        if options['clear']:
+            self.clear()
+
+        job_ids = self.generate_posts(rng, options)
+        seeker_ids = self.generate_seekers(options['seekers'])
+        self.generate_activity(rng, seeker_ids, job_ids, options)
+
+        # bulk_create 不触发信号，统一重建分类统计并使缓存失效
+        rebuild_category_stats()
+        bump_data_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"成功生成 {options['posts']} 个招聘公告、{len(job_ids)} 个岗位、{len(seeker_ids)} 个求职者"
+        ))
+
+    def clear(self):
+        posts = JobPost.objects.filter(source_url__startswith=SOURCE_URL_PREFIX)
+        users = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX)
+        post_count = posts.count()
+        user_count = users.count()
+        with transaction.atomic():
+            posts.delete()
+            users.delete()
+        self.stdout.write(f'已删除 {post_count} 个压测公告和 {user_count} 个压测求职者')
+
+    def generate_posts(self, rng, options):
+        """按批次生成公告及其岗位，返回岗位ID列表"""
+        categories = list(CATEGORY_WEIGHTS)
+        category_weights = list(CATEGORY_WEIGHTS.values())
+        end_date = options['end_date']
+        jobs_per_post = options['jobs_per_post']
+        job_ids = []
+        # 公告链接唯一，未使用 --clear 时接着已有压测公告编号
+        offset = JobPost.objects.filter(source_url__startswith=SOURCE_URL_PREFIX).count()
+
+        for start in range(0, options['posts'], self.batch_size):
+            count = min(self.batch_size, options['posts'] - start)
+            posts, places = [], []
+            for i in range(offset + start, offset + start + count):
+                category = rng.choices(categories, weights=category_weights)[0]
+                province = rng.choice(list(PROVINCES))
+                city = rng.choice(PROVINCES[province])
+                organization = f'{city}{rng.choice(ORGANIZATION_SUFFIXES[category])}'
+                publish_date = end_date - timedelta(days=rng.randrange(options['days']))
+                paragraphs = rng.choices(PARAGRAPHS, k=options['html_paragraphs'])
+                posts.append(JobPost(
+                    title=f'{publish_date.year}年{organization}公开招聘{category.value}工作人员公告（第{i + 1}号）',
+                    source_url=f'{SOURCE_URL_PREFIX}{i + 1}',
+                    html_text=''.join(f'<p>{paragraph}</p>' for paragraph in paragraphs),
+                    publish_date=publish_date,
+                    organization=organization,
+                    application_start_date=publish_date + timedelta(days=rng.randint(1, 7)),
+                    application_end_date=publish_date + timedelta(days=rng.randint(10, 30)),
+                    category=category.value,
+                ))
+                places.append((category, province, city))
+            created = [_random_datetime(rng, post.publish_date) for post in posts]
+
+            with transaction.atomic():
+                JobPost.objects.bulk_create(posts)
+                # created_at 是 auto_now_add，bulk_create 时总被置为当前时间，写入后改为发布当天的时刻
+                for post, created_at in zip(posts, created):
+                    post.created_at = post.updated_at = created_at
+                JobPost.objects.bulk_update(posts, ['created_at', 'updated_at'])
+                jobs = []
+                for post, place in zip(posts, places):
+                    # 每个公告的岗位数量在平均值上下浮动
+                    for _ in range(max(1, round(rng.gauss(jobs_per_post, jobs_per_post / 3)))):
+                        jobs.append(self.build_job(rng, post, *place))
+                for batch in _batched(jobs, self.batch_size):
+                    JobInfo.objects.bulk_create(batch)
+                    search.index_jobs(batch)
+                    majors.sync_job_majors(batch)
+                job_ids.extend(job.id for job in jobs)
+                # 岗位与所属公告同时创建
+                post_created_at = Subquery(JobPost.objects.filter(id=OuterRef('job_post_id')).values('created_at')[:1])
+                JobInfo.objects.filter(job_post__in=posts).update(created_at=post_created_at, updated_at=post_created_at)
+
+            self.stdout.write(f'已生成 {start + count}/{options["posts"]} 个公告')
+        return job_ids
+
+    def build_job(self, rng, post, category, province, city):
+        title = rng.choice(JOB_TITLES.get(category, DEFAULT_JOB_TITLES))
+        majors = '、'.join(rng.sample(MAJORS, rng.randint(1, 3)))
+        degree = _weighted(rng, DEGREE_WEIGHTS)
+        age = _weighted(rng, AGE_WEIGHTS)
+        experience = _weighted(rng, EXPERIENCE_WEIGHTS)
+        employment_type = rng.choice(['正式编制', '正式编制', '合同制', '劳务派遣'])
+        job = JobInfo(
+            job_post=post,
+            organization=post.organization,
+            job_title=title,
+            employment_type=employment_type,
+            has_staffing_quota=employment_type == '正式编制',
+            category=rng.choice(list(PublicInstitutionJobCategory)).value,
+            job_location=f'{province}{city}{rng.choice(DISTRICTS)}',
+            num_positions=str(rng.choices([1, 2, 3, 5, 10], weights=[50, 25, 12, 8, 5])[0]),
+            is_targeted_recruitment=rng.random() < 0.1,
+            registration_methods='网上报名',
+            registration_materials='身份证、学历证书、学位证书、相关资格证书等',
+            contacts=f'{rng.choice("王李张刘陈杨黄赵周吴")}老师',
+            contact_methods=f'0{rng.randint(10, 999)}-{rng.randint(1000000, 9999999)}',
+            job_experience_requirement=experience,
+            min_job_experience_level=experience,
+            degree_requirement=f'{degree}及以上' if degree != DegreeLevel.NONE.value else degree,
+            min_degree_level=degree,
+            major_requirement=majors,
+            age_requirement=age,
+            max_age_level=age,
+            political_status_requirement=rng.choices(['不限', '中共党员', '共青团员'], weights=[80, 15, 5])[0],
+            certificate_requirement=rng.choice(['无', '教师资格证', '执业医师资格证', '会计专业技术资格证书', '无']),
+            gender_requirement=rng.choices(['不限', '男', '女'], weights=[90, 6, 4])[0],
+            other_requirement='身体健康，品行端正，具有良好的沟通协调能力。',
+            job_responsibilities=''.join(rng.choices(PARAGRAPHS, k=3)),
+            salary_and_benefits='按国家和地方有关规定执行。',
+        )
+        # bulk_create 不调用 save()，需手动计算派生字段
+        job.sync_derived_fields()
+        return job
+
+    def generate_seekers(self, count):
+        """批量生成求职者账户，所有账户使用同一个预先计算的密码哈希"""
+        password = make_password('benchmark')
+        # 用户名唯一，未使用 --clear 时接着已有压测求职者编号
+        offset = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        users = [
+            CustomUser(username=f'{USERNAME_PREFIX}{i + 1}', email=f'{USERNAME_PREFIX}{i + 1}@example.com',
+                       password=password, is_job_seeker=True)
+            for i in range(offset, offset + count)
+        ]
+        seeker_ids = []
+        for batch in _batched(users, self.batch_size):
+            with transaction.atomic():
+                CustomUser.objects.bulk_create(batch)
+                seekers = JobSeeker.objects.bulk_create([JobSeeker(user_id=user.id) for user in batch])
+            seeker_ids.extend(seeker.id for seeker in seekers)
+        return seeker_ids
+
+    def generate_activity(self, rng, seeker_ids, job_ids, options):
+        """为每个求职者生成申请、收藏和浏览历史"""
+        if not job_ids:
+            return
+        end = timezone.make_aware(datetime.combine(options['end_date'], time()))
+        minutes = options['days'] * 24 * 60
+        statuses = [choice for choice, _ in Application.STATUS_CHOICES]
+
+        for batch in _batched(seeker_ids, self.batch_size):
+            applications, bookmarks, history = [], [], []
+            for seeker_id in batch:
+                for job_id in rng.sample(job_ids, min(options['applications_per_seeker'], len(job_ids))):
+                    applied_date = end - timedelta(minutes=rng.randrange(minutes))
+                    applications.append(Application(job_info_id=job_id, job_seeker_id=seeker_id,
+                                                    cover_letter='本人对该岗位很感兴趣，希望获得面试机会。',
+                                                    status=rng.choice(statuses),
+                                                    applied_date=applied_date, updated_date=applied_date))
+                for job_id in rng.sample(job_ids, min(options['bookmarks_per_seeker'], len(job_ids))):
+                    bookmarks.append(JobBookmark(job_info_id=job_id, job_seeker_id=seeker_id,
+                                                 created_date=end - timedelta(minutes=rng.randrange(minutes))))
+                for job_id in rng.sample(job_ids, min(options['views_per_seeker'], len(job_ids))):
+                    history.append(JobBrowseHistory(
+                        job_info_id=job_id, job_seeker_id=seeker_id,
+                        last_browsed=end - timedelta(minutes=rng.randrange(minutes)),
+                        view_count=rng.choices([1, 2, 3, 5], weights=[70, 20, 7, 3])[0],
+                    ))
+            # auto_now_add 字段在 bulk_create 时被置为当前时间，先记下生成的时间，写入后再改回
+            application_dates = [(application.applied_date, application.updated_date) for application in applications]
+            bookmark_dates = [bookmark.created_date for bookmark in bookmarks]
+            with transaction.atomic():
+                Application.objects.bulk_create(applications, batch_size=self.batch_size)
+                JobBookmark.objects.bulk_create(bookmarks, batch_size=self.batch_size)
+                JobBrowseHistory.objects.bulk_create(history, batch_size=self.batch_size)
+                for application, (applied_date, updated_date) in zip(applications, application_dates):
+                    application.applied_date, application.updated_date = applied_date, updated_date
+                for bookmark, created_date in zip(bookmarks, bookmark_dates):
+                    bookmark.created_date = created_date
+                Application.objects.bulk_update(applications, ['applied_date', 'updated_date'], batch_size=self.batch_size)
+                JobBookmark.objects.bulk_update(bookmarks, ['created_date'], batch_size=self.batch_size)
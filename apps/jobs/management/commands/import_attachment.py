@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import attachments
+from apps.jobs.models import JobPost
+
+
+class Command(BaseCommand):
+    help = '从 xlsx/csv 附件读取岗位表，批量导入到指定招聘公告'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_post_id', type=int, help='招聘公告ID')
+        parser.add_argument('path', help='附件路径（.xlsx 或 .csv）')
+        parser.add_argument(
+            '--map',
+            action='append',
+            default=[],
+            metavar='表头=字段',
+            help='指定表头对应的岗位字段，可重复使用，如 --map "职位=job_title"（默认按表头关键词识别）',
+        )
+        parser.add_argument('--sheet', help='xlsx 工作表名称，默认为活动工作表')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=attachments.DEFAULT_BATCH_SIZE,
+            help=f'每个事务写入的岗位数量（默认{attachments.DEFAULT_BATCH_SIZE}）',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size 必须大于0')
+
+        job_post = JobPost.objects.filter(id=options['job_post_id']).first()
+        if job_post is None:
+            raise CommandError(f"招聘公告不存在: {options['job_post_id']}")
+
+        path = options['path']
+        try:
+            mapping = attachments.parse_mapping(options['map'])
+            with open(path, 'rb') as f:
+                counts = attachments.ingest_file(
+                    job_post, f, path,
+                    mapping=mapping,
+                    sheet=options['sheet'],
+                    batch_size=options['batch_size'],
+                    on_error=lambda row_no, message: self.stderr.write(f'第 {row_no} 行：{message}'),
+                )
+        except OSError as e:
+            raise CommandError(f'无法打开文件 {path}: {e}')
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"成功导入 {counts['jobs']} 个岗位到公告「{job_post.title}」，"
+            f"更新 {counts['updated']} 个已有岗位，{counts['errors']} 行出错"
+        ))
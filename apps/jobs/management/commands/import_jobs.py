@@ -0,0 +1,68 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import importer
+
+
+class Command(BaseCommand):
+    help = '从 NDJSON 文件（每行一个公告及其 jobs 岗位数组）批量导入招聘公告和岗位，已有链接的公告按内容变化更新'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON 文件路径，- 表示从标准输入读取')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=importer.DEFAULT_CHUNK_SIZE,
+            help=f'每个事务写入的公告数量（默认{importer.DEFAULT_CHUNK_SIZE}）',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=importer.DEFAULT_BATCH_SIZE,
+            help=f'每条 INSERT 语句写入的最大行数（默认{importer.DEFAULT_BATCH_SIZE}）',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--chunk-size 和 --batch-size 必须大于0')
+
+        self.started = time.monotonic()
+        job_importer = importer.Importer(
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            on_error=self.report_error,
+            on_progress=self.report_progress,
+        )
+
+        path = options['path']
+        if path == '-':
+            result = job_importer.run(sys.stdin)
+        else:
+            try:
+                f = open(path, encoding='utf-8')
+            except OSError as e:
+                raise CommandError(f'无法打开文件 {path}: {e}')
+            with f:
+                result = job_importer.run(f)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'成功导入 {result.posts} 个新公告、更新 {result.updated} 个公告、跳过 {result.unchanged} 个未变化的公告，'
+            f'新增 {result.jobs} 个岗位、更新 {result.updated_jobs} 个岗位、下线 {result.deactivated_jobs} 个岗位，'
+            f'{result.duplicates} 个岗位与已有岗位重复，'
+            f'{result.errors} 行出错，{self.rate(result.lines)}'
+        ))
+
+    def rate(self, lines):
+        elapsed = time.monotonic() - self.started
+        return f'耗时 {elapsed:.1f} 秒（{lines / elapsed if elapsed else 0:.0f} 行/秒）'
+
+    def report_error(self, line_no, message):
+        self.stderr.write(f'第 {line_no} 行：{message}')
+
+    def report_progress(self, result):
+        self.stdout.write(
+            f'已读取 {result.lines} 行，新增 {result.posts} 个公告、更新 {result.updated} 个、'
+            f'跳过 {result.unchanged} 个，{self.rate(result.lines)}'
+        )
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.jobs.models import JobBrowseHistory
+
+
+class Command(BaseCommand):
+    help = '分批清理超过保留期限的浏览历史'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'BROWSE_HISTORY_RETENTION_DAYS', 180),
+            help='保留多少天内浏览过的记录（默认取 BROWSE_HISTORY_RETENTION_DAYS）',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='每批删除的记录数（默认1000）',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+
+        deleted_count = JobBrowseHistory.purge_expired(days=days, batch_size=options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'成功清理了 {deleted_count} 条超过 {days} 天未浏览的记录'
+            )
+        )
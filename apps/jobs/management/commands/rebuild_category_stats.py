@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from apps.jobs.stats import rebuild_category_stats
+
+
+class Command(BaseCommand):
+    help = '根据招聘公告和岗位数据重建招聘分类统计表'
+
+    def handle(self, *args, **options):
+        total = rebuild_category_stats()
+
+        self.stdout.write(self.style.SUCCESS(f'成功重建 {total} 个招聘分类的统计数据'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs import regions
+from apps.jobs.cache import bump_data_version
+from apps.jobs.models import JobInfo
+
+
+class Command(BaseCommand):
+    help = '重新解析岗位工作地点的省、市代码和区县名称（更新行政区划表后执行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='每批处理的岗位数量（默认1000）',
+        )
+
+    def handle(self, *args, **options):
+        total = regions.rebuild_locations(JobInfo, batch_size=options['batch_size'])
+        bump_data_version()
+
+        self.stdout.write(self.style.SUCCESS(f'成功解析 {total} 个岗位的工作地点'))
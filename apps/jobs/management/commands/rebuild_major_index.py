@@ -0,0 +1,64 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs import majors
+from apps.jobs.models import JobInfo
+
+
+def _parse_batch(rows):
+    """子进程中解析一批 (job_id, major_requirement)"""
+    return [(job_id, *majors.parse_major_requirement(text)) for job_id, text in rows]
+
+
+class Command(BaseCommand):
+    help = '解析岗位专业要求，重建专业字典和岗位专业关联'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='每批处理的岗位数量（默认1000）',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='解析专业要求的进程数（默认为CPU核数）',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rows = JobInfo.objects.order_by('id').values_list('id', 'major_requirement')
+
+        def batches():
+            last_id = 0
+            while True:
+                batch = list(rows.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    return
+                last_id = batch[-1][0]
+                yield batch
+
+        # 解析在多个进程中并行进行，写入数据库仍在主进程中按批次执行；
+        # 同时在途的批次数有上限，避免一次把全部岗位读入内存
+        workers = max(1, options['workers'])
+        total = 0
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for batch in batches():
+                pending.append(executor.submit(_parse_batch, batch))
+                if len(pending) >= workers * 2:
+                    total += self.write(pending.popleft().result(), total)
+            while pending:
+                total += self.write(pending.popleft().result(), total)
+
+        self.stdout.write(self.style.SUCCESS(f'成功重建 {total} 个岗位的专业索引'))
+
+    def write(self, parsed, total):
+        majors.write_job_majors(parsed)
+        self.stdout.write(f'已处理 {total + len(parsed)} 个岗位')
+        return len(parsed)
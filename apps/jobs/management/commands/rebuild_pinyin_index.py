@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs import pinyin, search
+from apps.jobs.cache import bump_data_version
+from apps.jobs.models import JobInfo
+
+
+class Command(BaseCommand):
+    help = '重新生成岗位名称、招聘单位的拼音检索词，并重建全文索引（更新拼音表后执行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='每批处理的岗位数量（默认1000）',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = pinyin.rebuild_search_pinyin(JobInfo, batch_size=batch_size)
+        search.rebuild_index(JobInfo.objects.all(), batch_size=batch_size)
+        bump_data_version()
+
+        self.stdout.write(self.style.SUCCESS(f'成功生成 {total} 个岗位的拼音检索词'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs import positions
+from apps.jobs.cache import bump_data_version
+from apps.jobs.models import JobInfo
+from apps.jobs.stats import rebuild_category_stats
+
+
+class Command(BaseCommand):
+    help = '重新解析岗位招聘人数，并重建分类统计中的招聘人数'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='每批处理的岗位数量（默认1000）',
+        )
+
+    def handle(self, *args, **options):
+        total = positions.rebuild_position_counts(JobInfo, batch_size=options['batch_size'])
+        rebuild_category_stats()
+        bump_data_version()
+
+        self.stdout.write(self.style.SUCCESS(f'成功解析 {total} 个岗位的招聘人数'))
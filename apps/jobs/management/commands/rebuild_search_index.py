@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from apps.jobs import search
+from apps.jobs.models import JobInfo
+
+
+class Command(BaseCommand):
+    help = '重建岗位全文检索索引'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='每批处理的岗位数量（默认1000）',
+        )
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            self.stdout.write(self.style.WARNING('当前数据库未建立全文索引表，请先执行 migrate'))
+            return
+
+        total = search.rebuild_index(JobInfo.objects.all(), batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'成功重建 {total} 个岗位的全文索引'))
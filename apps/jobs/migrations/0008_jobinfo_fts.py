@@ -0,0 +1,42 @@
+# Generated manually for JobInfo full-text search index
+
+from django.db import migrations
+
+from apps.jobs import search
+
+
+def create_fts_index(apps, schema_editor):
+    search.create_index(schema_editor)
+    if schema_editor.connection.vendor not in ('sqlite', 'postgresql'):
+        return
+
+    JobInfo = apps.get_model('jobs', 'JobInfo')
+    rows = JobInfo.objects.values_list(
+        'id', 'job_title', 'job_responsibilities', 'major_requirement',
+        'degree_requirement', 'job_post__title',
+    ).order_by('id').iterator(chunk_size=1000)
+
+    batch = []
+    with schema_editor.connection.cursor() as cursor:
+        for job_id, *fields in rows:
+            batch.append((job_id, search.build_document(*fields)))
+            if len(batch) >= 1000:
+                search.write_documents(cursor, batch)
+                batch = []
+        if batch:
+            search.write_documents(cursor, batch)
+
+
+def drop_fts_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_jobpost_html_text_jobpost_source_url'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
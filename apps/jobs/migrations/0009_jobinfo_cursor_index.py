@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_jobinfo_fts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobpost',
+            name='html_text',
+            field=models.TextField(blank=True, null=True, verbose_name='招聘公告正文(html文本)'),
+        ),
+        migrations.AddIndex(
+            model_name='jobinfo',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='jobinfo_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:28
+
+from django.db import migrations, models
+
+from apps.jobs.stats import rebuild_category_stats
+
+
+def build_category_stats(apps, schema_editor):
+    rebuild_category_stats(
+        post_model=apps.get_model('jobs', 'JobPost'),
+        stats_model=apps.get_model('jobs', 'CategoryStats'),
+        daily_model=apps.get_model('jobs', 'CategoryDailyStats'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_jobinfo_cursor_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('公务员', '公务员'), ('事业单位', '事业单位'), ('教师招聘', '教师招聘'), ('医疗招聘', '医疗招聘'), ('银行招聘', '银行招聘'), ('国企招聘', '国企招聘'), ('三支一扶', '三支一扶'), ('招警', '招警'), ('选调生', '选调生'), ('大学生村官', '大学生村官'), ('公选遴选', '公选遴选'), ('基层工作者', '基层工作者'), ('军队文职', '军队文职'), ('公益性岗位', '公益性岗位')], max_length=50, unique=True, verbose_name='招聘分类')),
+                ('post_count', models.IntegerField(default=0, verbose_name='有效公告数')),
+                ('job_count', models.IntegerField(default=0, verbose_name='有效岗位数')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '招聘分类统计',
+                'verbose_name_plural': '招聘分类统计',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('公务员', '公务员'), ('事业单位', '事业单位'), ('教师招聘', '教师招聘'), ('医疗招聘', '医疗招聘'), ('银行招聘', '银行招聘'), ('国企招聘', '国企招聘'), ('三支一扶', '三支一扶'), ('招警', '招警'), ('选调生', '选调生'), ('大学生村官', '大学生村官'), ('公选遴选', '公选遴选'), ('基层工作者', '基层工作者'), ('军队文职', '军队文职'), ('公益性岗位', '公益性岗位')], max_length=50, verbose_name='招聘分类')),
+                ('date', models.DateField(verbose_name='日期')),
+                ('post_count', models.IntegerField(default=0, verbose_name='有效公告数')),
+                ('job_count', models.IntegerField(default=0, verbose_name='有效岗位数')),
+            ],
+            options={
+                'verbose_name': '招聘分类每日统计',
+                'verbose_name_plural': '招聘分类每日统计',
+                'unique_together': {('category', 'date')},
+            },
+        ),
+        migrations.RunPython(build_category_stats, migrations.RunPython.noop),
+    ]
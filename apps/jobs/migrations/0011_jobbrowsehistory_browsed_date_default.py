@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:30
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_categorystats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobbrowsehistory',
+            name='browsed_date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:30
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.utils.timezone
+
+
+def merge_duplicate_history(apps, schema_editor):
+    """合并同一求职者对同一岗位的多条浏览记录，保留最近一条并累计浏览次数"""
+    JobBrowseHistory = apps.get_model('jobs', 'JobBrowseHistory')
+    duplicates = (
+        JobBrowseHistory.objects.values('job_seeker_id', 'job_info_id')
+        .annotate(total=Count('id'), latest_id=Max('id'))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for row in duplicates.iterator():
+        rows = JobBrowseHistory.objects.filter(
+            job_seeker_id=row['job_seeker_id'], job_info_id=row['job_info_id']
+        )
+        latest = rows.order_by('-last_browsed', '-id').first()
+        rows.exclude(id=latest.id).delete()
+        JobBrowseHistory.objects.filter(id=latest.id).update(view_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_emailsendratelimit'),
+        ('jobs', '0011_jobbrowsehistory_browsed_date_default'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='jobbrowsehistory',
+            options={'ordering': ['-last_browsed']},
+        ),
+        migrations.RemoveIndex(
+            model_name='jobbrowsehistory',
+            name='jobs_jobbro_job_see_2d0b57_idx',
+        ),
+        migrations.RenameField(
+            model_name='jobbrowsehistory',
+            old_name='browsed_date',
+            new_name='last_browsed',
+        ),
+        migrations.AlterField(
+            model_name='jobbrowsehistory',
+            name='last_browsed',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='最近浏览时间'),
+        ),
+        migrations.AddField(
+            model_name='jobbrowsehistory',
+            name='view_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='浏览次数'),
+        ),
+        migrations.RunPython(merge_duplicate_history, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='jobbrowsehistory',
+            unique_together={('job_seeker', 'job_info')},
+        ),
+        migrations.AddIndex(
+            model_name='jobbrowsehistory',
+            index=models.Index(fields=['job_seeker', '-last_browsed'], name='browsehistory_seeker_last_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobbrowsehistory',
+            index=models.Index(fields=['last_browsed'], name='browsehistory_last_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+from apps.jobs.models import AGE_RANKS, DEGREE_RANKS, EXPERIENCE_RANKS
+
+
+def backfill_eligibility_ranks(apps, schema_editor):
+    JobInfo = apps.get_model('jobs', 'JobInfo')
+    for level, rank in DEGREE_RANKS.items():
+        JobInfo.objects.filter(min_degree_level=level).update(min_degree_rank=rank)
+    for level, rank in AGE_RANKS.items():
+        JobInfo.objects.filter(max_age_level=level).update(max_age_rank=rank)
+    for level, rank in EXPERIENCE_RANKS.items():
+        JobInfo.objects.filter(min_job_experience_level=level).update(min_experience_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_jobbrowsehistory_dedupe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobinfo',
+            name='max_age_rank',
+            field=models.PositiveSmallIntegerField(default=999, verbose_name='年龄上限'),
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='min_degree_rank',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='最低学历等级'),
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='min_experience_rank',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='最低工作年限'),
+        ),
+        migrations.RunPython(backfill_eligibility_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='jobinfo',
+            index=models.Index(fields=['is_active', 'min_degree_rank', 'max_age_rank', 'min_experience_rank'], name='jobinfo_eligibility_idx'),
+        ),
+    ]
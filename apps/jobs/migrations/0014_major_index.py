@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_jobinfo_eligibility_ranks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Major',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='专业名称')),
+            ],
+            options={
+                'verbose_name': '专业',
+                'verbose_name_plural': '专业',
+            },
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='major_unrestricted',
+            field=models.BooleanField(default=False, verbose_name='是否不限专业'),
+        ),
+        migrations.CreateModel(
+            name='JobInfoMajor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_info', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='major_links', to='jobs.jobinfo')),
+                ('major', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_links', to='jobs.major')),
+            ],
+            options={
+                'verbose_name': '岗位专业',
+                'verbose_name_plural': '岗位专业',
+                'unique_together': {('major', 'job_info')},
+            },
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='majors',
+            field=models.ManyToManyField(blank=True, related_name='jobs', through='jobs.JobInfoMajor', to='jobs.major', verbose_name='专业'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:44
+
+from django.db import migrations, models
+
+from apps.jobs.regions import rebuild_locations
+
+
+def backfill_locations(apps, schema_editor):
+    rebuild_locations(apps.get_model('jobs', 'JobInfo'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_major_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobinfo',
+            name='location_city_code',
+            field=models.CharField(blank=True, default='', max_length=6, verbose_name='工作地点地级代码'),
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='location_district',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='工作地点区县'),
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='location_province_code',
+            field=models.CharField(blank=True, default='', max_length=6, verbose_name='工作地点省级代码'),
+        ),
+        migrations.RunPython(backfill_locations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='jobinfo',
+            index=models.Index(fields=['location_province_code', 'is_active'], name='jobinfo_province_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobinfo',
+            index=models.Index(fields=['location_city_code', 'is_active'], name='jobinfo_city_idx'),
+        ),
+    ]
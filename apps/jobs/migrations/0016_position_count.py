@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:46
+
+from django.db import migrations, models
+
+from apps.jobs.positions import rebuild_position_counts
+from apps.jobs.stats import rebuild_category_stats
+
+
+def backfill_position_counts(apps, schema_editor):
+    rebuild_position_counts(apps.get_model('jobs', 'JobInfo'))
+    rebuild_category_stats(
+        post_model=apps.get_model('jobs', 'JobPost'),
+        stats_model=apps.get_model('jobs', 'CategoryStats'),
+        daily_model=apps.get_model('jobs', 'CategoryDailyStats'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_jobinfo_location_codes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categorydailystats',
+            name='position_count',
+            field=models.IntegerField(default=0, verbose_name='招聘人数'),
+        ),
+        migrations.AddField(
+            model_name='categorystats',
+            name='position_count',
+            field=models.IntegerField(default=0, verbose_name='招聘人数'),
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='position_count',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='招聘人数（数值）'),
+        ),
+        migrations.RunPython(backfill_position_counts, migrations.RunPython.noop),
+    ]
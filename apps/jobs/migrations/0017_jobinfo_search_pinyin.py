@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:53
+
+from django.db import migrations, models
+
+from apps.jobs import pinyin, search
+
+
+def backfill_search_pinyin(apps, schema_editor):
+    JobInfo = apps.get_model('jobs', 'JobInfo')
+    pinyin.rebuild_search_pinyin(JobInfo)
+    if search.FTS_TABLE not in schema_editor.connection.introspection.table_names():
+        return
+
+    # 拼音检索词写入全文索引
+    rows = JobInfo.objects.values_list(
+        'id', 'job_title', 'job_responsibilities', 'major_requirement',
+        'degree_requirement', 'job_post__title', 'search_pinyin',
+    ).order_by('id').iterator(chunk_size=1000)
+
+    batch = []
+    with schema_editor.connection.cursor() as cursor:
+        for job_id, *fields in rows:
+            batch.append((job_id, search.build_document(*fields)))
+            if len(batch) >= 1000:
+                search.write_documents(cursor, batch)
+                batch = []
+        if batch:
+            search.write_documents(cursor, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_position_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobinfo',
+            name='search_pinyin',
+            field=models.TextField(blank=True, default='', verbose_name='拼音检索词'),
+        ),
+        migrations.RunPython(backfill_search_pinyin, migrations.RunPython.noop),
+    ]
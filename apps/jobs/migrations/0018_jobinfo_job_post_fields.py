@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:55
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_job_post_fields(apps, schema_editor):
+    JobInfo = apps.get_model('jobs', 'JobInfo')
+    JobPost = apps.get_model('jobs', 'JobPost')
+    job_post = JobPost.objects.filter(id=OuterRef('job_post_id'))
+    JobInfo.objects.update(
+        post_category=Subquery(job_post.values('category')[:1]),
+        post_application_end_date=Subquery(job_post.values('application_end_date')[:1]),
+        post_is_active=Subquery(job_post.values('is_active')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_jobinfo_search_pinyin'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='jobinfo',
+            name='jobinfo_active_created_idx',
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='post_application_end_date',
+            field=models.DateField(blank=True, null=True, verbose_name='公告报名截止时间'),
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='post_category',
+            field=models.CharField(blank=True, choices=[('公务员', '公务员'), ('事业单位', '事业单位'), ('教师招聘', '教师招聘'), ('医疗招聘', '医疗招聘'), ('银行招聘', '银行招聘'), ('国企招聘', '国企招聘'), ('三支一扶', '三支一扶'), ('招警', '招警'), ('选调生', '选调生'), ('大学生村官', '大学生村官'), ('公选遴选', '公选遴选'), ('基层工作者', '基层工作者'), ('军队文职', '军队文职'), ('公益性岗位', '公益性岗位')], max_length=50, null=True, verbose_name='公告分类'),
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='post_is_active',
+            field=models.BooleanField(default=True, verbose_name='公告是否有效'),
+        ),
+        migrations.RunPython(copy_job_post_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='jobinfo',
+            index=models.Index(fields=['is_active', 'post_is_active', '-created_at', '-id'], name='jobinfo_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobinfo',
+            index=models.Index(fields=['is_active', 'post_category', '-created_at'], name='jobinfo_post_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobinfo',
+            index=models.Index(fields=['is_active', 'post_application_end_date'], name='jobinfo_post_deadline_idx'),
+        ),
+    ]
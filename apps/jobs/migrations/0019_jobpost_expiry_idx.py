@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_jobinfo_job_post_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['application_end_date'], name='jobpost_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:02
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def clear_duplicate_source_urls(apps, schema_editor):
+    """空链接改为 NULL；同一链接的多个公告只保留最新的一个，其余清空链接"""
+    JobPost = apps.get_model('jobs', 'JobPost')
+    JobPost.objects.filter(source_url='').update(source_url=None)
+    duplicates = (
+        JobPost.objects.exclude(source_url__isnull=True).order_by().values('source_url')
+        .annotate(count=Count('id'), latest_id=Max('id')).filter(count__gt=1)
+    )
+    for row in duplicates:
+        JobPost.objects.filter(source_url=row['source_url']).exclude(id=row['latest_id']).update(source_url=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0019_jobpost_expiry_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_source_urls, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='jobpost',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='导入内容摘要'),
+        ),
+        migrations.AlterField(
+            model_name='jobpost',
+            name='source_url',
+            field=models.CharField(blank=True, max_length=512, null=True, unique=True, verbose_name='招聘公告详情链接'),
+        ),
+    ]
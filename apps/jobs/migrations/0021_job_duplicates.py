@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0020_jobpost_source_url_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSignature',
+            fields=[
+                ('job_info', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='jobs.jobinfo')),
+                ('signature', models.BinaryField(verbose_name='MinHash 签名')),
+            ],
+            options={
+                'verbose_name': '岗位签名',
+                'verbose_name_plural': '岗位签名',
+            },
+        ),
+        migrations.AddField(
+            model_name='jobinfo',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='jobs.jobinfo', verbose_name='重复的岗位'),
+        ),
+        migrations.CreateModel(
+            name='JobSignatureBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True, verbose_name='分段哈希')),
+                ('job_info', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signature_bands', to='jobs.jobinfo')),
+            ],
+            options={
+                'verbose_name': '岗位签名分段',
+                'verbose_name_plural': '岗位签名分段',
+            },
+        ),
+    ]
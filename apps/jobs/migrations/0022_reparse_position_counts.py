@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:10
+
+from django.db import migrations
+
+from apps.jobs.positions import rebuild_position_counts
+from apps.jobs.stats import rebuild_category_stats
+
+
+def reparse_position_counts(apps, schema_editor):
+    # 年份等数字不再计入招聘人数，重新解析已有岗位并重建分类统计
+    rebuild_position_counts(apps.get_model('jobs', 'JobInfo'))
+    rebuild_category_stats(
+        post_model=apps.get_model('jobs', 'JobPost'),
+        stats_model=apps.get_model('jobs', 'CategoryStats'),
+        daily_model=apps.get_model('jobs', 'CategoryDailyStats'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0021_job_duplicates'),
+    ]
+
+    operations = [
+        migrations.RunPython(reparse_position_counts, migrations.RunPython.noop),
+    ]
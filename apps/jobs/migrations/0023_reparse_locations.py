@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:40
+
+from django.db import migrations
+
+from apps.jobs.regions import rebuild_locations
+
+
+def reparse_locations(apps, schema_editor):
+    # 区县名称改为归一化形式，并修正"吉林市""苏州工业园区"等地点的解析结果
+    rebuild_locations(apps.get_model('jobs', 'JobInfo'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0022_reparse_position_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(reparse_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:10
+
+from django.db import migrations
+from django.db.models import Q
+
+from apps.jobs.majors import parse_major_requirement, write_job_majors
+
+
+def reparse_majors(apps, schema_editor):
+    # "包括但不限于……"不再视为不限专业，重新解析专业要求中含"不限"或"包括"的岗位
+    JobInfo = apps.get_model('jobs', 'JobInfo')
+    rows = (
+        JobInfo.objects.filter(Q(major_requirement__contains='不限') | Q(major_requirement__contains='包括'))
+        .order_by('id').values_list('id', 'major_requirement')
+    )
+    last_id = 0
+    while True:
+        batch = list(rows.filter(id__gt=last_id)[:1000])
+        if not batch:
+            return
+        write_job_majors(
+            [(job_id, *parse_major_requirement(text)) for job_id, text in batch],
+            job_model=JobInfo,
+            link_model=apps.get_model('jobs', 'JobInfoMajor'),
+            major_model=apps.get_model('jobs', 'Major'),
+        )
+        last_id = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0023_reparse_locations'),
+    ]
+
+    operations = [
+        migrations.RunPython(reparse_majors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:50
+
+from django.db import migrations
+
+from apps.jobs.stats import rebuild_category_stats
+
+
+def rebuild_stats(apps, schema_editor):
+    # 转载岗位不再计入分类统计，按新口径重建
+    rebuild_category_stats(
+        post_model=apps.get_model('jobs', 'JobPost'),
+        stats_model=apps.get_model('jobs', 'CategoryStats'),
+        daily_model=apps.get_model('jobs', 'CategoryDailyStats'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0024_reparse_major_unrestricted'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_stats, migrations.RunPython.noop),
+    ]
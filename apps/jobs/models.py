@@ -1,7 +1,12 @@
 from django.db import models
+from django.db.models import Q, Value
+from django.utils import timezone
+from datetime import timedelta
 from apps.accounts.models import Employer, JobSeeker
 from enum import Enum
 
+from . import pinyin, positions, regions
+
 
 # 枚举类型定义
 class PublicInstitutionJobCategory(str, Enum):
@@ -43,6 +48,26 @@ class JobExperienceLevel(str, Enum):
     Y_10 = "10年以上"
 
 
+# 任职资格要求的整数等级，用于范围查询（"要求不高于我的学历"）
+# 学历：按 DegreeLevel 定义顺序，数值越大要求越高
+DEGREE_RANKS = {level.value: rank for rank, level in enumerate(DegreeLevel)}
+# 年龄：年龄上限（周岁），不限时使用 AGE_RANK_UNLIMITED
+AGE_RANK_UNLIMITED = 999
+AGE_RANKS = {
+    level.value: AGE_RANK_UNLIMITED if level is AgeLevel.NONE else int(level.name.split('_')[1])
+    for level in AgeLevel
+}
+# 工作经验：最低工作年限，应届生岗位不要求工作经验，按 0 年处理
+EXPERIENCE_RANKS = {
+    JobExperienceLevel.NONE.value: 0,
+    JobExperienceLevel.NEW_GRAD.value: 0,
+    JobExperienceLevel.Y_1.value: 1,
+    JobExperienceLevel.Y_3.value: 3,
+    JobExperienceLevel.Y_5.value: 5,
+    JobExperienceLevel.Y_10.value: 10,
+}
+
+
 class JobPostCategory(str, Enum):
     CIVIL_SERVANT = "公务员"
     PUBLIC_INSTITUTION = "事业单位"
@@ -63,7 +88,8 @@ class JobPostCategory(str, Enum):
 class JobPost(models.Model):
     """招聘公告模型"""
     title = models.CharField(max_length=200, verbose_name="招聘公告标题")
-    source_url = models.CharField(max_length=512, verbose_name="招聘公告详情链接", blank=True, null=True)
+    # 重复抓取同一公告时按链接更新（见 importer.py），没有链接的公告为 NULL，不参与唯一约束
+    source_url = models.CharField(max_length=512, unique=True, verbose_name="招聘公告详情链接", blank=True, null=True)
     html_text = models.TextField(null=True, blank=True, verbose_name="招聘公告正文(html文本)")
     publish_date = models.DateField(null=True, blank=True, verbose_name="公告发布时间")
     organization = models.CharField(max_length=200, null=True, blank=True, verbose_name="招聘单位名称")
@@ -76,6 +102,8 @@ class JobPost(models.Model):
         blank=True,
         verbose_name="招聘分类"
     )
+    # 导入数据（公告及其岗位）的摘要，重新导入时内容未变化的公告直接跳过
+    content_hash = models.CharField(max_length=64, blank=True, default='', verbose_name="导入内容摘要")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
     is_active = models.BooleanField(default=True, verbose_name="是否有效")
@@ -84,15 +112,98 @@ class JobPost(models.Model):
         ordering = ['-publish_date', '-created_at']
         verbose_name = "招聘公告"
         verbose_name_plural = "招聘公告"
+        indexes = [
+            # 过期公告下线（expiry.py）：只索引有效公告，已下线的公告不占索引
+            models.Index(fields=['application_end_date'], condition=Q(is_active=True), name='jobpost_expiry_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class Major(models.Model):
+    """规范化的专业名称字典（由岗位专业要求解析得到）"""
+    name = models.CharField(max_length=100, unique=True, verbose_name="专业名称")
+
+    class Meta:
+        verbose_name = "专业"
+        verbose_name_plural = "专业"
+
+    def __str__(self):
+        return self.name
+
+
+# JobInfo 上冗余保存的公告字段：JobInfo 字段 -> JobPost 字段
+JOB_POST_FIELDS = {
+    'post_category': 'category',
+    'post_application_end_date': 'application_end_date',
+    'post_is_active': 'is_active',
+}
+
+
+class JobInfoQuerySet(models.QuerySet):
+    # 列表卡片不展示的大文本字段
+    LISTING_DEFERRED_FIELDS = (
+        'targeted_recruitment_scope',
+        'registration_materials',
+        'job_experience_requirement',
+        'job_skill_requirements',
+        'certificate_requirement',
+        'other_requirement',
+        'job_responsibilities',
+        'salary_and_benefits',
+        'search_pinyin',
+        'job_post__html_text',
+    )
+
+    def active(self):
+        """
+        有效岗位：岗位本身和所属公告都有效（公告状态冗余在 post_is_active，无需连接公告表），
+        且不是其他岗位的转载
+        """
+        # is_active=True 在 SQLite 下生成不带比较的布尔条件，无法按索引定位；
+        # 使用 Value(True) 生成等值比较，列表查询可以直接走 jobinfo_listing_idx 的有序范围
+        return self.filter(is_active=Value(True), post_is_active=Value(True), duplicate_of__isnull=True)
+
+    def sync_job_post_fields(self, job_post):
+        """公告更新后把冗余字段批量写入其下岗位，只更新与公告不一致的岗位"""
+        values = {field: getattr(job_post, post_field) for field, post_field in JOB_POST_FIELDS.items()}
+        return self.filter(job_post=job_post).exclude(**values).update(**values)
+
+    def for_listing(self):
+        """岗位列表卡片使用的查询：关联查询所属公告，并延迟加载卡片不展示的大文本字段"""
+        return self.select_related('job_post').defer(*self.LISTING_DEFERRED_FIELDS)
+
+    def eligible_for(self, job_seeker):
+        """
+        筛选求职者符合学历、年龄、工作经验要求的岗位
+
+        求职者未填写的条件不参与筛选。
+        """
+        queryset = self
+        if job_seeker.degree_level in DEGREE_RANKS:
+            queryset = queryset.filter(min_degree_rank__lte=DEGREE_RANKS[job_seeker.degree_level])
+        if job_seeker.age is not None:
+            queryset = queryset.filter(max_age_rank__gte=job_seeker.age)
+        if job_seeker.work_experience_years is not None:
+            queryset = queryset.filter(min_experience_rank__lte=job_seeker.work_experience_years)
+        return queryset
+
+
 class JobInfo(models.Model):
     """岗位信息模型"""
     # 基本信息
     job_post = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='jobs', verbose_name="所属招聘公告")
+    # 冗余保存的公告字段（见 JOB_POST_FIELDS），列表筛选无需连接公告表，公告更新时批量同步
+    post_category = models.CharField(
+        max_length=50,
+        choices=[(tag.value, tag.value) for tag in JobPostCategory],
+        null=True,
+        blank=True,
+        verbose_name="公告分类"
+    )
+    post_application_end_date = models.DateField(null=True, blank=True, verbose_name="公告报名截止时间")
+    post_is_active = models.BooleanField(default=True, verbose_name="公告是否有效")
     organization = models.CharField(max_length=200, null=True, blank=True, verbose_name="招聘单位名称")
     job_title = models.CharField(max_length=200, null=True, blank=True, verbose_name="岗位名称")
     employment_type = models.CharField(max_length=100, null=True, blank=True, verbose_name="用工方式")
@@ -105,7 +216,13 @@ class JobInfo(models.Model):
         verbose_name="岗位类别"
     )
     job_location = models.CharField(max_length=200, null=True, blank=True, verbose_name="工作地点")
+    # 由 job_location 解析得到的行政区划（见 regions.py），保存时同步
+    location_province_code = models.CharField(max_length=6, blank=True, default='', verbose_name="工作地点省级代码")
+    location_city_code = models.CharField(max_length=6, blank=True, default='', verbose_name="工作地点地级代码")
+    location_district = models.CharField(max_length=50, blank=True, default='', verbose_name="工作地点区县")
     num_positions = models.CharField(max_length=50, null=True, blank=True, verbose_name="招聘人数")
+    # 由 num_positions 解析得到（见 positions.py），为空表示人数不确定（如"若干"）
+    position_count = models.PositiveIntegerField(null=True, blank=True, verbose_name="招聘人数（数值）")
     is_targeted_recruitment = models.BooleanField(null=True, blank=True, verbose_name="是否是定向招聘")
     targeted_recruitment_scope = models.TextField(null=True, blank=True, verbose_name="定向招聘范围")
     registration_methods = models.CharField(max_length=200, null=True, blank=True, verbose_name="报名方式")
@@ -129,6 +246,9 @@ class JobInfo(models.Model):
         verbose_name="最低学历要求"
     )
     major_requirement = models.TextField(null=True, blank=True, verbose_name="专业要求")
+    # 由 major_requirement 解析得到（见 majors.py），保存时同步；major_unrestricted 是派生字段
+    majors = models.ManyToManyField(Major, through='JobInfoMajor', related_name='jobs', blank=True, verbose_name="专业")
+    major_unrestricted = models.BooleanField(default=False, verbose_name="是否不限专业")
     age_requirement = models.CharField(max_length=100, null=True, blank=True, verbose_name="年龄要求")
     max_age_level = models.CharField(
         max_length=20,
@@ -149,19 +269,124 @@ class JobInfo(models.Model):
     job_responsibilities = models.TextField(null=True, blank=True, verbose_name="岗位职责")
     salary_and_benefits = models.TextField(null=True, blank=True, verbose_name="薪资待遇")
 
+    # 任职资格等级（由 min_degree_level、max_age_level、min_job_experience_level 派生，保存时同步）
+    min_degree_rank = models.PositiveSmallIntegerField(default=0, verbose_name="最低学历等级")
+    max_age_rank = models.PositiveSmallIntegerField(default=AGE_RANK_UNLIMITED, verbose_name="年龄上限")
+    min_experience_rank = models.PositiveSmallIntegerField(default=0, verbose_name="最低工作年限")
+
+    # 岗位名称、招聘单位的拼音和首字母检索词（由 pinyin.build_search_keys 生成）
+    search_pinyin = models.TextField(blank=True, default='', verbose_name="拼音检索词")
+
+    # 其他网站转载的同一岗位指向最早导入的岗位（见 dedup.py），不在列表和搜索结果中重复出现
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates',
+        verbose_name="重复的岗位"
+    )
+
     # 系统字段
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
     is_active = models.BooleanField(default=True, verbose_name="是否有效")
 
+    objects = JobInfoQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "岗位信息"
         verbose_name_plural = "岗位信息"
+        indexes = [
+            # 岗位列表游标分页
+            models.Index(fields=['is_active', 'post_is_active', '-created_at', '-id'], name='jobinfo_listing_idx'),
+            # 按公告分类筛选、按报名截止时间筛选
+            models.Index(fields=['is_active', 'post_category', '-created_at'], name='jobinfo_post_category_idx'),
+            models.Index(fields=['is_active', 'post_application_end_date'], name='jobinfo_post_deadline_idx'),
+            # "我符合条件的岗位"筛选
+            models.Index(fields=['is_active', 'min_degree_rank', 'max_age_rank', 'min_experience_rank'],
+                         name='jobinfo_eligibility_idx'),
+            # 按省、市筛选工作地点
+            models.Index(fields=['location_province_code', 'is_active'], name='jobinfo_province_idx'),
+            models.Index(fields=['location_city_code', 'is_active'], name='jobinfo_city_idx'),
+        ]
+
+    # 保存时由其他字段派生的字段
+    DERIVED_FIELDS = (
+        'min_degree_rank', 'max_age_rank', 'min_experience_rank',
+        'location_province_code', 'location_city_code', 'location_district',
+        'position_count', 'search_pinyin', 'major_unrestricted',
+        *JOB_POST_FIELDS,
+    )
 
     def __str__(self):
         return self.job_title or f"岗位-{self.id}"
 
+    def sync_eligibility_ranks(self):
+        """根据学历、年龄、工作经验要求计算整数等级"""
+        self.min_degree_rank = DEGREE_RANKS.get(self.min_degree_level, 0)
+        self.max_age_rank = AGE_RANKS.get(self.max_age_level, AGE_RANK_UNLIMITED)
+        self.min_experience_rank = EXPERIENCE_RANKS.get(self.min_job_experience_level, 0)
+
+    def sync_location(self):
+        """解析工作地点的省、市代码和区县名称"""
+        (self.location_province_code,
+         self.location_city_code,
+         self.location_district) = regions.parse_location(self.job_location)
+
+    def sync_job_post_fields(self):
+        """从所属公告复制冗余字段"""
+        job_post = self.job_post
+        for field, post_field in JOB_POST_FIELDS.items():
+            setattr(self, field, getattr(job_post, post_field))
+
+    def sync_derived_fields(self):
+        """计算 DERIVED_FIELDS（save() 时自动调用，bulk_create 前需手动调用）"""
+        self.sync_job_post_fields()
+        self.sync_eligibility_ranks()
+        self.sync_location()
+        self.position_count = positions.parse_position_count(self.num_positions)
+        self.search_pinyin = pinyin.build_search_keys(self.job_title, self.organization)
+        # majors 模块导入了本模块，在方法内导入避免循环导入
+        from .majors import parse_major_requirement
+        self.major_unrestricted = parse_major_requirement(self.major_requirement)[1]
+
+    def save(self, *args, **kwargs):
+        self.sync_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *self.DERIVED_FIELDS}
+        super().save(*args, **kwargs)
+
+
+class JobInfoMajor(models.Model):
+    """岗位与专业的关联"""
+    job_info = models.ForeignKey(JobInfo, on_delete=models.CASCADE, related_name='major_links')
+    major = models.ForeignKey(Major, on_delete=models.CASCADE, related_name='job_links')
+
+    class Meta:
+        # 唯一索引以 major 开头，按专业查岗位时直接走索引
+        unique_together = ('major', 'job_info')
+        verbose_name = "岗位专业"
+        verbose_name_plural = "岗位专业"
+
+
+class JobSignature(models.Model):
+    """岗位文本的 MinHash 签名，用于估计两个岗位的相似度（见 dedup.py）"""
+    job_info = models.OneToOneField(JobInfo, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    signature = models.BinaryField(verbose_name="MinHash 签名")
+
+    class Meta:
+        verbose_name = "岗位签名"
+        verbose_name_plural = "岗位签名"
+
+
+class JobSignatureBand(models.Model):
+    """MinHash 签名分段（LSH）的哈希，相同哈希的岗位是疑似重复的候选"""
+    job_info = models.ForeignKey(JobInfo, on_delete=models.CASCADE, related_name='signature_bands')
+    key = models.BigIntegerField(db_index=True, verbose_name="分段哈希")
+
+    class Meta:
+        verbose_name = "岗位签名分段"
+        verbose_name_plural = "岗位签名分段"
+
 
 class Application(models.Model):
     STATUS_CHOICES = [
@@ -204,18 +429,85 @@ class JobBookmark(models.Model):
 class JobBrowseHistory(models.Model):
     """
     Model to track job browsing history for job seekers
+
+    每个求职者对每个岗位只保留一条记录，重复浏览时累加 view_count 并更新 last_browsed。
     """
     job_info = models.ForeignKey(JobInfo, on_delete=models.CASCADE, related_name='browse_history')
     job_seeker = models.ForeignKey(JobSeeker, on_delete=models.CASCADE, related_name='browse_history')
-    browsed_date = models.DateTimeField(auto_now_add=True)
+    last_browsed = models.DateTimeField(default=timezone.now, verbose_name="最近浏览时间")
+    view_count = models.PositiveIntegerField(default=1, verbose_name="浏览次数")
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
 
     class Meta:
-        ordering = ['-browsed_date']
+        ordering = ['-last_browsed']
+        unique_together = ('job_seeker', 'job_info')
         indexes = [
-            models.Index(fields=['job_seeker', '-browsed_date']),
+            models.Index(fields=['job_seeker', '-last_browsed'], name='browsehistory_seeker_last_idx'),
+            # 按保留期限清理过期记录
+            models.Index(fields=['last_browsed'], name='browsehistory_last_idx'),
         ]
 
     def __str__(self):
-        return f"{self.job_seeker.user.username} - {self.job_info.job_title} (浏览于 {self.browsed_date.strftime('%Y-%m-%d %H:%M')})"
+        return f"{self.job_seeker.user.username} - {self.job_info.job_title} (浏览于 {self.last_browsed.strftime('%Y-%m-%d %H:%M')})"
+
+    @classmethod
+    def purge_expired(cls, days, batch_size=1000):
+        """
+        分批删除超过保留期限未再浏览的记录
+
+        每批按ID删除 batch_size 条，避免长时间锁表。
+
+        Returns:
+            int: 删除的记录数
+        """
+        cutoff_date = timezone.now() - timedelta(days=days)
+        total = 0
+        while True:
+            ids = list(cls.objects.filter(last_browsed__lt=cutoff_date).order_by().values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return total
+            deleted_count, _ = cls.objects.filter(id__in=ids).delete()
+            total += deleted_count
+
+
+class CategoryStats(models.Model):
+    """招聘分类统计（物化表，随公告和岗位的增删改增量维护）"""
+    category = models.CharField(
+        max_length=50,
+        unique=True,
+        choices=[(tag.value, tag.value) for tag in JobPostCategory],
+        verbose_name="招聘分类"
+    )
+    post_count = models.IntegerField(default=0, verbose_name="有效公告数")
+    job_count = models.IntegerField(default=0, verbose_name="有效岗位数")
+    position_count = models.IntegerField(default=0, verbose_name="招聘人数")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    class Meta:
+        verbose_name = "招聘分类统计"
+        verbose_name_plural = "招聘分类统计"
+
+    def __str__(self):
+        return f"{self.category} ({self.post_count}/{self.job_count})"
+
+
+class CategoryDailyStats(models.Model):
+    """招聘分类按公告创建日期的每日统计，用于近7天和今日新增数量"""
+    category = models.CharField(
+        max_length=50,
+        choices=[(tag.value, tag.value) for tag in JobPostCategory],
+        verbose_name="招聘分类"
+    )
+    date = models.DateField(verbose_name="日期")
+    post_count = models.IntegerField(default=0, verbose_name="有效公告数")
+    job_count = models.IntegerField(default=0, verbose_name="有效岗位数")
+    position_count = models.IntegerField(default=0, verbose_name="招聘人数")
+
+    class Meta:
+        unique_together = ('category', 'date')
+        verbose_name = "招聘分类每日统计"
+        verbose_name_plural = "招聘分类每日统计"
+
+    def __str__(self):
+        return f"{self.category} {self.date} ({self.post_count}/{self.job_count})"
@@ -0,0 +1,153 @@
+"""
+岗位列表分页
+
+默认使用游标（keyset）分页：按 (-created_at, -id) 排序，
+通过上一页最后一条记录的位置定位下一页，不需要 COUNT，也没有 OFFSET，
+翻到多深都只是一次走索引的范围查询。
+传统页码分页仅保留给浅层页面（前 MAX_NUMBERED_PAGES 页）使用。
+关键词检索和页码分页的结果ID列表按搜索条件缓存，翻页时只按ID取当前页数据。
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+JOBS_PER_PAGE = 9
+
+# 页码分页最多允许访问的页数
+MAX_NUMBERED_PAGES = 10
+
+CURSOR_ORDERING = ('-created_at', '-id')
+
+
+def encode_cursor(direction, obj):
+    """将翻页方向和记录位置编码为 URL 安全的游标字符串"""
+    raw = f"{direction}|{obj.created_at.isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解析游标
+
+    Returns:
+        tuple | None: (direction, created_at, id)，游标无效时返回 None
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, created_at, obj_id = raw.split('|')
+        if direction not in ('n', 'p'):
+            return None
+        return direction, datetime.fromisoformat(created_at), int(obj_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class CursorPage:
+    """游标分页结果，接口与 Page 的常用部分保持一致，便于模板复用"""
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor('n', self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor('p', self.object_list[0])
+
+
+def paginate_by_cursor(queryset, cursor, per_page=JOBS_PER_PAGE):
+    """按 (-created_at, -id) 进行游标分页，每页只执行一次查询"""
+    position = decode_cursor(cursor)
+
+    if position is None:
+        rows = list(queryset.order_by(*CURSOR_ORDERING)[:per_page + 1])
+        return CursorPage(rows[:per_page], has_next=len(rows) > per_page, has_previous=False)
+
+    direction, created_at, obj_id = position
+    if direction == 'n':
+        rows = list(
+            queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=obj_id)
+            ).order_by(*CURSOR_ORDERING)[:per_page + 1]
+        )
+        return CursorPage(rows[:per_page], has_next=len(rows) > per_page, has_previous=True)
+
+    rows = list(
+        queryset.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=obj_id)
+        ).order_by('created_at', 'id')[:per_page + 1]
+    )
+    page_rows = rows[:per_page]
+    page_rows.reverse()
+    return CursorPage(page_rows, has_next=True, has_previous=len(rows) > per_page)
+
+
+class CachedResults:
+    """
+    由有序岗位ID列表构成的结果集
+
+    切片时只对当前页的ID执行一次 id__in 查询，并按ID列表的顺序返回。
+    """
+
+    def __init__(self, ids, queryset):
+        self.ids = ids
+        self.queryset = queryset
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            if index < 0:
+                index += len(self.ids)
+            if not 0 <= index < len(self.ids):
+                raise IndexError('结果下标超出范围')
+            return self[index:index + 1][0]
+        page_ids = self.ids[index]
+        objects = {obj.id: obj for obj in self.queryset.filter(id__in=page_ids)}
+        return [objects[obj_id] for obj_id in page_ids if obj_id in objects]
+
+
+class CachedResultsPaginator(Paginator):
+    """
+    对缓存的结果ID列表分页，总数就是ID列表长度，不需要 COUNT 查询
+
+    ID列表最多保存 limit 条，达到上限时视为结果被截断。
+    """
+
+    def __init__(self, ids, queryset, per_page, limit, **kwargs):
+        super().__init__(CachedResults(ids, queryset), per_page, **kwargs)
+        self.limit = limit
+
+    @property
+    def is_truncated(self):
+        """结果数量是否超出了缓存上限"""
+        return self.count >= self.limit
@@ -0,0 +1,96 @@
+"""
+拼音检索词
+
+移动端用户常输入拼音（"jiaoshi"）或拼音首字母（"jsgw"）代替汉字。
+保存岗位时按随项目附带的汉字拼音表（data/pinyin.txt）把岗位名称、招聘单位转换为拼音，
+从每个字开始的后缀分别生成全拼和首字母两种检索词，空格分隔写入 JobInfo.search_pinyin，
+并作为词条写入全文索引：输入中间几个字的拼音（"jiaoshi" 匹配"小学语文教师"）也能按前缀命中索引。
+多音字只取最常用读音，不做词组级消歧。
+"""
+from functools import lru_cache
+from pathlib import Path
+
+PINYIN_FILE = Path(__file__).resolve().parent / 'data' / 'pinyin.txt'
+
+# 每个字段最多转换的字数，以及单个检索词的最大长度（更长的输入按前缀匹配已足够区分）
+MAX_CHARS = 30
+MAX_KEY_LENGTH = 40
+
+
+@lru_cache(maxsize=None)
+def load_pinyin():
+    """读取拼音表，返回 汉字 -> 拼音 的字典"""
+    table = {}
+    with open(PINYIN_FILE, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('#') or not line.strip():
+                continue
+            syllable, chars = line.split()
+            for char in chars:
+                table[char] = syllable
+    return table
+
+
+def to_syllables(text):
+    """
+    将文本转换为音节列表：汉字转为拼音，连续的英文字母和数字作为一个音节，其他字符忽略
+    """
+    table = load_pinyin()
+    syllables = []
+    word = ''
+    for char in (text or '').lower()[:MAX_CHARS]:
+        if char.isascii() and char.isalnum():
+            word += char
+            continue
+        if word:
+            syllables.append(word)
+            word = ''
+        if char in table:
+            syllables.append(table[char])
+    if word:
+        syllables.append(word)
+    return syllables
+
+
+def build_search_keys(*texts):
+    """
+    生成拼音检索词：每个文本从每个音节开始的后缀的全拼和首字母，去重后以空格拼接
+
+    只有一个字母的首字母检索词区分度太低，不生成。
+    """
+    keys = []
+    for text in texts:
+        syllables = to_syllables(text)
+        for start in range(len(syllables)):
+            suffix = syllables[start:]
+            keys.append(''.join(suffix)[:MAX_KEY_LENGTH])
+            initials = ''.join(syllable[0] for syllable in suffix)[:MAX_KEY_LENGTH]
+            if len(initials) > 1:
+                keys.append(initials)
+    return ' '.join(dict.fromkeys(keys))
+
+
+def is_pinyin_query(text):
+    """输入是否可能是拼音或拼音首字母（只包含英文字母）"""
+    text = (text or '').strip()
+    return bool(text) and text.isascii() and text.replace(' ', '').isalpha()
+
+
+def rebuild_search_pinyin(model, batch_size=1000):
+    """
+    按批次重新生成所有岗位的拼音检索词，返回处理的岗位数量
+
+    model 参数供数据迁移传入历史模型使用。
+    """
+    total = 0
+    last_id = 0
+    queryset = model.objects.order_by('id').only('id', 'job_title', 'organization')
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return total
+        for job in batch:
+            job.search_pinyin = build_search_keys(job.job_title, job.organization)
+        model.objects.bulk_update(batch, ['search_pinyin'])
+        total += len(batch)
+        last_id = batch[-1].id
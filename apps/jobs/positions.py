@@ -0,0 +1,81 @@
+"""
+招聘人数解析
+
+num_positions 是自由文本（"3"、"2名"、"若干"、"男1名，女1名"），
+保存时解析为整数 position_count，无法确定人数（如"若干"）时为 None，
+用于按招聘人数排序以及在数据库中汇总公告、分类的招聘人数。
+"""
+import re
+
+_BRACKETS = re.compile(r'[（(【\[].*?[）)】\]]')
+_CHINESE_NUMBER = re.compile(r'[零一二两三四五六七八九十百]+')
+_RANGE = re.compile(r'(\d+)\s*[-~～至到]\s*(\d+)')
+_NUMBER = re.compile(r'\d+')
+# 带"名/人"的人数（可为范围），文本中出现时只统计这些数字
+_COUNT = re.compile(r'(\d+)(?:\s*[-~～至到]\s*(\d+))?\s*[名人]')
+# 年份、日期、年龄等不是人数的数字
+_NOT_COUNT = re.compile(r'(?<!\d)(?:19|20)\d{2}(?!\d)|\d+\s*(?:年|月|日|号|周?岁|届)')
+
+_DIGITS = {'零': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+_UNITS = {'十': 10, '百': 100}
+
+
+def _chinese_to_int(text):
+    """将"十二""二十""一百零五"等中文数字转换为整数"""
+    total = 0
+    digit = 0
+    for char in text:
+        if char in _DIGITS:
+            digit = _DIGITS[char]
+        else:
+            total += (digit or 1) * _UNITS[char]
+            digit = 0
+    return total + digit
+
+
+def parse_position_count(text):
+    """
+    解析招聘人数
+
+    括号中的说明（如"3（男2女1）"）不参与计算；人数范围取上限；
+    多个人数（如"男1名，女1名"）相加。文本中有带"名/人"的数字时只统计这些数字
+    （"2024年招聘3名"为 3），否则忽略年份、日期、年龄等数字后再统计。
+
+    Returns:
+        int | None: 招聘人数，无法确定时返回 None
+    """
+    if not text:
+        return None
+    text = _BRACKETS.sub('', text)
+    text = _CHINESE_NUMBER.sub(lambda match: str(_chinese_to_int(match.group())), text)
+
+    counts = _COUNT.findall(text)
+    if counts:
+        return sum(int(high or low) for low, high in counts)
+
+    text = _NOT_COUNT.sub('', text)
+    ranges = _RANGE.findall(text)
+    if ranges:
+        return sum(int(high) for _, high in ranges)
+    numbers = [int(number) for number in _NUMBER.findall(text)]
+    return sum(numbers) if numbers else None
+
+
+def rebuild_position_counts(model, batch_size=1000):
+    """
+    按批次重新解析所有岗位的招聘人数，返回处理的岗位数量
+
+    model 参数供数据迁移传入历史模型使用。
+    """
+    total = 0
+    last_id = 0
+    queryset = model.objects.order_by('id').only('id', 'num_positions')
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return total
+        for job in batch:
+            job.position_count = parse_position_count(job.num_positions)
+        model.objects.bulk_update(batch, ['position_count'])
+        total += len(batch)
+        last_id = batch[-1].id
@@ -0,0 +1,228 @@
+"""
+工作地点行政区划解析
+
+job_location 是自由文本（如"广州市天河区""广东省广州市""某县县城"），
+按随项目附带的省、地级行政区划表（data/regions.json，GB/T 2260 代码）解析出省代码、市代码和区县名称，
+保存为带索引的字段，按省或市筛选时是等值查询，地点分面计数只需一次 GROUP BY。
+区县级行政区划数量过多未随项目附带，只保存解析出的区县名称：去掉"区""县"等后缀（"天河区""天河"视为同一区县），
+开发区、工业园区等功能区保留全称并补上所属城市简称（"苏州工业园区"）。
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.db.models import Count
+
+REGIONS_FILE = Path(__file__).resolve().parent / 'data' / 'regions.json'
+
+# 简称需要去掉的后缀，按长度从长到短匹配
+_SUFFIXES = ('维吾尔自治区', '壮族自治区', '回族自治区', '特别行政区', '自治区', '自治州', '林区', '地区', '省', '市', '盟')
+# 自治州简称截取到民族名称之前，如"延边朝鲜族自治州"简称"延边"
+_ETHNIC = re.compile(r'(朝鲜|土家|苗|布依|侗|彝|哈尼|壮|傣|白|景颇|傈僳|藏|羌|回|蒙古|柯尔克孜|哈萨克)族?')
+# 区县名称：以区、县、旗或县级市结尾
+_DISTRICT = re.compile(r'([一-龥]{1,10}?(?:自治县|自治旗|区|县|旗|市))')
+_ABBREVIATED_SUFFIX = re.compile(r'^(州|市|地区|盟)')
+# 城市后只剩不带后缀的短名称时视为区县简称，如"广州天河"
+_BARE_DISTRICT = re.compile(r'[一-龥]{2,4}')
+# 不是具体区县的泛称
+_GENERIC_DISTRICTS = {'市区', '城区', '新区', '县城', '下辖县', '各区', '辖区', '各县', '县区', '区县', '全市', '本市', '全区', '全县'}
+# 区县名称去掉的后缀，按长度从长到短匹配
+_DISTRICT_SUFFIXES = ('自治县', '自治旗', '新区', '区', '县', '旗', '市')
+# 以城市命名的功能区（不是行政区县）
+_ZONE_SUFFIXES = ('园区', '开发区', '高新区', '保税区', '示范区', '试验区')
+
+
+def _short_name(name):
+    for suffix in _SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix) + 1:
+            name = name[:-len(suffix)]
+            break
+    match = _ETHNIC.search(name)
+    if match and match.start() >= 2:
+        name = name[:match.start()]
+    return name
+
+
+@lru_cache(maxsize=None)
+def load_regions():
+    """
+    读取行政区划表
+
+    Returns:
+        dict: provinces/cities 为 code -> 区划信息，city 信息中包含所属省代码
+    """
+    with open(REGIONS_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+
+    provinces, cities = {}, {}
+    for province in data:
+        provinces[province['code']] = {
+            'code': province['code'],
+            'name': province['name'],
+            'short': _short_name(province['name']),
+        }
+        for city in province['cities']:
+            cities[city['code']] = {
+                'code': city['code'],
+                'name': city['name'],
+                'short': _short_name(city['name']),
+                'province_code': province['code'],
+            }
+    return {'provinces': provinces, 'cities': cities}
+
+
+def _find(text, regions):
+    """
+    在文本中查找最先出现的区划名称，全称优先于简称
+
+    简称后面紧跟"区""县"时视为区县名称的一部分（如北京"朝阳区"不是辽宁"朝阳市"），不算匹配。
+
+    Returns:
+        tuple | None: (区划信息, 开始位置, 结束位置)
+    """
+    best = None
+    for region in regions:
+        for name, is_short in ((region['name'], False), (region['short'], True)):
+            start = text.find(name)
+            while start != -1:
+                end = start + len(name)
+                if not (is_short and text[end:end + 1] in ('区', '县')):
+                    break
+                start = text.find(name, start + 1)
+            if start == -1:
+                continue
+            rank = (start, is_short, -len(name))
+            if best is None or rank < best[0]:
+                best = (rank, region, start, end)
+            break
+    return best[1:] if best else None
+
+
+def normalize_district(name, city=None):
+    """
+    区县名称归一化：去掉"区""县""旗""市"等后缀（保留至少两个字），功能区补上所属城市简称
+
+    Returns:
+        str: 归一化后的区县名称
+    """
+    if name.endswith(_ZONE_SUFFIXES):
+        return name if city is None or name.startswith(city['short']) else city['short'] + name
+    for suffix in _DISTRICT_SUFFIXES:
+        if name.endswith(suffix) and len(name) - len(suffix) >= 2:
+            name = name[:-len(suffix)]
+            break
+    # 自治县、自治旗截取到民族名称之前，如"长阳土家族自治县"为"长阳"
+    match = _ETHNIC.search(name)
+    if match and match.start() >= 2:
+        name = name[:match.start()]
+    return name
+
+
+@lru_cache(maxsize=None)
+def _cities_starting_with(prefix):
+    """全称或简称以 prefix 开头的地级区划"""
+    return tuple(
+        city for city in load_regions()['cities'].values()
+        if city['name'].startswith(prefix) or city['short'].startswith(prefix)
+    )
+
+
+def _is_city_name(text, start, end):
+    """文本中 [start, end) 处的省简称同时是地级市名称的开头（如"吉林市""海南州"）"""
+    for city in _cities_starting_with(text[start:end]):
+        if text.startswith(city['name'], start) and start + len(city['name']) > end:
+            return True
+        short_end = start + len(city['short'])
+        if text.startswith(city['short'], start) and short_end >= end and _ABBREVIATED_SUFFIX.match(text[short_end:]):
+            return True
+    return False
+
+
+def parse_location(text):
+    """
+    解析工作地点
+
+    Returns:
+        tuple: (省代码, 市代码, 归一化的区县名称)，无法识别的部分为空字符串
+    """
+    if not text:
+        return '', '', ''
+    regions = load_regions()
+
+    province_code = city_code = ''
+    city = None
+    remainder = text
+    match = _find(text, regions['provinces'].values())
+    if match and not _is_city_name(text, match[1], match[2]):
+        province, start, end = match
+        province_code = province['code']
+        remainder = text[:start] + text[end:]
+
+    candidates = [
+        city for city in regions['cities'].values()
+        if not province_code or city['province_code'] == province_code
+    ]
+    match = _find(remainder, candidates)
+    if match:
+        city, start, end = match
+        city_code = city['code']
+        province_code = city['province_code']
+        remainder = remainder[end:]
+        if end - start < len(city['name']):
+            # 简称后可能跟着"州""地区"等简写后缀，如"延边州"
+            remainder = _ABBREVIATED_SUFFIX.sub('', remainder)
+    elif province_code and len(candidates) == 1:
+        # 直辖市只有一个市级区划
+        city = candidates[0]
+        city_code = city['code']
+
+    names = _DISTRICT.findall(remainder)
+    rest = remainder.strip(' ，,、/-()（）')
+    if not names and city and _BARE_DISTRICT.fullmatch(rest):
+        names = [rest]
+    district = ''
+    for name in names:
+        if name not in _GENERIC_DISTRICTS and not name.startswith(('某', '各')):
+            district = normalize_district(name, city)
+            break
+    return province_code, city_code, district
+
+
+def rebuild_locations(model, batch_size=1000):
+    """
+    按批次重新解析所有岗位的工作地点，返回处理的岗位数量
+
+    model 参数供数据迁移传入历史模型使用。
+    """
+    total = 0
+    last_id = 0
+    queryset = model.objects.order_by('id').only('id', 'job_location')
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return total
+        for job in batch:
+            job.location_province_code, job.location_city_code, job.location_district = parse_location(job.job_location)
+        model.objects.bulk_update(batch, ['location_province_code', 'location_city_code', 'location_district'])
+        total += len(batch)
+        last_id = batch[-1].id
+
+
+def region_name(code):
+    """区划代码对应的名称"""
+    regions = load_regions()
+    region = regions['cities'].get(code) or regions['provinces'].get(code)
+    return region['name'] if region else ''
+
+
+def location_facets(queryset, level='province'):
+    """
+    按省或市统计岗位数量（一次 GROUP BY）
+
+    Returns:
+        list: [{'code', 'name', 'count'}]，按数量降序
+    """
+    field = 'location_province_code' if level == 'province' else 'location_city_code'
+    rows = queryset.exclude(**{field: ''}).order_by().values(field).annotate(count=Count('id')).order_by('-count')
+    return [{'code': row[field], 'name': region_name(row[field]), 'count': row['count']} for row in rows]
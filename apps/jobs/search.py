@@ -0,0 +1,211 @@
+"""
+岗位全文检索
+
+SQLite 使用 FTS5 虚拟表，PostgreSQL 使用带 GIN 索引的 tsvector 表。
+中文按字符二元组（bigram）切分，英文和数字按单词切分，
+切分后的词条以空格拼接写入索引，因此两种数据库都无需安装中文分词插件。
+岗位名称、招聘单位的拼音检索词（见 pinyin.py）也写入索引，纯字母的检索词按前缀匹配。
+检索时连接索引表，与地点、分类等筛选条件在同一条 SQL 中执行，按相关度排序后再截取。
+其他数据库不支持时回退到 icontains 查询。
+"""
+import re
+
+from django.db import connection
+
+FTS_TABLE = 'jobs_jobinfo_fts'
+
+# 关键词检索结果（筛选后按相关度排序）最多保留的岗位数量
+MAX_SEARCH_RESULTS = 500
+
+# 中日韩统一表意文字
+_CJK_RE = re.compile(r'[㐀-䶿一-鿿豈-﫿]+')
+_TOKEN_RE = re.compile(r'[㐀-䶿一-鿿豈-﫿]+|[a-z0-9]+')
+
+# {(数据库别名, 数据库名称): 是否已建立全文索引表}，测试数据库与正式数据库分别记录
+_available = {}
+
+
+def tokenize(text, document=False):
+    """
+    将文本切分为检索词条：中文连续片段切为二元组，英文数字按单词切分
+
+    document 为 True（写入索引）时每个中文片段另加末字：单字检索按前缀匹配二元组，
+    只出现在片段末尾的字（如"小学教师"中的"师"）不是任何二元组的首字，需单独写入。
+    """
+    if not text:
+        return []
+
+    tokens = []
+    for chunk in _TOKEN_RE.findall(text.lower()):
+        if _CJK_RE.fullmatch(chunk):
+            if len(chunk) == 1:
+                tokens.append(chunk)
+            else:
+                tokens.extend(chunk[i:i + 2] for i in range(len(chunk) - 1))
+                if document:
+                    tokens.append(chunk[-1])
+        else:
+            tokens.append(chunk)
+    return tokens
+
+
+def build_document(job_title, job_responsibilities, major_requirement,
+                   degree_requirement, post_title, search_pinyin=None):
+    """拼接岗位的可检索字段并切分为索引文档"""
+    parts = [job_title, job_responsibilities, major_requirement, degree_requirement, post_title, search_pinyin]
+    return ' '.join(tokenize(' '.join(part for part in parts if part), document=True))
+
+
+def _job_document(job):
+    return build_document(
+        job.job_title,
+        job.job_responsibilities,
+        job.major_requirement,
+        job.degree_requirement,
+        job.job_post.title if job.job_post_id else None,
+        job.search_pinyin,
+    )
+
+
+def create_index(schema_editor):
+    """创建全文索引表（迁移中调用）"""
+    _available.clear()
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(document, tokenize='unicode61')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {FTS_TABLE} ("
+            f"job_id bigint PRIMARY KEY REFERENCES jobs_jobinfo(id) ON DELETE CASCADE, "
+            f"document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {FTS_TABLE}_document_gin "
+            f"ON {FTS_TABLE} USING gin(document)"
+        )
+
+
+def drop_index(schema_editor):
+    """删除全文索引表（迁移回滚时调用）"""
+    _available.clear()
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def is_available():
+    """当前数据库是否已建立全文索引表（按数据库分别缓存，建表和删表时清除）"""
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _available:
+        _available[key] = (
+            connection.vendor in ('sqlite', 'postgresql')
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _available[key]
+
+
+def write_documents(cursor, rows):
+    """写入 (job_id, document) 列表，已存在的记录会被覆盖"""
+    if cursor.db.vendor == 'sqlite':
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(job_id,) for job_id, _ in rows])
+        cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, document) VALUES (%s, %s)", rows)
+    else:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (job_id, document) VALUES (%s, to_tsvector('simple', %s)) "
+            f"ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+            rows,
+        )
+
+
+def index_jobs(jobs):
+    """为一批岗位写入或更新索引（需已 select_related('job_post')）"""
+    if not is_available():
+        return
+    rows = [(job.id, _job_document(job)) for job in jobs]
+    if rows:
+        with connection.cursor() as cursor:
+            write_documents(cursor, rows)
+
+
+def remove_jobs(job_ids):
+    """从索引中删除岗位"""
+    if not is_available() or not job_ids:
+        return
+    key = 'rowid' if connection.vendor == 'sqlite' else 'job_id'
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE {key} = %s", [(job_id,) for job_id in job_ids])
+
+
+def rebuild_index(queryset, batch_size=1000):
+    """按批次重建索引，返回处理的岗位数量"""
+    if not is_available():
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    total = 0
+    queryset = queryset.select_related('job_post').order_by('id')
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        index_jobs(batch)
+        total += len(batch)
+        last_id = batch[-1].id
+    return total
+
+
+def _build_query(tokens):
+    """构造检索表达式：单个汉字和纯字母词条（可能是拼音输入）使用前缀匹配"""
+    single_char = len(tokens) == 1 and len(tokens[0]) == 1 and _CJK_RE.fullmatch(tokens[0])
+    sqlite = connection.vendor == 'sqlite'
+    terms = []
+    for token in tokens:
+        prefix = single_char or (token.isascii() and token.isalpha())
+        if sqlite:
+            terms.append(f'"{token}"*' if prefix else f'"{token}"')
+        else:
+            terms.append(f'{token}:*' if prefix else token)
+    return (' AND ' if sqlite else ' & ').join(terms)
+
+
+def search_jobs(queryset, query):
+    """
+    筛选匹配关键词的岗位并按相关度排序
+
+    索引表与岗位表连接查询，检索条件与其他筛选条件在同一条 SQL 中执行，
+    调用方在全部筛选之后再截取结果，不会因先截取检索结果而漏掉符合筛选条件的岗位。
+
+    Returns:
+        QuerySet | None: 索引不可用时返回 None，调用方应回退到普通查询
+    """
+    if not is_available():
+        return None
+
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return queryset.none()
+
+    expression = _build_query(tokens)
+    table = queryset.model._meta.db_table
+    # 索引表不是 Django 模型，使用 extra() 连接；FTS5 的 rank 越小越相关，ts_rank 越大越相关
+    if connection.vendor == 'sqlite':
+        queryset = queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[expression],
+            select={'search_rank': f'{FTS_TABLE}.rank'},
+        )
+        return queryset.order_by('search_rank', '-id')
+    queryset = queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.job_id = {table}.id', f"{FTS_TABLE}.document @@ to_tsquery('simple', %s)"],
+        params=[expression],
+        select={'search_rank': f"ts_rank({FTS_TABLE}.document, to_tsquery('simple', %s))"},
+        select_params=[expression],
+    )
+    return queryset.order_by('-search_rank', '-id')
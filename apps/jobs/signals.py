@@ -0,0 +1,167 @@
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import dedup, majors, search, stats
+from .cache import bump_data_version
+from .models import JobInfo, JobPost
+
+
+def _post_key(job_post_id):
+    """按公告ID查询其统计位置"""
+    post = JobPost.objects.filter(id=job_post_id).only('category', 'is_active', 'created_at').first()
+    return stats.post_stats_key(post) if post else None
+
+
+@receiver(pre_save, sender=JobPost)
+def remember_job_post_state(sender, instance, raw=False, **kwargs):
+    """记录公告保存前的统计位置，用于保存后计算增量"""
+    instance._stats_old_key = None
+    if not raw and instance.pk:
+        instance._stats_old_key = _post_key(instance.pk)
+
+
+@receiver(pre_save, sender=JobInfo)
+def remember_job_info_state(sender, instance, raw=False, **kwargs):
+    """记录岗位保存前是否计入统计（有效且不是转载）、所属公告、招聘人数和专业要求"""
+    instance._stats_old_state = None
+    instance._majors_changed = True
+    if not raw and instance.pk:
+        row = JobInfo.objects.filter(pk=instance.pk).values_list(
+            'is_active', 'duplicate_of_id', 'job_post_id', 'position_count', 'major_requirement'
+        ).first()
+        if row is not None:
+            instance._stats_old_state = (row[0] and row[1] is None, row[2], row[3])
+            instance._majors_changed = row[4] != instance.major_requirement
+
+
+@receiver(post_save, sender=JobInfo)
+def index_job_info(sender, instance, raw=False, **kwargs):
+    """岗位保存后同步全文索引"""
+    if raw:
+        return
+    search.index_jobs([instance])
+
+
+@receiver(post_save, sender=JobInfo)
+def sync_majors_for_job_info(sender, instance, raw=False, **kwargs):
+    """岗位新增或专业要求变化后重建专业关联"""
+    if raw or not getattr(instance, '_majors_changed', True):
+        return
+    majors.sync_job_majors([instance])
+
+
+@receiver(post_save, sender=JobInfo)
+def update_stats_for_job_info(sender, instance, raw=False, **kwargs):
+    """岗位新增、启停、更换公告、标记或取消转载、招聘人数变化时更新分类统计"""
+    if raw:
+        return
+
+    old_state = getattr(instance, '_stats_old_state', None)
+    counted = instance.is_active and instance.duplicate_of_id is None
+    new_key = stats.post_stats_key(instance.job_post) if counted else None
+    new_positions = instance.position_count or 0
+    if old_state is None:
+        stats.apply_delta(new_key, jobs=1, positions=new_positions)
+        return
+
+    old_counted, old_post_id, old_positions = old_state
+    old_positions = old_positions or 0
+    if old_post_id == instance.job_post_id:
+        old_key = stats.post_stats_key(instance.job_post) if old_counted else None
+    else:
+        old_key = _post_key(old_post_id) if old_counted else None
+    if old_key != new_key:
+        stats.apply_delta(old_key, jobs=-1, positions=-old_positions)
+        stats.apply_delta(new_key, jobs=1, positions=new_positions)
+    elif old_positions != new_positions:
+        stats.apply_delta(new_key, positions=new_positions - old_positions)
+
+
+@receiver(post_save, sender=JobInfo)
+def release_duplicates_for_job_info(sender, instance, created=False, raw=False, **kwargs):
+    """岗位下线后重新检测转载它的岗位，使其中一个重新显示"""
+    if raw or created or instance.is_active:
+        return
+    dedup.release_duplicates([instance.id])
+
+
+@receiver(pre_delete, sender=JobInfo)
+def release_duplicates_for_deleted_job_info(sender, instance, **kwargs):
+    """岗位删除前重新检测转载它的岗位，避免 duplicate_of 置空后同一岗位的多个转载同时显示"""
+    dedup.release_duplicates([instance.id], deleted=True)
+
+
+@receiver(post_delete, sender=JobInfo)
+def unindex_job_info(sender, instance, **kwargs):
+    """岗位删除后移除全文索引"""
+    search.remove_jobs([instance.id])
+
+
+@receiver(post_delete, sender=JobInfo)
+def update_stats_for_deleted_job_info(sender, instance, **kwargs):
+    """岗位删除后更新分类统计（级联删除时公告此时仍在数据库中），转载岗位未计入统计"""
+    if instance.is_active and instance.duplicate_of_id is None:
+        stats.apply_delta(_post_key(instance.job_post_id), jobs=-1, positions=-(instance.position_count or 0))
+
+
+@receiver(post_save, sender=JobPost)
+def sync_job_post_fields(sender, instance, created=False, raw=False, **kwargs):
+    """公告更新后同步其下岗位冗余保存的公告字段"""
+    if raw or created:
+        return
+    JobInfo.objects.sync_job_post_fields(instance)
+
+
+@receiver(post_save, sender=JobPost)
+def reindex_job_post(sender, instance, created=False, raw=False, **kwargs):
+    """公告标题参与岗位检索，公告更新后重建其下岗位的索引"""
+    if raw or created:
+        return
+    search.index_jobs(instance.jobs.select_related('job_post'))
+
+
+@receiver(post_save, sender=JobPost)
+def update_stats_for_job_post(sender, instance, created=False, raw=False, **kwargs):
+    """公告新增、启停或更换分类时更新分类统计"""
+    if raw:
+        return
+
+    new_key = stats.post_stats_key(instance)
+    if created:
+        stats.apply_delta(new_key, posts=1)
+        return
+
+    old_key = getattr(instance, '_stats_old_key', None)
+    if old_key != new_key:
+        totals = instance.jobs.filter(is_active=True, duplicate_of__isnull=True).aggregate(
+            jobs=Count('id'), positions=Coalesce(Sum('position_count'), Value(0))
+        )
+        stats.apply_delta(old_key, posts=-1, jobs=-totals['jobs'], positions=-totals['positions'])
+        stats.apply_delta(new_key, posts=1, jobs=totals['jobs'], positions=totals['positions'])
+
+
+@receiver(post_save, sender=JobPost)
+def release_duplicates_for_job_post(sender, instance, created=False, raw=False, **kwargs):
+    """公告下线后重新检测转载其岗位的岗位"""
+    if raw or created or instance.is_active:
+        return
+    dedup.release_duplicates(instance.jobs.all())
+
+
+@receiver(post_delete, sender=JobPost)
+def update_stats_for_deleted_job_post(sender, instance, **kwargs):
+    """公告删除后更新分类统计，其下岗位已在级联删除时扣减"""
+    stats.apply_delta(stats.post_stats_key(instance), posts=-1)
+
+
+@receiver(post_save, sender=JobPost)
+@receiver(post_delete, sender=JobPost)
+@receiver(post_save, sender=JobInfo)
+@receiver(post_delete, sender=JobInfo)
+def invalidate_jobs_cache(sender, raw=False, **kwargs):
+    """公告或岗位变更后递增数据版本号，使岗位相关缓存失效"""
+    if raw:
+        return
+    bump_data_version()
@@ -0,0 +1,181 @@
+"""
+招聘分类统计
+
+CategoryStats 保存每个分类的有效公告数、有效岗位数和招聘人数，
+CategoryDailyStats 按公告创建日期分桶，用于计算近7天和今日新增。
+与岗位列表一致，被标记为转载（duplicate_of）的岗位不计入岗位数和招聘人数。
+公告和岗位的增删改通过信号按增量更新统计（见 signals.py），
+批量写入（bulk_create、update()）绕过信号，需调用 apply_post_totals 合并累加，
+或之后执行 rebuild_category_stats 命令重建；重复检测标记或取消转载时由 apply_job_totals 累加。
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import CategoryDailyStats, CategoryStats, JobInfo, JobPost
+
+
+def post_stats_key(post):
+    """
+    公告对统计的贡献位置
+
+    Returns:
+        tuple | None: (category, date)，公告无效或无分类时返回 None
+    """
+    if not post.is_active or not post.category or not post.created_at:
+        return None
+    return post.category, timezone.localdate(post.created_at)
+
+
+def apply_delta(key, posts=0, jobs=0, positions=0):
+    """在 key=(category, date) 对应的总计和每日统计上累加公告数、岗位数和招聘人数"""
+    if key is None or (posts == 0 and jobs == 0 and positions == 0):
+        return
+
+    category, day = key
+    with transaction.atomic():
+        CategoryStats.objects.get_or_create(category=category)
+        CategoryStats.objects.filter(category=category).update(
+            post_count=F('post_count') + posts,
+            job_count=F('job_count') + jobs,
+            position_count=F('position_count') + positions,
+        )
+        CategoryDailyStats.objects.get_or_create(category=category, date=day)
+        CategoryDailyStats.objects.filter(category=category, date=day).update(
+            post_count=F('post_count') + posts,
+            job_count=F('job_count') + jobs,
+            position_count=F('position_count') + positions,
+        )
+
+
+def _counted_jobs(**filters):
+    """计入统计的岗位：有效且不是转载"""
+    return JobInfo.objects.filter(is_active=Value(True), duplicate_of__isnull=True, **filters)
+
+
+def post_totals(job_post_ids):
+    """
+    从数据库读取一批公告及其有效岗位数、招聘人数，供 apply_post_totals 使用
+
+    Returns:
+        list: [(公告, 有效岗位数, 招聘人数)]
+    """
+    job_totals = {
+        row['job_post_id']: (row['jobs'], row['positions'])
+        for row in _counted_jobs(job_post_id__in=job_post_ids)
+        .order_by().values('job_post_id').annotate(jobs=Count('id'), positions=Sum('position_count'))
+    }
+    return [
+        (post, *job_totals.get(post.id, (0, 0)))
+        for post in JobPost.objects.filter(id__in=job_post_ids).only('category', 'is_active', 'created_at')
+    ]
+
+
+def apply_post_totals(rows, sign=1):
+    """
+    批量累加一组公告对统计的贡献，同一统计位置合并后只更新一次
+
+    Args:
+        rows: [(公告, 有效岗位数, 招聘人数)]，公告需已加载 category、is_active、created_at
+        sign: 1 表示公告新增或上线，-1 表示下线
+    """
+    totals = {}
+    for post, jobs, positions in rows:
+        key = post_stats_key(post)
+        if key is None:
+            continue
+        total = totals.setdefault(key, [0, 0, 0])
+        total[0] += 1
+        total[1] += jobs
+        total[2] += positions or 0
+    for key, (posts, jobs, positions) in totals.items():
+        apply_delta(key, posts=sign * posts, jobs=sign * jobs, positions=sign * positions)
+
+
+def apply_job_totals(job_ids, sign=1):
+    """
+    批量累加一组有效岗位对统计的贡献（不含所属公告本身），同一统计位置合并后只更新一次
+
+    Args:
+        job_ids: 岗位ID列表
+        sign: 1 表示岗位取消转载标记、重新计入，-1 表示被标记为转载
+    """
+    rows = list(
+        JobInfo.objects.filter(id__in=job_ids, is_active=Value(True))
+        .order_by().values('job_post_id').annotate(jobs=Count('id'), positions=Sum('position_count'))
+    )
+    if not rows:
+        return
+    posts = JobPost.objects.only('category', 'is_active', 'created_at').in_bulk(
+        [row['job_post_id'] for row in rows]
+    )
+    totals = {}
+    for row in rows:
+        key = post_stats_key(posts[row['job_post_id']])
+        if key is None:
+            continue
+        total = totals.setdefault(key, [0, 0])
+        total[0] += row['jobs']
+        total[1] += row['positions'] or 0
+    for key, (jobs, positions) in totals.items():
+        apply_delta(key, jobs=sign * jobs, positions=sign * positions)
+
+
+@transaction.atomic
+def rebuild_category_stats(post_model=JobPost, stats_model=CategoryStats, daily_model=CategoryDailyStats):
+    """
+    根据公告和岗位表全量重建分类统计，返回统计的分类数量
+
+    模型参数供数据迁移传入历史模型使用；早于招聘人数字段的历史模型不统计招聘人数，
+    早于重复检测的历史模型不排除转载岗位。
+    """
+    active_posts = post_model.objects.filter(is_active=True, category__isnull=False).exclude(category='')
+    counted_jobs = Q(jobs__is_active=True)
+    job_model = post_model._meta.get_field('jobs').related_model
+    if any(field.name == 'duplicate_of' for field in job_model._meta.get_fields()):
+        counted_jobs &= Q(jobs__duplicate_of__isnull=True)
+    aggregates = {
+        'post_count': Count('id', distinct=True),
+        'job_count': Count('jobs', filter=counted_jobs),
+    }
+    if any(field.name == 'position_count' for field in stats_model._meta.get_fields()):
+        aggregates['position_count'] = Coalesce(
+            Sum('jobs__position_count', filter=counted_jobs), Value(0)
+        )
+
+    totals = list(active_posts.values('category').annotate(**aggregates))
+    daily = active_posts.annotate(
+        date=TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+    ).values('category', 'date').annotate(**aggregates)
+
+    stats_model.objects.all().delete()
+    daily_model.objects.all().delete()
+    stats_model.objects.bulk_create([stats_model(**row) for row in totals])
+    daily_model.objects.bulk_create([daily_model(**row) for row in daily])
+    return len(totals)
+
+
+def get_category_stats():
+    """
+    一次查询读取所有分类的总数、近7天和今日新增数量
+
+    近7天和今日数量通过每日统计表的子查询聚合得到。
+    """
+    today = timezone.localdate()
+    seven_days_ago = today - timedelta(days=7)
+
+    def daily_sum(field, **date_filter):
+        subquery = CategoryDailyStats.objects.filter(
+            category=OuterRef('category'), **date_filter
+        ).values('category').annotate(total=Sum(field)).values('total')
+        return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+    return CategoryStats.objects.filter(post_count__gt=0).annotate(
+        recent_posts=daily_sum('post_count', date__gte=seven_days_ago),
+        recent_jobs=daily_sum('job_count', date__gte=seven_days_ago),
+        today_posts=daily_sum('post_count', date=today),
+        today_jobs=daily_sum('job_count', date=today),
+    ).order_by('-post_count')
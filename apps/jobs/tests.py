@@ -1,3 +1,1804 @@
-from django.test import TestCase
+import base64
+import csv
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from apps.accounts.models import CustomUser, Employer, JobSeeker
+from core.query_budget import QueryBudgetTestMixin
+
+from . import (
+    browse_history, dedup, expiry, extraction, facets, importer, majors, pagination, pinyin, positions, regions, search,
+    stats, typeahead, urls as jobs_urls,
+)
+from .browse_history import browse_buffer
+from .cache import (
+    DATA_VERSION_KEY, LOCAL_SEEKER_CACHE_TIMEOUT, bump_data_version, get_data_version, get_or_compute,
+    get_seeker_membership, invalidate_seeker_membership, is_shared_cache,
+)
+from .models import (
+    AgeLevel, Application, CategoryDailyStats, CategoryStats, DegreeLevel, JobBookmark, JobBrowseHistory,
+    JobExperienceLevel, JobInfo, JobPost, JobPostCategory,
+)
+from .typeahead import typeahead_index
+
+
+def create_seed_data():
+    """
+    创建查询预算测试使用的数据集
+
+    Returns:
+        dict: 包含 job_post、job、job_seeker_user、employer_user 等对象
+    """
+    posts = []
+    for i in range(3):
+        post = JobPost.objects.create(
+            title=f'2024年教师招聘公告{i}',
+            organization='某县教育局',
+            category=JobPostCategory.TEACHER.value,
+            html_text='<p>公告正文</p>' * 100,
+        )
+        posts.append(post)
+        for j in range(6):
+            JobInfo.objects.create(
+                job_post=post,
+                job_title=f'小学语文教师{i}-{j}',
+                organization='某县教育局',
+                job_location='广州市天河区',
+                degree_requirement='本科及以上',
+                major_requirement='汉语言文学',
+                num_positions='2',
+                job_responsibilities='负责语文教学工作' * 50,
+            )
+
+    jobs = list(JobInfo.objects.order_by('id'))
+
+    job_seeker_user = CustomUser.objects.create_user(
+        username='seeker', email='seeker@example.com', password='password123', is_job_seeker=True
+    )
+    job_seeker = JobSeeker.objects.create(user=job_seeker_user)
+    for job in jobs[:5]:
+        Application.objects.create(job_info=job, job_seeker=job_seeker, cover_letter='求职信')
+        JobBookmark.objects.create(job_info=job, job_seeker=job_seeker)
+        JobBrowseHistory.objects.create(job_info=job, job_seeker=job_seeker)
+
+    employer_user = CustomUser.objects.create_user(
+        username='employer', email='employer@example.com', password='password123', is_employer=True
+    )
+    employer = Employer.objects.create(user=employer_user, company_name='某县教育局')
+
+    return {
+        'job_post': posts[0],
+        'job': jobs[-1],
+        'applied_job': jobs[0],
+        'job_seeker_user': job_seeker_user,
+        'job_seeker': job_seeker,
+        'employer_user': employer_user,
+        'employer': employer,
+    }
+
+
+class DataCacheTests(SimpleTestCase):
+    """版本化缓存和重新计算锁测试"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_version_bump_invalidates(self):
+        """递增数据版本号后重新计算，版本号不变时读取缓存"""
+        compute = mock.Mock(side_effect=[1, 2])
+        self.assertEqual(get_or_compute('test', compute), 1)
+        self.assertEqual(get_or_compute('test', compute), 1)
+        version = get_data_version()
+        self.assertEqual(bump_data_version(), version + 1)
+        self.assertEqual(get_or_compute('test', compute), 2)
+        self.assertEqual(compute.call_count, 2)
+
+    def test_bump_without_version(self):
+        """版本号被淘汰后递增仍然得到新版本"""
+        cache.delete(DATA_VERSION_KEY)
+        self.assertEqual(bump_data_version(), 2)
+        self.assertEqual(get_data_version(), 2)
+
+    def test_concurrent_misses_compute_once(self):
+        """多个请求同时未命中时只有一个请求计算，其余等待计算结果"""
+        started = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_compute('test', compute))) for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['value'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_locked_returns_stale(self):
+        """其他请求持有锁时返回上一版本的数据，不重复计算"""
+        get_or_compute('test', lambda: 'old')
+        bump_data_version()
+        cache.add(f'jobs:test:v{get_data_version()}:lock', 1)
+        compute = mock.Mock(return_value='new')
+        self.assertEqual(get_or_compute('test', compute), 'old')
+        compute.assert_not_called()
+
+    def test_lock_wait_timeout(self):
+        """没有旧数据且等待超时时直接计算"""
+        cache.add(f'jobs:test:v{get_data_version()}:lock', 1)
+        with mock.patch('apps.jobs.cache.WAIT_TIMEOUT', 0.1), self.assertLogs('apps.jobs.cache', 'WARNING'):
+            self.assertEqual(get_or_compute('test', lambda: 'value'), 'value')
+
+
+class SeekerMembershipCacheTests(TestCase):
+    """求职者收藏/申请状态缓存测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.seed['job_seeker_user'])
+        self.job_seeker = self.seed['job_seeker']
+        self.job = self.seed['job']
+        # 浏览历史同步写入，避免残留事件影响其他测试
+        patcher = mock.patch.object(browse_buffer, 'flush_interval', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def toggle(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('jobs:toggle_bookmark', args=[self.job.id]))
+        return response.json()['is_bookmarked']
+
+    def test_toggle_bookmark_refreshes_membership(self):
+        """收藏和取消收藏后重新加载缓存的收藏集合"""
+        self.assertNotIn(self.job.id, get_seeker_membership(self.job_seeker.id)[0])
+        self.assertTrue(self.toggle())
+        self.assertIn(self.job.id, get_seeker_membership(self.job_seeker.id)[0])
+        self.assertFalse(self.toggle())
+        self.assertNotIn(self.job.id, get_seeker_membership(self.job_seeker.id)[0])
+
+        response = self.client.get(reverse('jobs:job_detail', args=[self.job.id]))
+        self.assertFalse(response.context['is_bookmarked'])
+
+    def test_invalidated_after_commit(self):
+        """事务提交后才删除缓存，回滚时缓存不变"""
+        get_seeker_membership(self.job_seeker.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            invalidate_seeker_membership(self.job_seeker.id)
+            self.assertIsNotNone(cache.get(f'jobs:seeker:{self.job_seeker.id}:membership'))
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get(f'jobs:seeker:{self.job_seeker.id}:membership'))
+
+    def test_short_timeout_without_shared_cache(self):
+        """进程内缓存无法通知其他进程，缩短缓存有效期"""
+        with mock.patch.object(cache, 'set') as cache_set:
+            get_seeker_membership(self.job_seeker.id)
+        self.assertEqual(cache_set.call_args.kwargs['timeout'], LOCAL_SEEKER_CACHE_TIMEOUT)
+
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://'}}
+        with override_settings(CACHES=redis):
+            self.assertTrue(is_shared_cache())
+
+
+class BrowseHistoryWriteTests(TestCase):
+    """浏览历史批量写入和落盘补写测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = mock.patch.object(browse_history, 'SPOOL_DIR', Path(directory.name))
+        self.spool_dir = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.history().delete()
+
+    def event(self, job_info_id=None, ip_address='10.0.0.1', browsed_date=None):
+        return {
+            'job_info_id': job_info_id or self.seed['job'].id,
+            'job_seeker_id': self.seed['job_seeker'].id,
+            'ip_address': ip_address,
+            'user_agent': 'test',
+            'browsed_date': browsed_date or timezone.now(),
+        }
+
+    def history(self):
+        return JobBrowseHistory.objects.filter(job_seeker=self.seed['job_seeker'])
+
+    def test_repeated_views_update_one_row(self):
+        """重复浏览累加同一行的浏览次数，最近浏览时间只向后移动"""
+        start = timezone.now() - datetime.timedelta(hours=1)
+        browse_history.write_events([
+            self.event(browsed_date=start),
+            self.event(browsed_date=start + datetime.timedelta(minutes=5), ip_address='10.0.0.2'),
+        ])
+        latest = start + datetime.timedelta(minutes=10)
+        browse_history.write_events([self.event(browsed_date=latest, ip_address='10.0.0.3')])
+        row = self.history().get()
+        self.assertEqual(row.view_count, 3)
+        self.assertEqual(row.last_browsed, latest)
+        self.assertEqual(row.ip_address, '10.0.0.3')
+
+        # 较早的事件晚到时不会让最近浏览时间倒退
+        browse_history.write_events([self.event(browsed_date=start)])
+        row = self.history().get()
+        self.assertEqual(row.view_count, 4)
+        self.assertEqual(row.last_browsed, latest)
+
+    def test_repeated_detail_views(self):
+        """多次打开职位详情页只保留一行浏览记录"""
+        self.client.force_login(self.seed['job_seeker_user'])
+        url = reverse('jobs:job_detail', args=[self.seed['job'].id])
+        with mock.patch.object(browse_buffer, 'flush_interval', 0):
+            self.client.get(url)
+            first = self.history().get().last_browsed
+            self.client.get(url)
+        row = self.history().get()
+        self.assertEqual(row.view_count, 2)
+        self.assertGreaterEqual(row.last_browsed, first)
+
+    def test_skip_deleted_job(self):
+        """已删除岗位的事件被丢弃，同批其他事件正常写入"""
+        browse_history.write_events([self.event(job_info_id=10 ** 9), self.event()])
+        self.assertEqual([row.job_info_id for row in self.history()], [self.seed['job'].id])
+
+    def test_invalid_ip_stored_as_null(self):
+        """不合法的 X-Forwarded-For IP 记为空"""
+        browse_history.write_events([self.event(ip_address='unknown')])
+        self.assertIsNone(self.history().get().ip_address)
+
+    def test_drain_quarantines_bad_file(self):
+        """数据有误的落盘文件移入 failed 目录，后续文件照常补写"""
+        (self.spool_dir / '0-bad.jsonl').write_text('{"job_info_id": 1\n', encoding='utf-8')
+        browse_history.spool_events([self.event(job_info_id=10 ** 9), self.event()])
+
+        with self.assertLogs('apps.jobs.browse_history', 'ERROR'):
+            self.assertEqual(browse_history.drain_spool(), 2)
+        self.assertEqual(self.history().count(), 1)
+        self.assertEqual(list(self.spool_dir.glob('*.jsonl')), [])
+        self.assertTrue((self.spool_dir / browse_history.FAILED_DIR_NAME / '0-bad.jsonl').exists())
+
+    def test_drain_keeps_file_on_database_error(self):
+        """数据库暂时不可用时保留落盘文件"""
+        browse_history.spool_events([self.event()])
+        with mock.patch.object(browse_history, 'write_events', side_effect=DatabaseError('locked')), \
+                self.assertLogs('apps.jobs.browse_history', 'ERROR'):
+            self.assertEqual(browse_history.drain_spool(), 0)
+        self.assertEqual(len(list(self.spool_dir.glob('*.jsonl'))), 1)
+
+        self.assertEqual(browse_history.drain_spool(), 1)
+        self.assertEqual(self.history().count(), 1)
+
+    def test_flush_command_drains_spool(self):
+        """flush_browse_history 命令补写落盘文件并删除已写入的文件"""
+        browse_history.spool_events([self.event(), self.event()])
+        out = StringIO()
+        call_command('flush_browse_history', stdout=out)
+        self.assertIn('成功补写 2 条浏览历史', out.getvalue())
+        self.assertEqual(self.history().get().view_count, 2)
+        self.assertEqual(list(self.spool_dir.glob('*.jsonl')), [])
+
+
+class BrowseHistoryPurgeTests(TestCase):
+    """浏览历史按保留期限分批清理测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed = create_seed_data()
+        JobBrowseHistory.objects.all().delete()
+        now = timezone.now()
+        jobs = list(JobInfo.objects.order_by('id')[:7])
+        # 5 条超过 30 天未浏览，2 条在保留期限内
+        for job, days in zip(jobs, (31, 32, 33, 40, 365, 29, 0)):
+            JobBrowseHistory.objects.create(
+                job_info=job, job_seeker=seed['job_seeker'], last_browsed=now - datetime.timedelta(days=days),
+            )
+        cls.kept_ids = {jobs[5].id, jobs[6].id}
+
+    def kept(self):
+        return set(JobBrowseHistory.objects.values_list('job_info_id', flat=True))
+
+    def test_purge_expired_in_batches(self):
+        """只删除超过保留期限的记录，每批删除 batch_size 条"""
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(JobBrowseHistory.purge_expired(days=30, batch_size=2), 5)
+        deletes = [query for query in context.captured_queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(self.kept(), self.kept_ids)
+        self.assertEqual(JobBrowseHistory.purge_expired(days=30, batch_size=2), 0)
+
+    def test_purge_command(self):
+        """purge_browse_history 命令按 --days 和 --batch-size 清理"""
+        out = StringIO()
+        call_command('purge_browse_history', days=30, batch_size=2, stdout=out)
+        self.assertIn('成功清理了 5 条超过 30 天未浏览的记录', out.getvalue())
+        self.assertEqual(self.kept(), self.kept_ids)
+
+
+class JobListQueryCountTests(TestCase):
+    """岗位列表页查询次数测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_seed_data()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_job_list_query_count(self):
+        """分面计数已缓存时，游标分页的列表页每页只执行一次查询"""
+        self.client.get(reverse('jobs:job_list'))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('jobs:job_list'))
+        self.assertEqual(len(response.context['jobs']), 9)
+
+    def test_job_list_next_page_query_count(self):
+        """翻页后查询次数不变"""
+        response = self.client.get(reverse('jobs:job_list'))
+        cursor = response.context['jobs'].next_cursor
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('jobs:job_list'), {'cursor': cursor})
+        self.assertEqual(len(response.context['jobs']), 9)
+
+    def test_numbered_page_query_count(self):
+        """页码分页：首次查询结果ID列表 + 当前页数据，ID列表缓存后只查询当前页"""
+        self.client.get(reverse('jobs:job_list'))
+        with self.assertNumQueries(2):
+            self.client.get(reverse('jobs:job_list'), {'page': 2})
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('jobs:job_list'), {'page': 1})
+        self.assertEqual(response.context['jobs'].paginator.count, 18)
+
+    def test_keyword_search_query_count(self):
+        """关键词检索：首次计算分面和结果ID列表，结果ID缓存后只查询当前页"""
+        # 全文检索与筛选在同一查询中：分面每个分面一次分组；结果：结果ID + 当前页数据
+        with self.assertNumQueries(len(facets.FACETS) + 2):
+            self.client.get(reverse('jobs:job_list'), {'search': '语文'})
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('jobs:job_list'), {'search': ' 语文', 'page': 2})
+        self.assertEqual(len(response.context['jobs']), 9)
+
+    def test_cached_results_keep_order(self):
+        """按缓存的ID列表取出的当前页保持原有排序"""
+        response = self.client.get(reverse('jobs:job_list'), {'page': 1})
+        expected = list(JobInfo.objects.filter(is_active=True).values_list('id', flat=True)[:9])
+        self.assertEqual([job.id for job in response.context['jobs']], expected)
+
+    def test_cached_results_invalidated_on_job_change(self):
+        """岗位变更后结果ID缓存随数据版本号失效"""
+        self.client.get(reverse('jobs:job_list'), {'search': '语文'})
+        JobInfo.objects.filter(is_active=True).first().delete()
+        response = self.client.get(reverse('jobs:job_list'), {'search': '语文'})
+        self.assertEqual(response.context['jobs'].paginator.count, 17)
+
+    def test_listing_defers_large_text_fields(self):
+        """列表查询不加载卡片不展示的大文本字段"""
+        job = JobInfo.objects.for_listing().first()
+        deferred = job.get_deferred_fields()
+        self.assertIn('job_responsibilities', deferred)
+        self.assertIn('html_text', job.job_post.get_deferred_fields())
+
+
+class CursorPaginationTests(TestCase):
+    """游标分页和页码分页行为测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_seed_data()
+
+    def setUp(self):
+        cache.clear()
+
+    def expected_ids(self):
+        return list(JobInfo.objects.active().order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def walk(self, per_page):
+        """从第一页沿 next_cursor 翻到最后一页，再沿 previous_cursor 翻回第一页"""
+        queryset = JobInfo.objects.active()
+        pages = [pagination.paginate_by_cursor(queryset, None, per_page)]
+        while pages[-1].has_next():
+            pages.append(pagination.paginate_by_cursor(queryset, pages[-1].next_cursor, per_page))
+        forward = [[job.id for job in page] for page in pages]
+
+        backward = []
+        page = pages[-1]
+        while page.has_previous():
+            page = pagination.paginate_by_cursor(queryset, page.previous_cursor, per_page)
+            backward.append([job.id for job in page])
+        return forward, backward
+
+    def test_round_trip(self):
+        """向后翻页覆盖全部岗位且不重复，向前翻页回到同样的各页"""
+        forward, backward = self.walk(per_page=4)
+        self.assertEqual([job_id for page in forward for job_id in page], self.expected_ids())
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_identical_created_at(self):
+        """发布时间相同的岗位按 id 排序，跨页时不遗漏也不重复"""
+        JobInfo.objects.update(created_at=timezone.now())
+        forward, backward = self.walk(per_page=4)
+        ids = [job_id for page in forward for job_id in page]
+        self.assertEqual(ids, sorted(JobInfo.objects.active().values_list('id', flat=True), reverse=True))
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_invalid_cursor(self):
+        """无法解析或被篡改的游标回到第一页"""
+        first_page = [job.id for job in pagination.paginate_by_cursor(JobInfo.objects.active(), None)]
+        tampered = [
+            'not-a-cursor',
+            base64.urlsafe_b64encode('x|2024-01-01T00:00:00|1'.encode()).decode(),
+            base64.urlsafe_b64encode('n|yesterday|1'.encode()).decode(),
+            base64.urlsafe_b64encode('n|2024-01-01T00:00:00'.encode()).decode(),
+            base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+        ]
+        for cursor in tampered:
+            response = self.client.get(reverse('jobs:job_list'), {'cursor': cursor})
+            page = response.context['jobs']
+            self.assertEqual([job.id for job in page], first_page, cursor)
+            self.assertFalse(page.has_previous())
+
+    def test_api_cursor_fields(self):
+        """JSON 接口返回 next_cursor/previous_cursor，沿游标翻页"""
+        url = reverse('jobs:job_list_api')
+        data = self.client.get(url).json()
+        self.assertTrue(data['has_next'])
+        self.assertFalse(data['has_previous'])
+        self.assertIsNone(data['previous_cursor'])
+        self.assertNotIn('page', data)
+
+        next_data = self.client.get(url, {'cursor': data['next_cursor']}).json()
+        self.assertFalse(next_data['has_next'])
+        self.assertIsNone(next_data['next_cursor'])
+        self.assertTrue(next_data['has_previous'])
+        ids = [item['id'] for item in data['results'] + next_data['results']]
+        self.assertEqual(ids, self.expected_ids())
+
+        previous_data = self.client.get(url, {'cursor': next_data['previous_cursor']}).json()
+        self.assertEqual(previous_data['results'], data['results'])
+
+    def test_numbered_pages_limited(self):
+        """页码分页只提供前 MAX_NUMBERED_PAGES 页，更深的页码返回最后一页"""
+        with mock.patch('apps.jobs.views.MAX_NUMBERED_PAGES', 1):
+            response = self.client.get(reverse('jobs:job_list'), {'page': 2})
+        page = response.context['jobs']
+        self.assertEqual(page.number, 1)
+        self.assertEqual(page.paginator.count, pagination.JOBS_PER_PAGE)
+        self.assertTrue(page.paginator.is_truncated)
+        self.assertEqual([job.id for job in page], self.expected_ids()[:pagination.JOBS_PER_PAGE])
+
+    def test_cached_results_index(self):
+        """按下标取缓存结果，支持负数下标，越界时抛出 IndexError"""
+        ids = self.expected_ids()
+        results = pagination.CachedResults(ids, JobInfo.objects.all())
+        self.assertEqual(results[0].id, ids[0])
+        self.assertEqual(results[-1].id, ids[-1])
+        self.assertEqual(results[-len(ids)].id, ids[0])
+        for index in (len(ids), -len(ids) - 1):
+            with self.assertRaises(IndexError):
+                results[index]
+
+
+class FullTextSearchTests(TestCase):
+    """全文检索测试"""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_job(self, job_title, job_location='广州市天河区', **fields):
+        post = JobPost.objects.create(title='2024年招聘公告', category=JobPostCategory.TEACHER.value)
+        return JobInfo.objects.create(job_post=post, job_title=job_title, job_location=job_location, **fields)
+
+    def search(self, query):
+        return set(search.search_jobs(JobInfo.objects.all(), query).values_list('job_title', flat=True))
+
+    def test_tokenize(self):
+        """中文切为二元组，写入索引时另加片段末字"""
+        self.assertEqual(search.tokenize('小学教师 Java'), ['小学', '学教', '教师', 'java'])
+        self.assertEqual(search.tokenize('小学教师', document=True), ['小学', '学教', '教师', '师'])
+
+    def test_single_character(self):
+        """单字检索匹配出现在任意位置的字"""
+        self.create_job('小学教师')
+        self.create_job('会计')
+        self.assertEqual(self.search('师'), {'小学教师'})
+        self.assertEqual(self.search('学'), {'小学教师'})
+        self.assertEqual(self.search('计'), {'会计'})
+
+    def test_filters_applied_before_limit(self):
+        """关键词与地点筛选在同一查询中执行，截取相关度靠前的结果不会漏掉符合地点条件的岗位"""
+        for index in range(3):
+            self.create_job(f'语文教师{index}', job_responsibilities='语文教学、语文教研')
+        self.create_job('语文教师', job_location='深圳市南山区')
+
+        with mock.patch.object(search, 'MAX_SEARCH_RESULTS', 2):
+            response = self.client.get(reverse('jobs:job_list'), {'search': '语文', 'location': '深圳市'})
+        self.assertEqual([job.job_title for job in response.context['jobs']], ['语文教师'])
+
+        response = self.client.get(reverse('jobs:job_list'), {'search': '语文'})
+        location = next(facet for facet in response.context['facets'] if facet['key'] == 'location')
+        self.assertEqual([(item['label'], item['count']) for item in location['values']], [('广东省', 4)])
+
+    def test_availability_cached_per_database(self):
+        """是否建立索引按数据库分别缓存，其他数据库的结果不影响测试数据库"""
+        with mock.patch.dict(search._available, {('default', 'db.sqlite3'): False}, clear=True):
+            self.assertTrue(search.is_available())
+
+
+class LocationTests(TestCase):
+    """工作地点解析和筛选测试"""
+
+    def test_parse_location(self):
+        """地级市与省同名、功能区、区县后缀归一化"""
+        cases = {
+            '广州市天河区': ('440000', '440100', '天河'),
+            '广东省广州市天河区': ('440000', '440100', '天河'),
+            '吉林市': ('220000', '220200', ''),
+            '吉林省吉林市': ('220000', '220200', ''),
+            '吉林': ('220000', '', ''),
+            '苏州工业园区': ('320000', '320500', '苏州工业园区'),
+            '苏州市工业园区': ('320000', '320500', '苏州工业园区'),
+            '天河区': ('', '', '天河'),
+            '广州天河': ('440000', '440100', '天河'),
+            '济南市市中区': ('370000', '370100', '市中'),
+            '上海市浦东新区': ('310000', '310100', '浦东'),
+            '延边州': ('220000', '222400', ''),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(regions.parse_location(text), expected)
+
+    def test_filter_by_district(self):
+        """"天河""天河区"互相匹配，未解析出区县的岗位按文本匹配"""
+        post = JobPost.objects.create(title='招聘公告', category=JobPostCategory.TEACHER.value)
+        for location in ('广州市天河区', '广州天河', '广州市越秀区', '苏州工业园区'):
+            JobInfo.objects.create(job_post=post, job_title=location, job_location=location)
+        legacy = JobInfo.objects.create(job_post=post, job_title='未解析区县', job_location='广州市天河')
+        JobInfo.objects.filter(id=legacy.id).update(location_district='')
+
+        def titles(location):
+            response = self.client.get(reverse('jobs:job_list'), {'location': location})
+            return sorted(job.job_title for job in response.context['jobs'])
+
+        self.assertEqual(titles('广州天河区'), ['广州天河', '广州市天河区', '未解析区县'])
+        self.assertEqual(titles('广州市天河'), titles('广州天河区'))
+        self.assertEqual(titles('天河区'), titles('广州天河区'))
+        self.assertEqual(titles('苏州市工业园区'), ['苏州工业园区'])
+
+
+class PositionCountTests(SimpleTestCase):
+    """招聘人数解析测试"""
+
+    def test_parse_position_count(self):
+        """带"名/人"的数字优先，年份、日期等数字不计入人数"""
+        cases = {
+            '3': 3,
+            '2名': 2,
+            '若干': None,
+            '男1名，女1名': 2,
+            '1-2人': 2,
+            '3（男2女1）': 3,
+            '十二名': 12,
+            '2024年招聘3名': 3,
+            '2024年': None,
+            '共10人，限2023届毕业生': 10,
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(positions.parse_position_count(text), expected)
+
+
+class EligibilityTests(TestCase):
+    """"只看符合条件"筛选测试：学历、年龄、工作经验的边界"""
+
+    @classmethod
+    def setUpTestData(cls):
+        post = JobPost.objects.create(title='2024年事业单位招聘公告', category=JobPostCategory.PUBLIC_INSTITUTION.value)
+        cls.jobs = {
+            name: JobInfo.objects.create(job_post=post, job_title=name, **{field: level.value})
+            for name, field, level in (
+                ('学历不限', 'min_degree_level', DegreeLevel.NONE),
+                ('本科', 'min_degree_level', DegreeLevel.BACHELOR),
+                ('硕士', 'min_degree_level', DegreeLevel.MASTER),
+                ('年龄不限', 'max_age_level', AgeLevel.NONE),
+                ('30岁以下', 'max_age_level', AgeLevel.AGE_30),
+                ('35岁以下', 'max_age_level', AgeLevel.AGE_35),
+                ('经验不限', 'min_job_experience_level', JobExperienceLevel.NONE),
+                ('应届生', 'min_job_experience_level', JobExperienceLevel.NEW_GRAD),
+                ('3年以上', 'min_job_experience_level', JobExperienceLevel.Y_3),
+                ('5年以上', 'min_job_experience_level', JobExperienceLevel.Y_5),
+            )
+        }
+        user = CustomUser.objects.create_user(
+            username='eligible', email='eligible@example.com', password='password123', is_job_seeker=True
+        )
+        cls.job_seeker = JobSeeker.objects.create(user=user)
+
+    def setUp(self):
+        cache.clear()
+
+    def birth_date(self, age):
+        """今年生日已过、周岁为 age 的出生日期"""
+        today = timezone.localdate()
+        return datetime.date(today.year - age, today.month, 1)
+
+    def eligible(self, degree_level='', age=None, work_experience_years=None):
+        seeker = self.job_seeker
+        seeker.degree_level = degree_level
+        seeker.birth_date = self.birth_date(age) if age is not None else None
+        seeker.work_experience_years = work_experience_years
+        return set(JobInfo.objects.eligible_for(seeker).values_list('job_title', flat=True))
+
+    def test_degree(self):
+        """要求不高于求职者学历的岗位符合条件，要求高一级的不符合"""
+        self.assertEqual(self.eligible(DegreeLevel.BACHELOR.value), set(self.jobs) - {'硕士'})
+        self.assertEqual(self.eligible(DegreeLevel.COLLEGE.value), set(self.jobs) - {'本科', '硕士'})
+        self.assertEqual(self.eligible(DegreeLevel.NONE.value), set(self.jobs) - {'本科', '硕士'})
+
+    def test_age(self):
+        """年龄等于上限时符合条件，超过一岁不符合"""
+        self.assertEqual(self.eligible(age=30), set(self.jobs))
+        self.assertEqual(self.eligible(age=31), set(self.jobs) - {'30岁以下'})
+        self.assertEqual(self.eligible(age=36), set(self.jobs) - {'30岁以下', '35岁以下'})
+
+    def test_experience(self):
+        """工作年限等于要求时符合条件，少于要求不符合，应届生岗位不要求工作经验"""
+        self.assertEqual(self.eligible(work_experience_years=3), set(self.jobs) - {'5年以上'})
+        self.assertEqual(self.eligible(work_experience_years=2), set(self.jobs) - {'3年以上', '5年以上'})
+        self.assertEqual(self.eligible(work_experience_years=0), set(self.jobs) - {'3年以上', '5年以上'})
+
+    def test_missing_profile_fields(self):
+        """求职者未填写的条件不参与筛选"""
+        self.assertEqual(self.eligible(), set(self.jobs))
+        self.assertEqual(self.eligible('未知学历'), set(self.jobs))
+        self.assertEqual(self.eligible(age=40), set(self.jobs) - {'30岁以下', '35岁以下'})
+
+    def test_job_list_filter(self):
+        """列表页勾选"只看符合条件"时按登录求职者的资料筛选，未登录时不筛选"""
+        JobSeeker.objects.filter(id=self.job_seeker.id).update(
+            degree_level=DegreeLevel.BACHELOR.value, birth_date=self.birth_date(32), work_experience_years=4,
+        )
+
+        def titles(**params):
+            """沿游标翻完所有页，返回列出的岗位名称"""
+            result, cursor = set(), None
+            while True:
+                page = self.client.get(reverse('jobs:job_list'), {**params, 'cursor': cursor or ''}).context['jobs']
+                result.update(job.job_title for job in page)
+                cursor = page.next_cursor
+                if not cursor:
+                    return result
+        self.assertEqual(titles(eligible='1'), set(self.jobs))
+
+        self.client.force_login(self.job_seeker.user)
+        self.assertEqual(titles(eligible='1'), set(self.jobs) - {'硕士', '30岁以下', '5年以上'})
+        self.assertEqual(titles(), set(self.jobs))
+
+
+class MajorIndexTests(TestCase):
+    """专业要求解析测试"""
+
+    def test_parse_major_requirement(self):
+        """按分隔符拆分专业名称，去掉代码和修饰词，包含"不限"时不限专业"""
+        self.assertEqual(
+            majors.parse_major_requirement('计算机科学与技术（080901）、软件工程等相关专业，本科'),
+            (['计算机科学与技术', '软件工程'], False),
+        )
+        self.assertEqual(majors.parse_major_requirement('专业不限'), ([], True))
+        self.assertEqual(majors.parse_major_requirement(''), ([], False))
+
+    def test_parse_not_limited_to(self):
+        """只有单独的"不限"或"专业不限""不限专业"表示不限专业，"不限于"后面列出的专业照常解析"""
+        for text in ('不限', '不限专业', '所学专业不限', '专业要求：不限', '专业不限，须取得教师资格证'):
+            self.assertEqual(majors.parse_major_requirement(text), ([], True), text)
+        self.assertEqual(
+            majors.parse_major_requirement('包括但不限于计算机、软件工程'),
+            (['计算机', '软件工程'], False),
+        )
+        self.assertEqual(majors.parse_major_requirement('专业不限于理工类'), (['理工类'], False))
+
+    def test_filter_by_major_prefix(self):
+        """按专业名称的前缀检索，不限专业的岗位始终匹配"""
+        post = JobPost.objects.create(title='2024年信息中心招聘公告', category=JobPostCategory.PUBLIC_INSTITUTION.value)
+        computer = JobInfo.objects.create(job_post=post, job_title='网络管理', major_requirement='计算机科学与技术、网络工程')
+        software = JobInfo.objects.create(job_post=post, job_title='软件开发', major_requirement='包括但不限于软件工程')
+        open_job = JobInfo.objects.create(job_post=post, job_title='综合管理', major_requirement='不限专业')
+        JobInfo.objects.create(job_post=post, job_title='财务', major_requirement='会计学')
+
+        def matched(major):
+            return set(majors.filter_by_major(JobInfo.objects.all(), major).values_list('id', flat=True))
+        self.assertEqual(matched('计算机'), {computer.id, open_job.id})
+        self.assertEqual(matched('计算机科学与技术专业'), {computer.id, open_job.id})
+        self.assertEqual(matched('软件'), {software.id, open_job.id})
+        self.assertEqual(matched('科学与技术'), {open_job.id})
+
+    def test_unrestricted_kept_on_resave(self):
+        """不限专业是保存时计算的派生字段，内存中的实例再次保存不会把它写回 False"""
+        post = JobPost.objects.create(title='2024年教师招聘公告', category=JobPostCategory.TEACHER.value)
+        job = JobInfo.objects.create(job_post=post, job_title='a', major_requirement='不限')
+        self.assertTrue(job.major_unrestricted)
+        job.job_title = 'b'
+        job.save()
+        job.refresh_from_db()
+        self.assertTrue(job.major_unrestricted)
+
+        job.major_requirement = '汉语言文学'
+        job.save(update_fields=['major_requirement'])
+        self.assertFalse(JobInfo.objects.get(id=job.id).major_unrestricted)
+        self.assertEqual(majors.filter_by_major(JobInfo.objects.all(), '数学').count(), 0)
+
+
+class JobPostDenormalizationTests(TestCase):
+    """岗位冗余保存公告字段测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_copied_on_save(self):
+        """保存岗位时复制所属公告的字段"""
+        job = JobInfo.objects.get(id=self.seed['job'].id)
+        self.assertEqual(job.post_category, JobPostCategory.TEACHER.value)
+        self.assertTrue(job.post_is_active)
+
+    def test_synced_on_job_post_update(self):
+        """公告更新后批量同步其下岗位"""
+        job_post = self.seed['job_post']
+        job_post.category = JobPostCategory.PUBLIC_INSTITUTION.value
+        job_post.application_end_date = datetime.date(2024, 6, 30)
+        job_post.save()
+        jobs = JobInfo.objects.filter(job_post=job_post)
+        self.assertEqual(jobs.filter(
+            post_category=JobPostCategory.PUBLIC_INSTITUTION.value,
+            post_application_end_date=datetime.date(2024, 6, 30),
+        ).count(), 6)
+        self.assertEqual(JobInfo.objects.filter(post_category=JobPostCategory.TEACHER.value).count(), 12)
+
+    def test_job_list_hides_inactive_job_post(self):
+        """公告下线后其下岗位不再出现在列表中"""
+        job_post = self.seed['job_post']
+        job_post.is_active = False
+        job_post.save()
+        response = self.client.get(reverse('jobs:job_list'), {'page': 1})
+        self.assertEqual(response.context['jobs'].paginator.count, 12)
+
+    def test_category_filter_without_join(self):
+        """按公告分类筛选不连接公告表"""
+        queryset = JobInfo.objects.active().filter(post_category=JobPostCategory.TEACHER.value)
+        self.assertNotIn('JOIN', str(queryset.values('id').query))
+        self.assertEqual(queryset.count(), 18)
+
+
+class JobPostExpiryTests(TestCase):
+    """过期公告自动下线测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+        JobPost.objects.filter(id=cls.seed['job_post'].id).update(application_end_date=datetime.date(2024, 1, 31))
+        JobPost.objects.exclude(id=cls.seed['job_post'].id).update(application_end_date=datetime.date(2024, 3, 31))
+
+    def expire(self, today, **kwargs):
+        return expiry.expire_job_posts(today=today, **kwargs)
+
+    def test_expire_job_posts(self):
+        """截止时间已过的公告及其岗位下线，分类统计同步扣减"""
+        self.assertEqual(self.expire(datetime.date(2024, 2, 1)), (1, 6))
+        job_post = JobPost.objects.get(id=self.seed['job_post'].id)
+        self.assertFalse(job_post.is_active)
+        self.assertFalse(JobInfo.objects.filter(job_post=job_post, post_is_active=True).exists())
+        self.assertEqual(JobInfo.objects.active().count(), 12)
+
+        row = CategoryStats.objects.get(category=JobPostCategory.TEACHER.value)
+        self.assertEqual((row.post_count, row.job_count, row.position_count), (2, 12, 24))
+
+    def test_reactivated_post_restores_jobs(self):
+        """只下线公告，不改写岗位自身状态；公告重新上线后岗位恢复显示"""
+        job_post = self.seed['job_post']
+        JobInfo.objects.filter(id=job_post.jobs.order_by('id').first().id).update(is_active=False)
+        self.expire(datetime.date(2024, 2, 1))
+        job_post.refresh_from_db()
+        self.assertEqual(JobInfo.objects.filter(job_post=job_post, is_active=True).count(), 5)
+
+        job_post.application_end_date = datetime.date(2024, 6, 30)
+        job_post.is_active = True
+        job_post.save()
+        self.assertEqual(JobInfo.objects.active().filter(job_post=job_post).count(), 5)
+        self.assertEqual(JobInfo.objects.active().count(), 17)
+
+    def test_idempotent(self):
+        """重复执行不会重复下线或重复扣减统计"""
+        self.expire(datetime.date(2024, 2, 1))
+        self.assertEqual(self.expire(datetime.date(2024, 2, 1)), (0, 0))
+        self.assertEqual(CategoryStats.objects.get(category=JobPostCategory.TEACHER.value).post_count, 2)
+
+    def test_cache_invalidated_once_per_batch(self):
+        """每批只递增一次数据版本号"""
+        with mock.patch.object(expiry, 'bump_data_version') as bump:
+            self.assertEqual(self.expire(datetime.date(2024, 4, 1), batch_size=2), (3, 18))
+        self.assertEqual(bump.call_count, 2)
+
+
+class BenchmarkDataTests(TestCase):
+    """压测数据生成命令测试"""
+
+    OPTIONS = {
+        'posts': 3, 'jobs_per_post': 2, 'seekers': 2, 'applications_per_seeker': 1, 'bookmarks_per_seeker': 1,
+        'views_per_seeker': 2, 'html_paragraphs': 1, 'days': 30, 'end_date': datetime.date(2024, 6, 30),
+    }
+
+    def generate(self, **options):
+        call_command('generate_benchmark_data', stdout=StringIO(), **{**self.OPTIONS, **options})
+
+    def snapshot(self):
+        posts = JobPost.objects.order_by('source_url').values_list('source_url', 'publish_date', 'created_at')
+        applications = Application.objects.order_by('job_seeker__user__username').values_list('applied_date', flat=True)
+        return list(posts), list(applications)
+
+    def test_reproducible(self):
+        """相同参数生成相同数据，时间由截止日期和随机数种子推算"""
+        self.generate()
+        first = self.snapshot()
+        self.assertTrue(all(created_at.date() <= datetime.date(2024, 6, 30) for _, _, created_at in first[0]))
+        self.assertEqual(
+            set(JobInfo.objects.values_list('created_at', flat=True)),
+            set(created_at for _, _, created_at in first[0]),
+        )
+
+        self.generate(clear=True)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_generate_twice_without_clear(self):
+        """不使用 --clear 再次生成时接着已有数据编号"""
+        self.generate()
+        self.generate()
+        self.assertEqual(JobPost.objects.count(), 6)
+        self.assertEqual(JobSeeker.objects.count(), 4)
+
+
+class CategoryStatsTests(TestCase):
+    """分类统计增量维护测试：信号增量更新的结果与全量重建一致"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+        cls.medical_post = JobPost.objects.create(title='医院招聘公告', category=JobPostCategory.MEDICAL.value)
+        JobInfo.objects.create(job_post=cls.medical_post, job_title='护士', num_positions='3')
+
+    def snapshot(self):
+        """统计表内容，忽略增量更新留下的全零行"""
+        def rows(model, *key):
+            return {
+                tuple(getattr(row, name) for name in key): (row.post_count, row.job_count, row.position_count)
+                for row in model.objects.all()
+                if row.post_count or row.job_count or row.position_count
+            }
+        return rows(CategoryStats, 'category'), rows(CategoryDailyStats, 'category', 'date')
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        stats.rebuild_category_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_create(self):
+        """新增公告和岗位"""
+        post = JobPost.objects.create(title='银行招聘公告', category=JobPostCategory.BANK.value)
+        JobInfo.objects.create(job_post=post, job_title='柜员', num_positions='2名')
+        JobInfo.objects.create(job_post=post, job_title='客户经理', num_positions='若干')
+        self.assertMatchesRebuild()
+
+    def test_deactivate_and_reactivate_job(self):
+        """岗位下线、重新上线、修改招聘人数"""
+        job = self.seed['job']
+        job.is_active = False
+        job.save()
+        self.assertMatchesRebuild()
+
+        job.is_active = True
+        job.num_positions = '5名'
+        job.save()
+        self.assertMatchesRebuild()
+
+    def test_move_job_between_categories(self):
+        """岗位更换到其他分类的公告"""
+        job = self.seed['job']
+        job.job_post = self.medical_post
+        job.save()
+        self.assertMatchesRebuild()
+
+    def test_change_post_category_and_status(self):
+        """公告更换分类、下线、重新上线"""
+        post = self.seed['job_post']
+        post.category = JobPostCategory.CIVIL_SERVANT.value
+        post.save()
+        self.assertMatchesRebuild()
+
+        post.is_active = False
+        post.save()
+        self.assertMatchesRebuild()
+
+        post.is_active = True
+        post.save()
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        """删除岗位、级联删除公告及其岗位"""
+        self.seed['applied_job'].delete()
+        self.assertMatchesRebuild()
+
+        self.medical_post.delete()
+        self.assertMatchesRebuild()
+
+    def test_duplicates(self):
+        """转载岗位不计入统计：标记转载、原始岗位下线或删除后恢复、重新检测全部岗位"""
+        fields = {
+            'job_title': '初中英语教师', 'organization': '某县教育局', 'job_location': '广州市天河区',
+            'num_positions': '2名', 'degree_requirement': '本科及以上', 'major_requirement': '英语',
+            'other_requirement': '具有初级中学及以上英语教师资格证',
+        }
+
+        def create_job(title):
+            post = JobPost.objects.create(title=title, category=JobPostCategory.TEACHER.value)
+            job = JobInfo.objects.create(job_post=post, **fields)
+            dedup.detect_duplicates([job])
+            return job
+
+        original = create_job('2024年英语教师招聘公告')
+        duplicate = create_job('转载：2024年英语教师招聘公告')
+        self.assertEqual(duplicate.duplicate_of_id, original.id)
+        self.assertMatchesRebuild()
+
+        # 转载岗位自身的修改不影响统计
+        duplicate.num_positions = '5名'
+        duplicate.save()
+        self.assertMatchesRebuild()
+
+        # 原始岗位下线后转载岗位恢复计入
+        original.is_active = False
+        original.save()
+        duplicate.refresh_from_db()
+        self.assertIsNone(duplicate.duplicate_of_id)
+        self.assertMatchesRebuild()
+
+        # 原始岗位删除前重新检测转载它的岗位
+        repost = create_job('再次转载：2024年英语教师招聘公告')
+        self.assertEqual(repost.duplicate_of_id, duplicate.id)
+        self.assertMatchesRebuild()
+        duplicate.delete()
+        self.assertIsNone(JobInfo.objects.get(id=repost.id).duplicate_of_id)
+        self.assertMatchesRebuild()
+
+        create_job('第三次转载：2024年英语教师招聘公告')
+        dedup.backfill_duplicates(reset=True)
+        self.assertMatchesRebuild()
+
+    def test_expire_posts(self):
+        """过期公告批量下线"""
+        JobPost.objects.filter(id=self.seed['job_post'].id).update(application_end_date=datetime.date(2024, 1, 31))
+        self.assertEqual(expiry.expire_job_posts(today=datetime.date(2024, 2, 1))[0], 1)
+        self.assertMatchesRebuild()
+
+
+class JobImportTests(TestCase):
+    """NDJSON 批量导入测试"""
+
+    def write_file(self, lines):
+        f = tempfile.NamedTemporaryFile('w', suffix='.ndjson', encoding='utf-8', delete=False)
+        self.addCleanup(os.remove, f.name)
+        with f:
+            f.write('\n'.join(lines))
+        return f.name
+
+    def record(self, index, **fields):
+        return json.dumps({
+            'title': f'2024年教师招聘公告{index}',
+            'source_url': f'https://example.com/import/{index}',
+            'category': JobPostCategory.TEACHER.value,
+            'application_end_date': '2024-06-30',
+            'jobs': [
+                {'job_title': f'小学语文教师{index}-{j}', 'job_location': '广州市天河区', 'num_positions': '2',
+                 'major_requirement': '汉语言文学'}
+                for j in range(3)
+            ],
+            **fields,
+        }, ensure_ascii=False)
+
+    def call(self, path, **options):
+        out, err = StringIO(), StringIO()
+        call_command('import_jobs', path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_import(self):
+        """按块写入公告和岗位，派生字段、专业关联和分类统计同步更新"""
+        path = self.write_file([self.record(i) for i in range(5)])
+        out, err = self.call(path, chunk_size=2)
+        self.assertIn('成功导入 5 个新公告、更新 0 个公告、跳过 0 个未变化的公告，新增 15 个岗位', out)
+        self.assertIn('0 行出错', out)
+        self.assertEqual(err, '')
+
+        job = JobInfo.objects.get(job_title='小学语文教师0-0')
+        self.assertEqual(job.position_count, 2)
+        self.assertEqual(job.post_category, JobPostCategory.TEACHER.value)
+        self.assertEqual(job.post_application_end_date, datetime.date(2024, 6, 30))
+        self.assertTrue(job.majors.filter(name='汉语言文学').exists())
+
+        row = CategoryStats.objects.get(category=JobPostCategory.TEACHER.value)
+        self.assertEqual((row.post_count, row.job_count, row.position_count), (5, 15, 30))
+
+    def test_errors_do_not_abort(self):
+        """格式错误的行跳过并报告行号，其余行正常导入"""
+        path = self.write_file([
+            self.record(0),
+            '{not json',
+            self.record(2, category='不存在的分类'),
+            self.record(3, jobs=[{'min_degree_level': '不存在的学历'}]),
+            self.record(4),
+        ])
+        out, err = self.call(path)
+        self.assertIn('成功导入 2 个新公告', out)
+        self.assertIn('3 行出错', out)
+        self.assertIn('第 2 行', err)
+        self.assertIn('第 3 行：category', err)
+        self.assertIn('第 4 行：第1个岗位 min_degree_level', err)
+
+    def test_database_error_isolated(self):
+        """整块写入失败时逐条重试，只跳过出错的公告"""
+        index_jobs = importer.search.index_jobs
+
+        def failing_index_jobs(jobs):
+            if any(job.job_title.startswith('小学语文教师1-') for job in jobs):
+                raise DatabaseError('模拟写入失败')
+            index_jobs(jobs)
+
+        path = self.write_file([self.record(i) for i in range(3)])
+        with mock.patch.object(importer.search, 'index_jobs', failing_index_jobs):
+            out, err = self.call(path)
+        self.assertIn('成功导入 2 个新公告', out)
+        self.assertIn('1 行出错', out)
+        self.assertIn('第 2 行：写入失败', err)
+        self.assertFalse(JobPost.objects.filter(title='2024年教师招聘公告1').exists())
+        self.assertEqual(CategoryStats.objects.get(category=JobPostCategory.TEACHER.value).job_count, 6)
+
+
+    def test_reimport_unchanged(self):
+        """重新导入未变化的公告时直接跳过，不更新 updated_at"""
+        path = self.write_file([self.record(i) for i in range(3)])
+        self.call(path)
+        updated_at = dict(JobInfo.objects.values_list('id', 'updated_at'))
+        with mock.patch.object(importer, 'bump_data_version') as bump:
+            out, _ = self.call(path)
+        self.assertIn('成功导入 0 个新公告、更新 0 个公告、跳过 3 个未变化的公告', out)
+        self.assertEqual(dict(JobInfo.objects.values_list('id', 'updated_at')), updated_at)
+        self.assertEqual(JobPost.objects.count(), 3)
+        bump.assert_not_called()
+
+    def test_reimport_changed(self):
+        """变化的公告只更新有变化的岗位，新增岗位写入，消失的岗位下线"""
+        self.call(self.write_file([self.record(i) for i in range(2)]))
+        updated_at = dict(JobInfo.objects.values_list('job_title', 'updated_at'))
+
+        jobs = [
+            {'job_title': '小学语文教师0-0', 'job_location': '广州市天河区', 'num_positions': '5',
+             'major_requirement': '汉语言文学'},
+            {'job_title': '小学语文教师0-1', 'job_location': '广州市天河区', 'num_positions': '2',
+             'major_requirement': '汉语言文学'},
+            {'job_title': '初中数学教师', 'job_location': '深圳市南山区', 'num_positions': '1',
+             'major_requirement': '数学与应用数学'},
+        ]
+        out, _ = self.call(self.write_file([self.record(0, jobs=jobs), self.record(1)]))
+        self.assertIn('成功导入 0 个新公告、更新 1 个公告、跳过 1 个未变化的公告', out)
+        self.assertIn('新增 1 个岗位、更新 1 个岗位、下线 1 个岗位', out)
+
+        current = dict(JobInfo.objects.values_list('job_title', 'updated_at'))
+        self.assertNotEqual(current['小学语文教师0-0'], updated_at['小学语文教师0-0'])
+        self.assertEqual(current['小学语文教师0-1'], updated_at['小学语文教师0-1'])
+        self.assertEqual(current['小学语文教师1-0'], updated_at['小学语文教师1-0'])
+        self.assertEqual(JobInfo.objects.get(job_title='小学语文教师0-0').position_count, 5)
+        self.assertFalse(JobInfo.objects.get(job_title='小学语文教师0-2').is_active)
+        self.assertTrue(JobInfo.objects.get(job_title='初中数学教师').majors.filter(name='数学与应用数学').exists())
+
+        row = CategoryStats.objects.get(category=JobPostCategory.TEACHER.value)
+        self.assertEqual((row.post_count, row.job_count, row.position_count), (2, 6, 14))
+
+    def test_empty_source_url(self):
+        """空链接保存为 NULL，多个没有链接的公告都作为新公告导入"""
+        out, err = self.call(self.write_file([self.record(i, source_url='') for i in range(2)]))
+        self.assertIn('成功导入 2 个新公告', out)
+        self.assertEqual(err, '')
+        self.assertEqual(list(JobPost.objects.values_list('source_url', flat=True)), [None, None])
+
+    def test_update_keeps_expired_post_offline(self):
+        """内容变化的公告更新时不覆盖启停状态，已过期下线的公告不会重新上线"""
+        self.call(self.write_file([self.record(0)]))
+        expiry.expire_job_posts(datetime.date(2024, 7, 1))
+        out, _ = self.call(self.write_file([self.record(0, title='更正公告')]))
+        self.assertIn('更新 1 个公告', out)
+        post = JobPost.objects.get()
+        self.assertEqual(post.title, '更正公告')
+        self.assertFalse(post.is_active)
+        self.assertEqual(JobInfo.objects.active().count(), 0)
+
+    def test_duplicate_url_in_file(self):
+        """同一文件中重复出现的链接按更新处理，不违反唯一约束"""
+        out, err = self.call(self.write_file([self.record(0), self.record(0, title='更正公告')]))
+        self.assertIn('成功导入 1 个新公告、更新 1 个公告', out)
+        self.assertEqual(err, '')
+        self.assertEqual(JobPost.objects.get().title, '更正公告')
+
+
+class JobExtractionTests(TestCase):
+    """公告正文岗位表解析测试"""
+
+    HTML = (
+        '<p>现将招聘岗位公告如下：</p><table>'
+        '<tr><td colspan="6">岗位表</td></tr>'
+        '<tr><th>岗位代码</th><th>岗位名称</th><th>招聘<br>人数</th><th>学历要求</th><th>专业</th><th>年龄</th>'
+        '<th>工作地点</th></tr>'
+        '<tr><td>01</td><td>小学语文教师</td><td>2</td><td rowspan="2">本科及以上</td><td>汉语言文学</td>'
+        '<td>35周岁以下</td><td rowspan="2">广州市天河区</td></tr>'
+        '<tr><td>02</td><td>小学数学教师</td><td>3名</td><td>数学与应用数学</td><td>18-32周岁</td></tr>'
+        '<tr><td>03</td><td>校医</td><td>1</td><td>大专或本科</td><td>临床医学</td><td>不限</td><td>广州市</td></tr>'
+        '</table>'
+    )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, 'extract_jobs.checkpoint')
+
+    def call(self, **options):
+        out = StringIO()
+        call_command('extract_jobs', workers=1, checkpoint=self.checkpoint, stdout=out, **options)
+        return out.getvalue()
+
+    def test_extract_jobs(self):
+        """按表头识别各列，展开合并单元格，解析学历和年龄等级"""
+        jobs = extraction.extract_jobs(self.HTML)
+        self.assertEqual([job['job_title'] for job in jobs], ['小学语文教师', '小学数学教师', '校医'])
+        self.assertEqual(jobs[1]['degree_requirement'], '本科及以上')
+        self.assertEqual(jobs[1]['job_location'], '广州市天河区')
+        self.assertEqual(jobs[1]['num_positions'], '3名')
+        self.assertEqual(jobs[1]['max_age_level'], '35岁以下')
+        self.assertEqual(jobs[2]['min_degree_level'], '大专（含高职、高专）')
+        self.assertEqual(extraction.extract_jobs('<p>没有表格</p>'), [])
+
+    def test_command_fills_blank_fields(self):
+        """补全岗位为空的字段，已有的值不覆盖，派生字段和统计同步更新"""
+        post = JobPost.objects.create(title='教师招聘公告', category=JobPostCategory.TEACHER.value, html_text=self.HTML)
+        chinese = JobInfo.objects.create(job_post=post, job_title='小学语文教师')
+        math = JobInfo.objects.create(job_post=post, job_title='小学数学教师', job_location='深圳市南山区')
+
+        out = self.call()
+        self.assertIn('成功处理 1 个公告，其中 1 个包含岗位表，更新 2 个岗位，1 行没有对应的岗位', out)
+
+        chinese.refresh_from_db()
+        self.assertEqual(chinese.min_degree_level, '本科')
+        self.assertEqual(chinese.position_count, 2)
+        self.assertEqual(chinese.location_district, '天河')
+        self.assertTrue(chinese.majors.filter(name='汉语言文学').exists())
+        math.refresh_from_db()
+        self.assertEqual(math.job_location, '深圳市南山区')
+        self.assertEqual(CategoryStats.objects.get(category=JobPostCategory.TEACHER.value).position_count, 5)
+
+    def interrupt(self):
+        """处理完第一个公告后中断"""
+        apply_extracted = extraction.apply_extracted
+        calls = []
+
+        def fail_after_first(*args, **kwargs):
+            calls.append(args)
+            if len(calls) > 1:
+                raise DatabaseError('中断')
+            return apply_extracted(*args, **kwargs)
+
+        with mock.patch.object(extraction, 'apply_extracted', side_effect=fail_after_first), \
+                self.assertRaises(DatabaseError):
+            self.call(chunk_size=1)
+
+    def test_checkpoint(self):
+        """中断后从检查点继续，--restart 重新开始；全部完成后删除检查点"""
+        JobPost.objects.create(title='教师招聘公告', html_text=self.HTML)
+        JobPost.objects.create(title='教师招聘公告2', html_text=self.HTML)
+        self.interrupt()
+        self.assertTrue(os.path.exists(self.checkpoint))
+        self.assertIn('成功处理 1 个公告', self.call())
+        self.assertFalse(os.path.exists(self.checkpoint))
+        self.assertIn('成功处理 2 个公告', self.call())
+
+        self.interrupt()
+        self.assertIn('成功处理 2 个公告', self.call(restart=True))
+
+    def test_checkpoint_per_options(self):
+        """检查点由不同的 --overwrite 选项写入时从头开始"""
+        JobPost.objects.create(title='教师招聘公告', html_text=self.HTML)
+        JobPost.objects.create(title='教师招聘公告2', html_text=self.HTML)
+        self.interrupt()
+        self.assertIn('成功处理 2 个公告', self.call(overwrite=True))
+
+
+class AttachmentImportTests(TestCase):
+    """附件岗位表导入测试"""
+
+    ROWS = [
+        ['2024年岗位表'],
+        ['序号', '岗位名称', '招聘人数', '学历', '所学专业', '年龄', '工作地点', '职位'],
+        ['1', '小学语文教师', '2', '本科及以上', '汉语言文学', '35周岁以下', '广州市天河区', '语文'],
+        ['', '', '', '', '', '', '', ''],
+        ['2', '校医', '1', '大专', '临床医学', '40周岁以下', '广州市', '医务'],
+        ['序号', '岗位名称', '招聘人数', '学历', '所学专业', '年龄', '工作地点', '职位'],
+        ['3', '专业技术岗', '3', '硕士', '会计学', '不限', '深圳市', '财务'],
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.job_post = JobPost.objects.create(
+            title='2024年教师招聘公告', organization='某县教育局', category=JobPostCategory.TEACHER.value,
+        )
+
+    def write_csv(self, rows, encoding='utf-8'):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'jobs.csv')
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            csv.writer(f).writerows(rows)
+        return path
+
+    def call(self, path, *args, **options):
+        out, err = StringIO(), StringIO()
+        call_command('import_attachment', self.job_post.id, path, *args, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        """识别表头、跳过空行和重复表头，GBK 编码的 csv 也能读取"""
+        out, _ = self.call(self.write_csv(self.ROWS, encoding='gbk'), batch_size=2)
+        self.assertIn('成功导入 3 个岗位', out)
+
+        job = JobInfo.objects.get(job_title='小学语文教师')
+        self.assertEqual(job.organization, '某县教育局')
+        self.assertEqual(job.min_degree_level, '本科')
+        self.assertEqual(job.max_age_level, '35岁以下')
+        self.assertEqual(job.position_count, 2)
+        self.assertEqual(job.post_category, JobPostCategory.TEACHER.value)
+        self.assertTrue(job.majors.filter(name='汉语言文学').exists())
+        self.assertTrue(JobInfo.objects.filter(job_title='专业技术岗').exists())
+
+        row = CategoryStats.objects.get(category=JobPostCategory.TEACHER.value)
+        self.assertEqual((row.post_count, row.job_count, row.position_count), (1, 3, 6))
+
+    def test_mapping(self):
+        """按指定的表头映射读取，字段值错误的行跳过并报告行号"""
+        rows = [['职位', '人数', '学历层次'], ['文秘', '1', '本科'], ['会计', '2', '不存在的学历']]
+        out, err = self.call(
+            self.write_csv(rows), '--map', '职位=job_title', '--map', '学历层次=min_degree_level',
+        )
+        self.assertIn('成功导入 1 个岗位', out)
+        self.assertIn('1 行出错', out)
+        self.assertIn('第 3 行：min_degree_level', err)
+        self.assertEqual(JobInfo.objects.get(job_title='文秘').min_degree_level, '本科')
+
+    def test_import_xlsx(self):
+        """xlsx 附件以只读模式逐行读取"""
+        workbook = openpyxl.Workbook()
+        for row in self.ROWS:
+            workbook.active.append([int(value) if value.isdigit() else value for value in row])
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'jobs.xlsx')
+        workbook.save(path)
+
+        out, _ = self.call(path)
+        self.assertIn('成功导入 3 个岗位', out)
+        self.assertEqual(JobInfo.objects.get(job_title='校医').num_positions, '1')
+
+    def test_reimport_updates_existing_jobs(self):
+        """同一附件重复导入不会重复创建岗位，按岗位名称更新已有岗位"""
+        path = self.write_csv(self.ROWS)
+        self.call(path, batch_size=2)
+        out, _ = self.call(path, batch_size=2)
+        self.assertIn('成功导入 0 个岗位', out)
+        self.assertIn('更新 0 个已有岗位', out)
+        self.assertEqual(JobInfo.objects.filter(job_post=self.job_post).count(), 3)
+
+        rows = [self.ROWS[1], ['1', '小学语文教师', '5', '硕士', '汉语言文学', '35周岁以下', '广州市天河区', '语文'],
+                ['4', '体育教师', '1', '本科', '体育教育', '30周岁以下', '广州市', '体育']]
+        out, _ = self.call(self.write_csv(rows))
+        self.assertIn('成功导入 1 个岗位', out)
+        self.assertIn('更新 1 个已有岗位', out)
+        job = JobInfo.objects.get(job_title='小学语文教师')
+        self.assertEqual((job.position_count, job.min_degree_level), (5, '硕士'))
+
+        row = CategoryStats.objects.get(category=JobPostCategory.TEACHER.value)
+        self.assertEqual((row.post_count, row.job_count, row.position_count), (1, 4, 10))
+
+    def test_invalid_batch_size(self):
+        """--batch-size 小于1时报错"""
+        with self.assertRaisesMessage(CommandError, '--batch-size 必须大于0'):
+            self.call(self.write_csv(self.ROWS), batch_size=0)
+
+    def test_admin_action(self):
+        """管理后台选择一个公告上传附件导入"""
+        admin_user = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        url = reverse('admin:jobs_jobpost_changelist')
+        data = {'action': 'import_attachment', '_selected_action': [self.job_post.id]}
+
+        response = self.client.post(url, data)
+        self.assertContains(response, '岗位表附件')
+
+        content = '\n'.join(','.join(row) for row in self.ROWS).encode('utf-8')
+        response = self.client.post(url, {
+            **data, 'apply': '导入', 'attachment': SimpleUploadedFile('jobs.csv', content), 'mapping': '',
+        })
+        self.assertRedirects(response, url)
+        self.assertEqual(JobInfo.objects.filter(job_post=self.job_post).count(), 3)
+
+
+class DuplicateDetectionTests(TestCase):
+    """重复岗位检测测试"""
+
+    JOBS = [
+        {'job_title': '小学语文教师', 'job_location': '广州市天河区', 'num_positions': '2',
+         'degree_requirement': '本科及以上', 'major_requirement': '汉语言文学、汉语国际教育',
+         'age_requirement': '35周岁以下', 'other_requirement': '具有小学及以上语文教师资格证'},
+        {'job_title': '初中数学教师', 'job_location': '广州市天河区', 'num_positions': '1',
+         'degree_requirement': '硕士研究生及以上', 'major_requirement': '数学与应用数学、统计学',
+         'age_requirement': '30周岁以下', 'other_requirement': '具有初级中学及以上数学教师资格证'},
+    ]
+
+    def import_posts(self, *posts, start=0):
+        f = tempfile.NamedTemporaryFile('w', suffix='.ndjson', encoding='utf-8', delete=False)
+        self.addCleanup(os.remove, f.name)
+        with f:
+            for index, (jobs, fields) in enumerate(posts, start=start):
+                f.write(json.dumps({
+                    'title': f'2024年教师招聘公告{index}',
+                    'organization': '某县教育局',
+                    'source_url': f'https://example.com/dedup/{index}',
+                    'category': JobPostCategory.TEACHER.value,
+                    'jobs': jobs,
+                    **fields,
+                }, ensure_ascii=False) + '\n')
+        out = StringIO()
+        call_command('import_jobs', f.name, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_similarity(self):
+        """相同文本的签名一致，不同文本的相似度低"""
+        job = JobInfo(**self.JOBS[0])
+        other = JobInfo(**self.JOBS[1])
+        signature = dedup.minhash(dedup.job_text(job))
+        spaced = JobInfo(**dict(self.JOBS[0], other_requirement='具有小学及以上 语文教师资格证。'))
+        self.assertEqual(signature, dedup.minhash(dedup.job_text(spaced)))
+        self.assertEqual(dedup.similarity(signature, signature), 1)
+        self.assertLess(dedup.similarity(signature, dedup.minhash(dedup.job_text(other))), dedup.DUPLICATE_THRESHOLD)
+        self.assertIsNone(dedup.minhash(''))
+
+    def test_import_flags_reposted_jobs(self):
+        """其他网站转载的公告中的岗位标记为重复，不在列表中显示，也不计入分类统计"""
+        reposted = [dict(self.JOBS[0], other_requirement='具有小学及以上语文教师资格证。'), self.JOBS[1]]
+        changed = [self.JOBS[0], dict(self.JOBS[1], major_requirement='计算机科学与技术', age_requirement='不限',
+                                      other_requirement='')]
+        out = self.import_posts((self.JOBS, {}), (reposted, {}), (changed, {}))
+        self.assertIn('3 个岗位与已有岗位重复', out)
+
+        originals = list(JobInfo.objects.filter(job_post__title='2024年教师招聘公告0').order_by('id'))
+        self.assertEqual([job.duplicate_of_id for job in originals], [None, None])
+        duplicates = JobInfo.objects.filter(duplicate_of__isnull=False)
+        self.assertEqual(
+            sorted(duplicates.values_list('job_post__title', 'job_title', 'duplicate_of_id')),
+            [
+                ('2024年教师招聘公告1', '初中数学教师', originals[1].id),
+                ('2024年教师招聘公告1', '小学语文教师', originals[0].id),
+                ('2024年教师招聘公告2', '小学语文教师', originals[0].id),
+            ],
+        )
+        self.assertEqual(JobInfo.objects.active().count(), 3)
+        self.assertEqual(CategoryStats.objects.get(category=JobPostCategory.TEACHER.value).job_count, 3)
+
+        response = self.client.get(reverse('jobs:job_list'))
+        self.assertEqual(len(response.context['jobs']), 3)
+
+    def test_detail_and_apply_hidden_jobs(self):
+        """转载岗位的详情页跳转到原始岗位；转载岗位和已下线公告的岗位不能查看或报名"""
+        self.import_posts((self.JOBS, {}), (self.JOBS, {}))
+        original, duplicate = JobInfo.objects.filter(job_title=self.JOBS[0]['job_title']).order_by('id')
+        self.assertEqual(duplicate.duplicate_of_id, original.id)
+
+        def detail(job):
+            return reverse('jobs:job_detail', args=[job.id])
+
+        def apply(job):
+            return self.client.post(reverse('jobs:apply_job', args=[job.id]), {'cover_letter': '求职信'})
+        self.assertRedirects(self.client.get(detail(duplicate)), detail(original))
+
+        user = CustomUser.objects.create_user(
+            username='applicant', email='applicant@example.com', password='password123', is_job_seeker=True
+        )
+        JobSeeker.objects.create(user=user)
+        self.client.force_login(user)
+        self.assertEqual(apply(duplicate).status_code, 404)
+
+        # 原始岗位的公告下线后，原始岗位不再可见，转载岗位恢复显示
+        post = original.job_post
+        post.is_active = False
+        post.save()
+        self.assertEqual(apply(original).status_code, 404)
+        self.assertFalse(Application.objects.exists())
+        self.client.logout()
+        self.assertEqual(self.client.get(detail(original)).status_code, 404)
+        self.assertEqual(self.client.get(detail(duplicate)).status_code, 200)
+
+    def test_same_post_not_flagged(self):
+        """同一公告中文本相同的岗位不标记为重复"""
+        self.import_posts(([self.JOBS[0], self.JOBS[0]], {}))
+        self.assertFalse(JobInfo.objects.filter(duplicate_of__isnull=False).exists())
+
+    def test_reimport_clears_flag(self):
+        """转载的岗位修改后不再相似时取消重复标记"""
+        self.import_posts((self.JOBS, {}), (self.JOBS, {}))
+        self.assertEqual(JobInfo.objects.filter(duplicate_of__isnull=False).count(), 2)
+
+        changed = [dict(self.JOBS[0], degree_requirement='大专', major_requirement='学前教育',
+                        age_requirement='40周岁以下', other_requirement='不限'), self.JOBS[1]]
+        self.import_posts((self.JOBS, {}), (changed, {}))
+        self.assertEqual(
+            list(JobInfo.objects.filter(duplicate_of__isnull=False).values_list('job_title', flat=True)),
+            ['初中数学教师'],
+        )
+
+    def test_different_organization_or_location_not_flagged(self):
+        """要求相同但招聘单位（岗位未填写时取公告的单位）或工作地点不同的岗位不是重复岗位"""
+        job = {'job_title': '小学数学教师', 'degree_requirement': '本科', 'major_requirement': '数学类',
+               'age_requirement': '35周岁以下'}
+        self.import_posts(
+            ([dict(job, job_location='广州市')], {'organization': '广州A小学'}),
+            ([dict(job, job_location='北京市')], {'organization': '北京B小学'}),
+            ([dict(job, job_location='广州市')], {'organization': '广州C小学'}),
+            ([dict(job, job_location='深圳市')], {'organization': '广州A小学'}),
+        )
+        self.assertFalse(JobInfo.objects.filter(duplicate_of__isnull=False).exists())
+        self.assertEqual(JobInfo.objects.active().count(), 4)
+
+        self.import_posts(([dict(job, job_location='广州市')], {'organization': '广州A小学'}), start=4)
+        self.assertEqual(
+            JobInfo.objects.get(job_post__title='2024年教师招聘公告4').duplicate_of,
+            JobInfo.objects.get(job_post__title='2024年教师招聘公告0'),
+        )
+
+    def test_inactive_original_not_candidate(self):
+        """下线的岗位不作为原始岗位，之后的转载正常显示"""
+        self.import_posts((self.JOBS, {'is_active': False}), (self.JOBS, {}))
+        self.assertFalse(JobInfo.objects.filter(duplicate_of__isnull=False).exists())
+        self.assertEqual(JobInfo.objects.active().count(), 2)
+
+    def test_original_deactivated_releases_duplicates(self):
+        """原始岗位下线后，最早的转载成为新的原始岗位，其余转载指向它"""
+        self.import_posts((self.JOBS, {}), (self.JOBS, {}), (self.JOBS, {}))
+        self.assertEqual(JobInfo.objects.active().count(), 2)
+
+        post = JobPost.objects.get(title='2024年教师招聘公告0')
+        post.is_active = False
+        post.save()
+        self.assertEqual(
+            set(JobInfo.objects.active().values_list('job_post__title', flat=True)), {'2024年教师招聘公告1'}
+        )
+        promoted = dict(JobInfo.objects.filter(job_post__title='2024年教师招聘公告1').values_list('job_title', 'id'))
+        self.assertEqual(
+            dict(JobInfo.objects.filter(job_post__title='2024年教师招聘公告2').values_list('job_title', 'duplicate_of')),
+            promoted,
+        )
+
+        # 单个岗位下线或删除
+        job = JobInfo.objects.get(id=promoted['小学语文教师'])
+        job.is_active = False
+        job.save()
+        JobInfo.objects.get(id=promoted['初中数学教师']).delete()
+        self.assertEqual(
+            set(JobInfo.objects.active().values_list('job_post__title', flat=True)), {'2024年教师招聘公告2'}
+        )
+        self.assertEqual(JobInfo.objects.active().count(), 2)
+
+    def test_expired_original_releases_duplicates(self):
+        """过期下线的原始岗位不再隐藏其转载"""
+        self.import_posts((self.JOBS, {'application_end_date': '2024-01-31'}), (self.JOBS, {}))
+        self.assertEqual(JobInfo.objects.active().count(), 2)
+        expiry.expire_job_posts(datetime.date(2024, 2, 1))
+        self.assertEqual(
+            set(JobInfo.objects.active().values_list('job_post__title', flat=True)), {'2024年教师招聘公告1'}
+        )
+
+    def test_duplicate_of_not_importable(self):
+        """duplicate_of 不从导入数据读取"""
+        self.import_posts((self.JOBS, {}))
+        out = self.import_posts(([dict(self.JOBS[1], job_title='校医', duplicate_of=1)], {}), start=1)
+        self.assertIn('成功导入 1 个新公告', out)
+        self.assertIsNone(JobInfo.objects.get(job_title='校医').duplicate_of)
+
+    def test_backfill_command(self):
+        """回填命令按 ID 顺序为已有岗位计算签名并标记重复岗位"""
+        for index in range(3):
+            post = JobPost.objects.create(
+                title=f'2024年教师招聘公告{index}', organization='某县教育局', category=JobPostCategory.TEACHER.value,
+            )
+            JobInfo.objects.create(job_post=post, organization='某县教育局', **self.JOBS[0])
+        first = JobInfo.objects.order_by('id').first()
+
+        out = StringIO()
+        call_command('detect_duplicate_jobs', batch_size=1, stdout=out)
+        self.assertIn('成功检测 3 个岗位，其中 2 个为重复岗位', out.getvalue())
+        self.assertEqual(set(JobInfo.objects.exclude(id=first.id).values_list('duplicate_of_id', flat=True)),
+                         {first.id})
+
+        out = StringIO()
+        call_command('detect_duplicate_jobs', reset=True, stdout=out)
+        self.assertIn('成功检测 3 个岗位，其中 2 个为重复岗位', out.getvalue())
+
+
+class JobFacetTests(TestCase):
+    """岗位列表分面计数测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+
+    def setUp(self):
+        cache.clear()
+
+    def get_facets(self, **params):
+        response = self.client.get(reverse('jobs:job_list'), params)
+        return {
+            facet['key']: {item['label']: item['count'] for item in facet['values']}
+            for facet in response.context['facets']
+        }
+
+    def test_facet_counts(self):
+        """各分面按去掉本分面条件后的结果计数"""
+        facet_counts = self.get_facets(location='北京')
+        self.assertEqual(facet_counts['location'], {'广东省': 18})
+        self.assertEqual(facet_counts['category'], {})
+
+    def test_facet_query_bound(self):
+        """缓存未命中时每个分面一次分组查询，命中后不再查询"""
+        with self.assertNumQueries(len(facets.FACETS) + 1):
+            self.client.get(reverse('jobs:job_list'))
+        with self.assertNumQueries(1):
+            self.client.get(reverse('jobs:job_list'))
+
+    def test_cache_name_normalized(self):
+        """空条件和首尾空白不影响缓存名称"""
+        self.assertEqual(
+            facets.facet_cache_name({'search': ' 语文 ', 'location': ''}),
+            facets.facet_cache_name({'search': '语文'}),
+        )
+
+    def test_facets_invalidated_on_job_change(self):
+        """岗位变更后分面计数随数据版本号失效"""
+        self.get_facets()
+        JobInfo.objects.create(job_post=self.seed['job_post'], job_title='数学教师', job_location='杭州市')
+        self.assertEqual(self.get_facets()['location'], {'广东省': 18, '浙江省': 1})
+
+
+class PinyinSearchTests(TestCase):
+    """拼音和拼音首字母检索测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_seed_data()
+
+    def setUp(self):
+        cache.clear()
+        typeahead_index.reset()
+
+    def test_search_keys(self):
+        """从每个字开始生成全拼和首字母检索词"""
+        keys = pinyin.build_search_keys('语文教师岗位').split()
+        self.assertIn('yuwenjiaoshigangwei', keys)
+        self.assertIn('jiaoshigangwei', keys)
+        self.assertIn('jsgw', keys)
+        self.assertNotIn('w', keys)
+
+    def test_search_keys_saved(self):
+        """保存岗位时生成拼音检索词"""
+        job = JobInfo.objects.first()
+        self.assertIn('mxjyj', job.search_pinyin.split())
+
+    def test_job_list_pinyin_search(self):
+        """列表页按全拼、首字母和其中一段拼音的前缀检索"""
+        for keyword in ('xiaoxueyuwen', 'xxyw', 'jiaos'):
+            response = self.client.get(reverse('jobs:job_list'), {'search': keyword})
+            self.assertEqual(response.context['jobs'].paginator.count, 18, keyword)
+        response = self.client.get(reverse('jobs:job_list'), {'search': 'shuxue'})
+        self.assertEqual(response.context['jobs'].paginator.count, 0)
+
+    def test_typeahead_pinyin(self):
+        """自动补全按拼音首字母返回原文"""
+        response = self.client.get(reverse('jobs:typeahead_api'), {'q': 'mxj', 'kind': 'organization'})
+        self.assertEqual(response.json()['results'][0]['text'], '某县教育局')
+
+
+class TypeaheadTests(TestCase):
+    """搜索框自动补全测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+        post = JobPost.objects.create(title='2024年卫生系统招聘公告', organization='某市卫健委')
+        JobInfo.objects.create(job_post=post, job_title='小学校医', organization='某市第一小学', job_location='广州市越秀区')
+
+    def setUp(self):
+        cache.clear()
+        typeahead_index.reset()
+        # 同步重建，避免后台线程在测试事务之外读取数据库
+        patcher = mock.patch.object(typeahead_index, 'rebuild_interval', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def search(self, **params):
+        return self.client.get(reverse('jobs:typeahead_api'), params).json()['results']
+
+    def test_prefix_ordered_by_frequency(self):
+        """按前缀匹配，出现次数多的排在前面"""
+        results = self.search(q='广州')
+        self.assertEqual(results[0], {'text': '广州市天河区', 'kind': 'location', 'count': 18})
+        self.assertEqual(results[1]['text'], '广州市越秀区')
+
+    def test_kind_filter(self):
+        """按类型筛选，招聘单位合并岗位和公告的出现次数"""
+        results = self.search(q='某县', kind='organization')
+        self.assertEqual(results, [{'text': '某县教育局', 'kind': 'organization', 'count': 21}])
+        self.assertEqual([item['text'] for item in self.search(q='小学校')], ['小学校医'])
+        self.assertEqual(self.search(q='小学校', kind='location'), [])
+
+    def test_no_queries_when_index_built(self):
+        """索引构建后按键查询不访问数据库"""
+        self.search(q='小学')
+        with self.assertNumQueries(0):
+            self.search(q='小学语')
+
+    def test_rebuilt_after_data_change(self):
+        """岗位数据版本号变化后重建索引"""
+        self.assertEqual(self.search(q='杭州'), [])
+        JobInfo.objects.create(job_post=self.seed['job_post'], job_title='数学教师', job_location='杭州市')
+        self.assertEqual(self.search(q='杭州')[0]['text'], '杭州市')
+
+    def test_precomputed_prefixes(self):
+        """范围较大的前缀在构建时预先计算，结果与直接扫描一致"""
+        terms = {('title', f'小学教师{i}'): i for i in range(30)}
+        terms.update({('organization', f'小学{i}号'): 100 + i for i in range(5)})
+        with mock.patch.object(typeahead, 'SCAN_LIMIT', 10):
+            index = typeahead.PrefixIndex(terms)
+        self.assertIn('小', index.top)
+        self.assertIn('xx', index.top)
+        self.assertEqual(index.search('小学', limit=1), [(104, '小学4号', 'organization')])
+        for prefix in ('小', '小学', '小学教师2', 'x', 'xx', 'xiaoxue', 'jiaoshi'):
+            for kind in (None, 'title', 'organization', 'location'):
+                for limit in (3, typeahead.MAX_LIMIT):
+                    expected = index._rank(*index._range(prefix), limit).get(kind, [])
+                    self.assertEqual(index.search(prefix, kind=kind, limit=limit), expected, (prefix, kind, limit))
+
+    def test_background_rebuild(self):
+        """已有索引时在后台线程中重建，重建完成前返回旧索引，两次重建至少间隔 rebuild_interval"""
+        index = typeahead.TypeaheadIndex(rebuild_interval=60)
+        old = typeahead.PrefixIndex({('title', '语文教师'): 1})
+        new = typeahead.PrefixIndex({('title', '数学教师'): 1})
+        started, release = threading.Event(), threading.Event()
+
+        def build():
+            started.set()
+            release.wait(5)
+            return new
+
+        with mock.patch.object(typeahead, 'build_index', return_value=old):
+            self.assertIs(index.get(), old)
+
+        bump_data_version()
+        with mock.patch.object(typeahead, 'build_index', side_effect=build) as build_index:
+            self.assertIs(index.get(), old)
+            build_index.assert_not_called()
+
+            index._last_build -= 60
+            self.assertIs(index.get(), old)
+            self.assertTrue(started.wait(5))
+            self.assertIs(index.get(), old)
+            release.set()
+            index._worker.join(5)
+            self.assertIs(index.get(), new)
+            build_index.assert_called_once()
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class JobsQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """apps/jobs/urls.py 中每个 URL 的查询次数预算测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = create_seed_data()
+
+    def setUp(self):
+        cache.clear()
+        typeahead_index.reset()
+        # 浏览历史同步写入，避免后台线程在测试数据库之外写入
+        patcher = mock.patch.object(browse_buffer, 'flush_interval', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request_specs(self):
+        """每个 URL 名称对应的请求：(method, url, data, 登录用户, 预期状态码)"""
+        seed = self.seed
+        job_id = seed['job'].id
+        return {
+            'home': [('get', reverse('jobs:home'), None, None, 200)],
+            'job_list': [
+                ('get', reverse('jobs:job_list'), None, None, 200),
+                ('get', reverse('jobs:job_list'), None, 'job_seeker_user', 200),
+                ('get', reverse('jobs:job_list'), {'search': '语文', 'location': '广州'}, None, 200),
+                ('get', reverse('jobs:job_list'), {'eligible': '1'}, 'job_seeker_user', 200),
+                ('get', reverse('jobs:job_list'), {'major': '汉语言文学'}, None, 200),
+            ],
+            'job_list_api': [('get', reverse('jobs:job_list_api'), None, None, 200)],
+            'typeahead_api': [('get', reverse('jobs:typeahead_api'), {'q': '小学'}, None, 200)],
+            'post_job': [
+                ('get', reverse('jobs:post_job'), None, 'job_seeker_user', 302),
+                ('get', reverse('jobs:post_job'), None, 'employer_user', 200),
+            ],
+            'job_detail': [
+                ('get', reverse('jobs:job_detail', args=[job_id]), None, None, 200),
+                ('get', reverse('jobs:job_detail', args=[job_id]), None, 'job_seeker_user', 200),
+            ],
+            'apply_job': [
+                ('post', reverse('jobs:apply_job', args=[job_id]), {'cover_letter': '求职信'}, 'job_seeker_user', 302),
+            ],
+            'toggle_bookmark': [('post', reverse('jobs:toggle_bookmark', args=[job_id]), None, 'job_seeker_user', 200)],
+            'job_post_detail': [('get', reverse('jobs:job_post_detail', args=[seed['job_post'].id]), None, None, 200)],
+            'test_job_posts': [('get', reverse('jobs:test_job_posts'), None, None, 200)],
+            'categories': [('get', reverse('jobs:categories'), None, None, 200)],
+            'companies': [('get', reverse('jobs:companies'), None, None, 200)],
+            'company_detail': [('get', reverse('jobs:company_detail', args=[seed['employer'].id]), None, None, 200)],
+        }
+
+    def test_every_url_within_budget(self):
+        """所有岗位相关 URL 的查询次数不超过预算"""
+        specs = self.request_specs()
+        for pattern in jobs_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            self.assertIn(pattern.name, specs, f'URL {pattern.name} 缺少查询预算测试')
+            for method, url, data, user, status in specs[pattern.name]:
+                with self.subTest(url=pattern.name, method=method, user=user):
+                    self.client.logout()
+                    if user:
+                        self.client.force_login(self.seed[user])
+                    response = self.assertWithinBudget(f'{jobs_urls.app_name}:{pattern.name}', method, url, data)
+                    self.assertEqual(response.status_code, status)
@@ -0,0 +1,221 @@
+"""
+搜索框自动补全
+
+每个工作进程在内存中维护一份前缀索引：有效岗位的岗位名称、招聘单位（岗位和公告）、工作地点
+去重后按规范化文本排序，权重为出现次数。岗位名称和招聘单位另以拼音检索词作为检索键，
+输入"xxyw"或"jiaoshi"也能补全"小学语文教师"。查询时用 bisect 定位前缀范围，取权重最高的若干条，
+每次按键不访问数据库。拼音检索键使单个字母的前缀覆盖索引的很大一部分，
+构建索引时为范围超过 SCAN_LIMIT 的前缀预先计算前 MAX_LIMIT 条，查询耗时与前缀范围大小无关。
+索引记录构建时的岗位数据版本号，版本号变化后在后台线程中重建，重建完成前继续使用旧索引；
+两次重建至少间隔 REBUILD_INTERVAL 秒，频繁写入时索引最多落后这么久。
+"""
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count
+
+from . import pinyin
+from .cache import get_data_version
+from .models import JobInfo, JobPost
+
+logger = logging.getLogger(__name__)
+
+# (类型, 模型, 字段)
+SOURCES = (
+    ('title', JobInfo, 'job_title'),
+    ('organization', JobInfo, 'organization'),
+    ('organization', JobPost, 'organization'),
+    ('location', JobInfo, 'job_location'),
+)
+KINDS = ('title', 'organization', 'location')
+# 另以拼音作为检索键的类型
+PINYIN_KINDS = ('title', 'organization')
+MAX_TERM_LENGTH = 100
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+# 前缀范围不超过该条数时直接扫描，超过的前缀在构建时预先计算结果
+SCAN_LIMIT = 1000
+# 两次重建之间的最短间隔（秒），为 0 时在请求线程中同步重建
+REBUILD_INTERVAL = getattr(settings, 'TYPEAHEAD_REBUILD_INTERVAL', 60)
+
+
+def normalize(text):
+    """统一大小写并去掉首尾空白"""
+    return (text or '').strip().casefold()
+
+
+def _search_keys(kind, text):
+    """文本的检索键：规范化文本，岗位名称和招聘单位另加与全文检索相同的拼音检索词"""
+    keys = {normalize(text)}
+    if kind in PINYIN_KINDS:
+        keys.update(pinyin.build_search_keys(text).split())
+    keys.discard('')
+    return keys
+
+
+class PrefixIndex:
+    """按检索键排序的数组，keys 与 entries 一一对应，entries 为 (权重, 原文本, 类型)"""
+
+    def __init__(self, terms):
+        """
+        Args:
+            terms: {(类型, 原文本): 权重}
+        """
+        rows = sorted(
+            (key, weight, text, kind)
+            for (kind, text), weight in terms.items()
+            for key in _search_keys(kind, text)
+        )
+        self.keys = [row[0] for row in rows]
+        self.entries = [row[1:] for row in rows]
+        # {前缀: {类型或 None: 权重最高的 MAX_LIMIT 条}}，只包含范围超过 SCAN_LIMIT 的前缀
+        self.top = self._build_top()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _range(self, prefix, lo=0, hi=None):
+        """以 prefix 开头的检索键的下标范围"""
+        hi = len(self.keys) if hi is None else hi
+        start = bisect_left(self.keys, prefix, lo, hi)
+        # 以 prefix 开头的字符串都小于 prefix + 最大码位字符
+        end = bisect_left(self.keys, prefix + '\U0010ffff', start, hi)
+        return start, end
+
+    def _rank(self, start, end, limit):
+        """范围内每种类型及全部类型中权重最高的 limit 条"""
+        # 同一文本可能通过原文和拼音多个检索键命中，按 (原文本, 类型) 去重
+        candidates = {entry[1:]: entry for entry in self.entries[start:end]}
+        by_kind = {}
+        for entry in candidates.values():
+            by_kind.setdefault(entry[2], []).append(entry)
+
+        def largest(entries):
+            return heapq.nlargest(limit, entries, key=lambda entry: entry[0])
+        ranked = {kind: largest(entries) for kind, entries in by_kind.items()}
+        ranked[None] = largest(entry for entries in ranked.values() for entry in entries)
+        return ranked
+
+    def _build_top(self):
+        """
+        逐层加长前缀，为范围超过 SCAN_LIMIT 的前缀计算结果。
+        前缀的范围包含在更短前缀的范围内，只需在上一层的大范围内继续细分
+        """
+        top = {}
+        ranges = [('', 0, len(self.keys))]
+        while ranges:
+            next_ranges = []
+            for parent, lo, hi in ranges:
+                length = len(parent) + 1
+                i = lo
+                while i < hi:
+                    if len(self.keys[i]) < length:
+                        i += 1
+                        continue
+                    prefix = self.keys[i][:length]
+                    start, end = self._range(prefix, i, hi)
+                    if end - start > SCAN_LIMIT:
+                        top[prefix] = self._rank(start, end, MAX_LIMIT)
+                        next_ranges.append((prefix, start, end))
+                    i = end
+            ranges = next_ranges
+        return top
+
+    def search(self, prefix, kind=None, limit=DEFAULT_LIMIT):
+        """返回以 prefix 开头、权重最高的 limit 条 (权重, 原文本, 类型)"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if prefix in self.top and limit <= MAX_LIMIT:
+            return self.top[prefix].get(kind, [])[:limit]
+        start, end = self._range(prefix)
+        return self._rank(start, end, limit).get(kind, [])
+
+
+def build_index():
+    """从数据库统计各类文本的出现次数并构建前缀索引"""
+    terms = {}
+    for kind, model, field in SOURCES:
+        queryset = model.objects.active() if model is JobInfo else model.objects.filter(is_active=True)
+        rows = (
+            queryset.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+            .order_by().values(field).annotate(count=Count('id'))
+        )
+        for row in rows:
+            text = row[field].strip()
+            if len(text) <= MAX_TERM_LENGTH:
+                key = (kind, text)
+                terms[key] = terms.get(key, 0) + row['count']
+    return PrefixIndex(terms)
+
+
+class TypeaheadIndex:
+    """进程内的前缀索引，数据版本号变化时在后台线程中重建"""
+
+    def __init__(self, rebuild_interval=REBUILD_INTERVAL):
+        self.rebuild_interval = rebuild_interval
+        self._index = None
+        self._version = None
+        self._last_build = None
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def get(self):
+        version = get_data_version()
+        if self._index is not None and self._version == version:
+            return self._index
+
+        # 还没有索引，或不允许后台重建时，在请求线程中同步构建
+        if self._index is None or not self.rebuild_interval:
+            with self._lock:
+                if self._index is None or self._version != version:
+                    self._rebuild(version)
+            return self._index
+
+        if time.monotonic() - self._last_build >= self.rebuild_interval:
+            self._ensure_worker(version)
+        return self._index
+
+    def _rebuild(self, version):
+        self._last_build = time.monotonic()
+        index = build_index()
+        self._index, self._version = index, version
+        logger.info(f"自动补全索引已重建：{len(index)} 条，数据版本 {version}")
+
+    def _ensure_worker(self, version):
+        """启动后台重建线程，同一时间最多一个"""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._last_build = time.monotonic()
+            self._worker = threading.Thread(
+                target=self._run, args=(version,), name='typeahead-rebuild', daemon=True,
+            )
+            self._worker.start()
+
+    def _run(self, version):
+        close_old_connections()
+        try:
+            self._rebuild(version)
+        except Exception as e:
+            logger.error(f"重建自动补全索引失败，继续使用旧索引: {e}", exc_info=True)
+        finally:
+            close_old_connections()
+
+    def search(self, prefix, kind=None, limit=DEFAULT_LIMIT):
+        return self.get().search(prefix, kind=kind, limit=limit)
+
+    def reset(self):
+        """丢弃当前索引，下次查询时重建"""
+        with self._lock:
+            self._index = None
+            self._version = None
+            self._last_build = None
+
+
+typeahead_index = TypeaheadIndex()
@@ -6,6 +6,8 @@ app_name = 'jobs'
 urlpatterns = [
     path('', views.home, name='home'),
     path('jobs/', views.job_list, name='job_list'),
+    path('api/jobs/', views.job_list_api, name='job_list_api'),
+    path('api/typeahead/', views.typeahead_api, name='typeahead_api'),
     path('jobs/post/', views.post_job, name='post_job'),
     path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
     path('jobs/<int:job_id>/apply/', views.apply_job, name='apply_job'),
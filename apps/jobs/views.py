@@ -1,112 +1,271 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
-from .models import JobInfo, JobPost, Application, JobBookmark, JobBrowseHistory
+from . import facets, majors, pinyin, regions, search, typeahead
+from .browse_history import browse_buffer
+from .cache import get_or_compute, get_result_ids, get_seeker_membership, invalidate_seeker_membership
+from .stats import get_category_stats
+from .pagination import (
+    JOBS_PER_PAGE, MAX_NUMBERED_PAGES, CachedResultsPaginator, CursorPage, paginate_by_cursor,
+)
+from .models import JobInfo, JobPost, Application, JobBookmark, CategoryStats
 from .forms import JobForm, JobApplicationForm, JobSearchForm, JobPostForm
 from django.shortcuts import render
 from apps.accounts.models import Employer
 
 
 def companies(request):
-    companies = Employer.objects.all()
+    active_jobs = JobInfo.objects.filter(
+        organization=OuterRef('company_name'), is_active=True, post_is_active=True
+    ).values('organization').annotate(total=Count('id')).values('total')
+    companies = Employer.objects.annotate(
+        active_job_count=Coalesce(Subquery(active_jobs, output_field=IntegerField()), Value(0))
+    )
     return render(request, 'jobs/companies.html', {'companies': companies})
 
 
-def home(request):
-    featured_jobs = JobInfo.objects.filter(is_active=True)[:6]
-    # 获取所有可用的岗位类别及其数量（按JobPost的category统计）
-    categories_data = []
-
-    for category_choice in JobPost.category.field.choices:
-        category_value = category_choice[0]
-        category_display = category_choice[1]
-
-        # 获取该分类下的所有招聘公告
-        job_posts = JobPost.objects.filter(
-            category=category_value,
-            is_active=True
-        )
-
-        # 统计岗位数量
-        job_count = JobInfo.objects.filter(
-            job_post__in=job_posts,
-            is_active=True
-        ).count()
-
-        # 只显示有数据的分类
-        if job_count > 0:
-            categories_data.append({
-                'category': category_display,
-                'category_value': category_value,
-                'job_count': job_count,
-            })
-
-    # 按岗位数量排序
-    categories_data.sort(key=lambda x: x['job_count'], reverse=True)
-
-    context = {
+def _home_data():
+    """首页数据：推荐岗位和有岗位的招聘分类"""
+    featured_jobs = list(JobInfo.objects.active().for_listing()[:6])
+    # 获取有岗位的招聘分类及其岗位数量（读取分类统计表，按岗位数量排序）
+    categories_data = [
+        {
+            'category': row['category'],
+            'category_value': row['category'],
+            'job_count': row['job_count'],
+        }
+        for row in CategoryStats.objects.filter(job_count__gt=0).order_by('-job_count').values('category', 'job_count')
+    ]
+    return {
         'featured_jobs': featured_jobs,
         'categories': categories_data,
     }
+
+
+def _membership_context(request):
+    """当前求职者已收藏和已申请的岗位ID，供列表页标记状态（未登录时为空集合）"""
+    job_seeker = _current_job_seeker(request)
+    if job_seeker is not None:
+        bookmarked_ids, applied_ids = get_seeker_membership(job_seeker.id)
+    else:
+        bookmarked_ids, applied_ids = set(), set()
+    return {'bookmarked_ids': bookmarked_ids, 'applied_ids': applied_ids}
+
+
+def home(request):
+    # 首页数据随岗位数据版本号缓存，公告或岗位变更后自动失效
+    context = dict(get_or_compute('home', _home_data))
+    context.update(_membership_context(request))
     return render(request, 'jobs/home.html', context)
 
 
+def _search_jobs(jobs, keyword):
+    """关键词检索：优先使用全文索引并按相关度排序，索引不可用时回退到 icontains（含拼音检索词）"""
+    matched = search.search_jobs(jobs, keyword)
+    if matched is None:
+        condition = Q(job_title__icontains=keyword) | Q(job_responsibilities__icontains=keyword)
+        if pinyin.is_pinyin_query(keyword):
+            condition |= Q(search_pinyin__icontains=keyword.replace(' ', ''))
+        return jobs.filter(condition)
+    return matched
+
+
+def _current_job_seeker(request):
+    """当前登录的求职者档案，未登录或非求职者时返回 None"""
+    if request.user.is_authenticated and hasattr(request.user, 'jobseeker'):
+        return request.user.jobseeker
+    return None
+
+
+def _filter_location(jobs, location):
+    """
+    按工作地点筛选：能识别出省、市时按区划代码等值查询，否则退回文本匹配
+
+    区县按归一化的名称匹配（"天河""天河区"相同），未解析出区县的岗位退回文本匹配。
+    """
+    province_code, city_code, district = regions.parse_location(location)
+    if city_code:
+        jobs = jobs.filter(location_city_code=city_code)
+    elif province_code:
+        jobs = jobs.filter(location_province_code=province_code)
+    elif not district:
+        return jobs.filter(job_location__icontains=location)
+    if district:
+        jobs = jobs.filter(Q(location_district=district) | Q(location_district='', job_location__icontains=district))
+    return jobs
+
+
+def _filter_jobs(jobs, cleaned_data, job_seeker=None):
+    """根据搜索表单条件筛选岗位，勾选"只看符合条件"时按求职者资料筛选"""
+    keyword = cleaned_data.get('search')
+    location = cleaned_data.get('location')
+    major = cleaned_data.get('major')
+    category = cleaned_data.get('category')
+    job_type = cleaned_data.get('job_type')
+    degree = cleaned_data.get('degree')
+    eligible = cleaned_data.get('eligible')
+
+    if keyword:
+        jobs = _search_jobs(jobs, keyword)
+    if location:
+        jobs = _filter_location(jobs, location)
+    if major:
+        jobs = majors.filter_by_major(jobs, major)
+    if category:
+        # 按JobPost的category进行筛选（使用冗余在岗位上的公告分类，无需连接公告表）
+        jobs = jobs.filter(post_category=category)
+    if job_type:
+        jobs = jobs.filter(employment_type=job_type)
+    if degree:
+        jobs = jobs.filter(min_degree_level=degree)
+    if eligible and job_seeker is not None:
+        jobs = jobs.eligible_for(job_seeker)
+    return jobs
+
+
+def _facet_context(request, form):
+    """
+    列表页的分面计数，每个选项附带切换到该选项（再次点击取消）的查询字符串
+
+    筛选条件无效时不显示分面。
+    """
+    if not form.is_valid():
+        return []
+    facet_list = facets.get_facets(
+        JobInfo.objects.active(), form.cleaned_data, _filter_jobs, _current_job_seeker(request)
+    )
+    result = []
+    for facet in facet_list:
+        selected = form.cleaned_data.get(facet['key'])
+        values = []
+        for item in facet['values']:
+            params = request.GET.copy()
+            params.pop('page', None)
+            params.pop('cursor', None)
+            active = item['value'] == selected
+            if active:
+                params.pop(facet['key'], None)
+            else:
+                params[facet['key']] = item['value']
+            values.append({**item, 'active': active, 'query': params.urlencode()})
+        result.append({**facet, 'values': values})
+    return result
+
+
+def _paginate_jobs(request, form):
+    """
+    按搜索条件筛选岗位并分页
+
+    关键词检索结果按相关度排序且数量有上限，使用页码分页；
+    显式传入 page 参数时使用仅限浅层页面的页码分页，这两种情况按搜索条件缓存有序结果ID，
+    缓存命中时不再执行检索和筛选，只按ID查询当前页；其余情况使用游标分页。
+    """
+    jobs = JobInfo.objects.active().for_listing()
+    cleaned_data = form.cleaned_data if form.is_valid() else {}
+    job_seeker = _current_job_seeker(request)
+
+    keyword = cleaned_data.get('search')
+    if keyword:
+        limit = search.MAX_SEARCH_RESULTS
+    elif 'page' in request.GET:
+        limit = JOBS_PER_PAGE * MAX_NUMBERED_PAGES
+    else:
+        jobs = _filter_jobs(jobs, cleaned_data, job_seeker)
+        return paginate_by_cursor(jobs, request.GET.get('cursor'), JOBS_PER_PAGE)
+
+    job_ids = get_result_ids(
+        cleaned_data, job_seeker,
+        lambda: list(_filter_jobs(jobs, cleaned_data, job_seeker).values_list('id', flat=True)[:limit]),
+        limit,
+    )
+    return CachedResultsPaginator(job_ids, jobs, JOBS_PER_PAGE, limit).get_page(request.GET.get('page'))
+
+
 def job_list(request):
     form = JobSearchForm(request.GET)
-    jobs = JobInfo.objects.filter(is_active=True)
-
-    if form.is_valid():
-        search = form.cleaned_data.get('search')
-        location = form.cleaned_data.get('location')
-        category = form.cleaned_data.get('category')
-        job_type = form.cleaned_data.get('job_type')
-
-        if search:
-            jobs = jobs.filter(
-                Q(job_title__icontains=search) |
-                Q(job_responsibilities__icontains=search)
-            )
-        if location:
-            jobs = jobs.filter(job_location__icontains=location)
-        if category:
-            # 按JobPost的category进行筛选
-            jobs = jobs.filter(job_post__category=category)
-        if job_type:
-            jobs = jobs.filter(employment_type=job_type)
-
-    paginator = Paginator(jobs, 9)  # 9 jobs per page
-    page = request.GET.get('page')
-    jobs = paginator.get_page(page)
+    facet_list = _facet_context(request, form)
+    jobs = _paginate_jobs(request, form)
 
     context = {
         'jobs': jobs,
         'form': form,
+        'facets': facet_list,
+        **_membership_context(request),
     }
     return render(request, 'jobs/job_list.html', context)
 
 
+def job_list_api(request):
+    """岗位列表 JSON 接口，分页规则与 job_list 一致"""
+    form = JobSearchForm(request.GET)
+    page = _paginate_jobs(request, form)
+
+    data = {
+        'results': [
+            {
+                'id': job.id,
+                'job_title': job.job_title,
+                'organization': job.organization,
+                'job_location': job.job_location,
+                'category': job.category,
+                'post_category': job.job_post.category,
+                'post_title': job.job_post.title,
+                'created_at': job.created_at.isoformat(),
+            }
+            for job in page
+        ],
+        'has_next': page.has_next(),
+        'has_previous': page.has_previous(),
+    }
+    if isinstance(page, CursorPage):
+        data['next_cursor'] = page.next_cursor
+        data['previous_cursor'] = page.previous_cursor
+    else:
+        data['page'] = page.number
+        data['num_pages'] = page.paginator.num_pages
+    return JsonResponse(data)
+
+
+def typeahead_api(request):
+    """搜索框自动补全 JSON 接口：按前缀返回出现次数最多的岗位名称、招聘单位或工作地点"""
+    query = request.GET.get('q', '')
+    kind = request.GET.get('kind')
+    if kind not in typeahead.KINDS:
+        kind = None
+    try:
+        limit = min(max(int(request.GET.get('limit', typeahead.DEFAULT_LIMIT)), 1), typeahead.MAX_LIMIT)
+    except ValueError:
+        limit = typeahead.DEFAULT_LIMIT
+
+    results = typeahead.typeahead_index.search(query, kind=kind, limit=limit) if query.strip() else []
+    return JsonResponse({
+        'query': query,
+        'results': [{'text': text, 'kind': kind, 'count': count} for count, text, kind in results],
+    })
+
+
 def job_detail(request, job_id):
     import logging
     logger = logging.getLogger(__name__)
 
-    job = get_object_or_404(JobInfo, id=job_id, is_active=True)
+    job = get_object_or_404(JobInfo, id=job_id, is_active=True, post_is_active=True)
+    if job.duplicate_of_id:
+        # 转载岗位不在列表中展示，旧链接跳转到原始岗位
+        return redirect('jobs:job_detail', job_id=job.duplicate_of_id)
     application_form = JobApplicationForm() if request.user.is_authenticated else None
     has_applied = False
     is_bookmarked = False
 
     if request.user.is_authenticated and hasattr(request.user, 'jobseeker'):
-        has_applied = Application.objects.filter(
-            job_info=job, job_seeker=request.user.jobseeker
-        ).exists()
-        is_bookmarked = JobBookmark.objects.filter(
-            job_info=job, job_seeker=request.user.jobseeker
-        ).exists()
-
-        # 记录浏览历史
+        bookmarked_ids, applied_ids = get_seeker_membership(request.user.jobseeker.id)
+        has_applied = job.id in applied_ids
+        is_bookmarked = job.id in bookmarked_ids
+
+        # 记录浏览历史（写入缓冲区，批量落库）
         try:
             # 获取用户IP地址
             x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -118,16 +277,13 @@ def job_detail(request, job_id):
             # 获取用户代理
             user_agent = request.META.get('HTTP_USER_AGENT', '')
 
-            # 创建浏览历史记录
-            JobBrowseHistory.objects.create(
-                job_info=job,
-                job_seeker=request.user.jobseeker,
+            browse_buffer.record(
+                job_info_id=job.id,
+                job_seeker_id=request.user.jobseeker.id,
                 ip_address=ip_address,
                 user_agent=user_agent
             )
 
-            logger.info(f"Browse history recorded for job {job_id} by user {request.user.username}")
-
         except Exception as e:
             logger.error(f"Error recording browse history: {str(e)}", exc_info=True)
 
@@ -143,7 +299,7 @@ def job_detail(request, job_id):
 @login_required
 def post_job(request):
     if not hasattr(request.user, 'employer'):
-        return redirect('home')
+        return redirect('jobs:home')
 
     if request.method == 'POST':
         form = JobPostForm(request.POST)
@@ -165,7 +321,7 @@ def apply_job(request, job_id):
         messages.error(request, "Only job seekers can apply for jobs.")
         return redirect('jobs:job_detail', job_id=job_id)
 
-    job = get_object_or_404(JobInfo, id=job_id, is_active=True)
+    job = get_object_or_404(JobInfo.objects.active(), id=job_id)
 
     if Application.objects.filter(job_info=job, job_seeker=request.user.jobseeker).exists():
         messages.info(request, "You have already applied for this job.")
@@ -178,110 +334,43 @@ def apply_job(request, job_id):
             application.job_info = job
             application.job_seeker = request.user.jobseeker
             application.save()
+            invalidate_seeker_membership(application.job_seeker_id)
             messages.success(request, "Application submitted successfully!")
-            return redirect('dashboard:job_seeker_dashboard')
+            return redirect('dashboard:jobseeker_dashboard')
 
     return redirect('jobs:job_detail', job_id=job_id)
 
 
 def search_jobs(request):
     form = JobSearchForm(request.GET)
-    jobs = JobInfo.objects.filter(is_active=True)
-
-    if form.is_valid():
-        search = form.cleaned_data.get('search')
-        location = form.cleaned_data.get('location')
-        category = form.cleaned_data.get('category')
-        job_type = form.cleaned_data.get('job_type')
-
-        if search:
-            jobs = jobs.filter(
-                Q(job_title__icontains=search) |
-                Q(job_responsibilities__icontains=search)
-            )
-        if location:
-            jobs = jobs.filter(job_location__icontains=location)
-        if category:
-            # 按JobPost的category进行筛选
-            jobs = jobs.filter(job_post__category=category)
-        if job_type:
-            jobs = jobs.filter(employment_type=job_type)
-
-    paginator = Paginator(jobs, 9)  # 9 jobs per page
-    page = request.GET.get('page')
-    jobs = paginator.get_page(page)
+    facet_list = _facet_context(request, form)
+    jobs = _paginate_jobs(request, form)
 
     context = {
         'jobs': jobs,
         'form': form,
+        'facets': facet_list,
+        **_membership_context(request),
     }
     return render(request, 'jobs/search_results.html', context)
 
 
 def categories(request):
-    from django.db.models import Count, Q
-    from django.utils import timezone
-    from datetime import timedelta
-
-    # 获取时间范围
-    today = timezone.now().date()
-    seven_days_ago = today - timedelta(days=7)
-
-    # 按JobPostCategory分类统计
-    categories_data = []
-
-    for category_choice in JobPost.category.field.choices:
-        category_value = category_choice[0]
-        category_display = category_choice[1]
-
-        # 获取该分类下的所有招聘公告
-        job_posts = JobPost.objects.filter(
-            category=category_value,
-            is_active=True
-        )
-
-        # 统计总数量
-        total_posts = job_posts.count()
-        total_jobs = JobInfo.objects.filter(
-            job_post__in=job_posts,
-            is_active=True
-        ).count()
-
-        # 统计最近7天数量
-        recent_posts = job_posts.filter(
-            created_at__date__gte=seven_days_ago
-        )
-        recent_posts_count = recent_posts.count()
-        recent_jobs_count = JobInfo.objects.filter(
-            job_post__in=recent_posts,
-            is_active=True
-        ).count()
-
-        # 统计今天新增数量
-        today_posts = job_posts.filter(
-            created_at__date=today
-        )
-        today_posts_count = today_posts.count()
-        today_jobs_count = JobInfo.objects.filter(
-            job_post__in=today_posts,
-            is_active=True
-        ).count()
-
-        # 只显示有数据的分类
-        if total_posts > 0:
-            categories_data.append({
-                'category': category_display,
-                'category_value': category_value,
-                'total_posts': total_posts,
-                'total_jobs': total_jobs,
-                'recent_posts': recent_posts_count,
-                'recent_jobs': recent_jobs_count,
-                'today_posts': today_posts_count,
-                'today_jobs': today_jobs_count,
-            })
-
-    # 按总招聘公告数量排序
-    categories_data.sort(key=lambda x: x['total_posts'], reverse=True)
+    # 按JobPostCategory分类统计（读取分类统计表，按总招聘公告数量排序）
+    categories_data = [
+        {
+            'category': row.category,
+            'category_value': row.category,
+            'total_posts': row.post_count,
+            'total_jobs': row.job_count,
+            'recent_posts': row.recent_posts,
+            'recent_jobs': row.recent_jobs,
+            'today_posts': row.today_posts,
+            'today_jobs': row.today_jobs,
+            'total_positions': row.position_count,
+        }
+        for row in get_category_stats()
+    ]
 
     context = {
         'categories': categories_data,
@@ -291,11 +380,13 @@ def categories(request):
 
 def company_detail(request, pk):
     company = get_object_or_404(Employer, pk=pk)
-    active_jobs = JobInfo.objects.filter(organization=company.company_name, is_active=True)
+    active_jobs = list(JobInfo.objects.active().filter(organization=company.company_name).for_listing())
+    company.active_job_count = len(active_jobs)
     
     context = {
         'company': company,
         'active_jobs': active_jobs,
+        'job_count': company.active_job_count,
     }
     return render(request, 'jobs/company_detail.html', context)
 
@@ -306,17 +397,20 @@ def job_post_detail(request, job_post_id):
     # 获取该招聘公告下的所有岗位
     jobs = JobInfo.objects.filter(job_post=job_post, is_active=True)
     
-    # 统计岗位数量
-    total_jobs = jobs.count()
+    # 统计岗位数量和招聘人数（人数不确定的岗位单独计数）
+    totals = jobs.aggregate(
+        total_jobs=Count('id'),
+        total_positions=Coalesce(Sum('position_count'), Value(0)),
+        unspecified_jobs=Count('id', filter=Q(position_count__isnull=True)),
+    )
     
     # 按岗位类别分组统计
-    from django.db.models import Count
     category_stats = jobs.values('category').annotate(count=Count('id')).order_by('-count')
     
     context = {
         'job_post': job_post,
         'jobs': jobs,
-        'total_jobs': total_jobs,
+        **totals,
         'category_stats': category_stats,
     }
     return render(request, 'jobs/job_post_detail.html', context)
@@ -371,6 +465,7 @@ def toggle_bookmark(request, job_id):
             is_bookmarked = True
             message = '已添加到收藏'
             logger.info(f"Bookmark created for job {job_id}")
+        invalidate_seeker_membership(job_seeker.id)
 
         response_data = {
             'success': True,
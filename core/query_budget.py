@@ -0,0 +1,102 @@
+"""
+请求级 SQL 查询预算
+
+QueryBudgetMiddleware 统计每个请求执行的查询次数和数据库耗时，
+超过 QUERY_BUDGETS（按 URL 名称配置）或 QUERY_BUDGET_DEFAULT 时记录警告日志，
+用于及早发现 N+1 查询。测试中可使用 QueryBudgetTestMixin.assertMaxQueries 断言预算。
+"""
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """通过 execute_wrapper 统计查询次数和耗时，不依赖 DEBUG 模式"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements.append(sql)
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+
+@contextmanager
+def count_queries():
+    """统计代码块在所有数据库连接上执行的查询"""
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+def get_query_budget(view_name):
+    """获取 URL 名称对应的查询次数预算"""
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', 20))
+
+
+class QueryBudgetMiddleware:
+    """统计每个请求的查询次数和数据库耗时，超出预算时记录警告"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.time_budget_ms = getattr(settings, 'QUERY_BUDGET_DB_TIME_MS', 200)
+
+    def __call__(self, request):
+        with count_queries() as counter:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else request.path
+        budget = get_query_budget(view_name)
+
+        if counter.count > budget or counter.duration_ms > self.time_budget_ms:
+            logger.warning(
+                f"查询超出预算: {request.method} {request.path} ({view_name}) "
+                f"执行 {counter.count} 次查询（预算 {budget}），"
+                f"数据库耗时 {counter.duration_ms:.1f}ms（预算 {self.time_budget_ms}ms）"
+            )
+
+        if settings.DEBUG:
+            response['X-DB-Query-Count'] = str(counter.count)
+            response['X-DB-Query-Time'] = f'{counter.duration_ms:.1f}'
+        return response
+
+
+class QueryBudgetTestMixin:
+    """TestCase 混入类：断言代码块的查询次数不超过上限"""
+
+    @contextmanager
+    def assertMaxQueries(self, budget, msg=None):
+        with count_queries() as counter:
+            yield counter
+        if counter.count > budget:
+            statements = '\n'.join(f'{i}. {sql}' for i, sql in enumerate(counter.statements, start=1))
+            self.fail(
+                f"{msg or '查询次数超出预算'}: 执行 {counter.count} 次查询，预算 {budget}\n{statements}"
+            )
+
+    def assertWithinBudget(self, view_name, method, url, data=None, **extra):
+        """按 URL 名称对应的预算请求页面并断言查询次数"""
+        budget = get_query_budget(view_name)
+        with self.assertMaxQueries(budget, msg=f'{view_name} ({method.upper()} {url})'):
+            response = getattr(self.client, method)(url, data, **extra)
+        return response
@@ -24,6 +24,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
 MIDDLEWARE = [
+    'core.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -56,6 +57,23 @@ DATABASES = {
     'default': dj_database_url.config(default=os.getenv('DATABASE_URL', f'sqlite:///{BASE_DIR / "db.sqlite3"}'))
 }
 
+# 缓存配置：岗位数据版本号、重新计算锁和求职者收藏/申请缓存都保存在缓存中，必须在各进程间共享。
+# 部署（gunicorn 多 worker、expire-posts 等独立进程）时配置 REDIS_URL，docker-compose 默认使用 redis 服务；
+# 未配置时使用进程内缓存 LocMemCache，只适用于单进程的开发服务器和测试
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
@@ -92,4 +110,47 @@ DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 # 验证码设置
 VERIFICATION_CODE_LENGTH = 6
 VERIFICATION_CODE_EXPIRE_MINUTES = 10
-VERIFICATION_MAX_ATTEMPTS = 5
\ No newline at end of file
+VERIFICATION_MAX_ATTEMPTS = 5
+# 浏览历史写缓冲设置
+BROWSE_HISTORY_BATCH_SIZE = 100
+BROWSE_HISTORY_FLUSH_INTERVAL = int(os.getenv('BROWSE_HISTORY_FLUSH_INTERVAL', '10'))
+# 浏览历史保留天数（purge_browse_history 命令使用）
+BROWSE_HISTORY_RETENTION_DAYS = 180
+# 自动补全索引两次重建之间的最短间隔（秒），为 0 时在请求线程中同步重建
+TYPEAHEAD_REBUILD_INTERVAL = int(os.getenv('TYPEAHEAD_REBUILD_INTERVAL', '60'))
+
+# 请求级 SQL 查询预算（core.query_budget），超出时记录警告日志，测试中作为断言上限
+QUERY_BUDGET_DEFAULT = 20
+QUERY_BUDGET_DB_TIME_MS = 200
+# 按 URL 名称配置的查询次数上限（含 session、用户等框架查询）
+QUERY_BUDGETS = {
+    'jobs:home': 4,
+    'jobs:job_list': 12,
+    'jobs:job_list_api': 3,
+    'jobs:typeahead_api': 6,
+    'jobs:post_job': 4,
+    'jobs:job_detail': 10,
+    'jobs:apply_job': 8,
+    'jobs:toggle_bookmark': 10,
+    'jobs:job_post_detail': 5,
+    'jobs:test_job_posts': 2,
+    'jobs:categories': 2,
+    'jobs:companies': 2,
+    'jobs:company_detail': 4,
+    'dashboard:home': 3,
+    'dashboard:employer_dashboard': 8,
+    'dashboard:jobseeker_dashboard': 12,
+    'dashboard:manage_application': 6,
+    'dashboard:edit_application': 6,
+    'dashboard:withdraw_application': 6,
+    'dashboard:clear_browse_history': 5,
+    'accounts_api:login': 12,
+    'accounts_api:logout': 5,
+    'accounts_api:signup': 16,
+    'accounts_api:send_verification_code': 12,
+    'accounts_api:verify_code': 3,
+    'accounts_api:send_password_reset_code': 14,
+    'accounts_api:password_reset': 8,
+    'accounts_api:profile': 4,
+    'accounts_api:update_profile': 8,
+}